@@ -31,7 +31,7 @@ if sys.platform == 'darwin':
         print("[ERROR] FFmpeg not found in PATH or common locations. Please install FFmpeg (e.g., via Homebrew: 'brew install ffmpeg') and try again.")
         print("[ERROR] You can also set the FFMPEG_PATH environment variable to the full path of ffmpeg.")
         sys.exit(1)
-from PyQt5.QtGui import QPixmap, QIcon, QPainter, QPen, QKeySequence, QFont, QTextDocument, QSyntaxHighlighter, QTextCharFormat, QStandardItemModel, QStandardItem, QColor, QDesktopServices, QMovie, QTextOption, QBrush, QTextCursor
+from PyQt5.QtGui import QPixmap, QImage, QImageReader, QIcon, QPainter, QPen, QKeySequence, QFont, QTextDocument, QSyntaxHighlighter, QTextCharFormat, QStandardItemModel, QStandardItem, QColor, QDesktopServices, QMovie, QTextOption, QBrush, QTextCursor, QRegion
 
 # --- EXE Icon Extraction for PyQt ---
 def get_exe_icon_qicon(exe_path, size=32):
@@ -65,9 +65,356 @@ def get_exe_icon_qicon(exe_path, size=32):
     except Exception as e:
         print(f"[EXE-ICON] Failed to extract icon from {exe_path}: {e}")
         return QIcon()
+TEXT_THUMBNAIL_EXTENSIONS = ('.txt', '.md', '.log', '.ini', '.csv', '.json', '.xml', '.py', '.c', '.cpp', '.h', '.java', '.js', '.html', '.css')
+PDF_THUMBNAIL_EXTENSIONS = ('.pdf',)
+IMAGE_THUMBNAIL_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp', '.ico', '.svg')
+VIDEO_THUMBNAIL_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v')
+VIDEO_THUMBNAIL_SEEK_SECONDS = 3.0  # Fixed offset past black intro frames - avoids probing for the duration
+VIDEO_STORYBOARD_FRAMES = 8  # Frames per hover-scrub storyboard
+AUDIO_THUMBNAIL_EXTENSIONS = ('.wav', '.mp3', '.flac', '.ogg', '.oga', '.aac', '.m4a', '.wma', '.opus', '.aiff', '.alac')
+AUDIO_PEAK_COLUMNS = 512  # Waveform resolution kept in the cache; enough for any thumbnail size
+
+def cached_ffmpeg_path():
+    """find_ffmpeg(), looked up once per process"""
+    if not hasattr(cached_ffmpeg_path, 'path'):
+        cached_ffmpeg_path.path = find_ffmpeg()
+    return cached_ffmpeg_path.path
+
+def numpy_available():
+    """Whether numpy is installed, looked up once per process without importing it"""
+    if not hasattr(numpy_available, 'found'):
+        import importlib.util
+        numpy_available.found = importlib.util.find_spec('numpy') is not None
+    return numpy_available.found
+
+def render_text_pdf_pil_image(file_path, size=128, framed=True):
+    """
+    Render a thumbnail for a text or PDF file as a PIL image.
+    Safe to call from worker threads and worker processes (uses PIL/PyMuPDF only, no Qt objects).
+    Args:
+        file_path (str): Path to the text or PDF file.
+        size (int): Thumbnail size in pixels (default 128).
+        framed (bool): Center PDF pages on a size x size square; if False the page is returned as is.
+    Returns:
+        PIL.Image.Image: size x size image (at most size x size unframed), or None if the file is not
+        a text/PDF file or rendering failed.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+        if ext in TEXT_THUMBNAIL_EXTENSIONS:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                lines = []
+                for _ in range(8):
+                    try:
+                        lines.append(next(f).rstrip())
+                    except StopIteration:
+                        break
+            text = '\n'.join(lines)
+            img = Image.new('RGBA', (size, size), (255, 255, 255, 255))
+            draw = ImageDraw.Draw(img)
+            try:
+                font = ImageFont.truetype('arial.ttf', 12)
+            except Exception:
+                font = ImageFont.load_default()
+            try:
+                text_bbox = draw.multiline_textbbox((0, 0), text, font=font)
+                text_width = text_bbox[2] - text_bbox[0]
+                text_height = text_bbox[3] - text_bbox[1]
+            except AttributeError:
+                text_width, text_height = draw.textsize(text, font=font)
+            x = (size - text_width) // 2 if text_width < size else 4
+            y = (size - text_height) // 2 if text_height < size else 4
+            draw.multiline_text((x, y), text, fill=(0, 0, 0), font=font)
+            return img.resize((size, size), Image.LANCZOS)
+        elif ext in PDF_THUMBNAIL_EXTENSIONS:
+            page = pdf_document_pool.render_page(file_path, 0, size, size)
+            if page is not None and not framed:
+                return page.convert('RGBA')
+            if page is not None:
+                img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+                img.paste(page, ((size - page.width) // 2, (size - page.height) // 2))
+                return img
+    except Exception as e:
+        print(f"[THUMBNAIL-ERROR] Failed for {file_path}: {e}")
+    return None
+
+def render_text_pdf_thumbnail(file_path, size=128):
+    """
+    Render a thumbnail for a text or PDF file.
+    Safe to call from worker threads (uses PIL/PyMuPDF only, no Qt objects).
+    Args:
+        file_path (str): Path to the text or PDF file.
+        size (int): Thumbnail size in pixels (default 128).
+    Returns:
+        bytes: PNG bytes, or None if the file is not a text/PDF file or rendering failed.
+    """
+    img = render_text_pdf_pil_image(file_path, size)
+    if img is None:
+        return None
+    import io
+    buf = io.BytesIO()
+    img.save(buf, format='PNG')
+    return buf.getvalue()
+
+def render_image_thumbnail(file_path, size=128, framed=True):
+    """
+    Render a framed thumbnail for an image file, decoding it at (close to) the target scale.
+    QImageReader.setScaledSize lets the JPEG plugin downscale in the DCT domain, so a large
+    photo is never decoded at full resolution. Files Qt cannot read fall back to PIL, whose
+    draft() does the same for JPEGs.
+    Safe to call from worker threads (QImage/QImageReader only, no QPixmap).
+    Args:
+        file_path (str): Path to the image file.
+        size (int): Thumbnail size in pixels (default 128).
+        framed (bool): Frame it with frame_thumbnail_image; if False the decoded image is returned as is.
+    Returns:
+        QImage: size x size thumbnail with the image centered (at most size x size unframed),
+        or None if decoding failed.
+    """
+    image = None
+    try:
+        reader = QImageReader(file_path)
+        reader.setAutoTransform(True)
+        source_size = reader.size()
+        if source_size.isValid() and (source_size.width() > size or source_size.height() > size):
+            reader.setScaledSize(source_size.scaled(size, size, Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            print(f"[THUMBNAIL-IMAGE] QImageReader failed for {file_path}: {reader.errorString()}")
+            image = None
+    except Exception as e:
+        print(f"[THUMBNAIL-IMAGE] QImageReader error for {file_path}: {e}")
+    if image is None:
+        img = render_image_pil_image(file_path, size, framed)
+        return qimage_from_pil_image(img) if img is not None else None
+    if not framed:
+        if image.width() > size or image.height() > size:
+            image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return image
+    return frame_thumbnail_image(image, size)
+
+def frame_thumbnail_image(image, size=128, border=True):
+    """
+    Center an image on a transparent size x size square with a thin border around it,
+    scaling it down first if it does not fit. Safe to call from worker threads.
+    Args:
+        image (QImage): The thumbnail content.
+        size (int): Thumbnail size in pixels (default 128).
+        border (bool): Draw the border; only image thumbnails have one.
+    Returns:
+        QImage: The framed thumbnail, or None if image is empty.
+    """
+    if image.isNull() or image.width() == 0 or image.height() == 0:
+        return None
+    if image.width() > size or image.height() > size:
+        image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    framed = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    framed.fill(Qt.transparent)
+    painter = QPainter(framed)
+    x = (size - image.width()) // 2
+    y = (size - image.height()) // 2
+    painter.drawImage(x, y, image)
+    if border:
+        painter.setPen(QPen(Qt.lightGray, 1))
+        painter.drawRect(x, y, image.width() - 1, image.height() - 1)
+    painter.end()
+    return framed
+
+def render_image_pil_image(file_path, size=128, framed=True):
+    """
+    Render the same framed thumbnail as render_image_thumbnail, using PIL only.
+    JPEGs are decoded at reduced scale through draft(). Safe to call from worker processes.
+    Args:
+        file_path (str): Path to the image file.
+        size (int): Thumbnail size in pixels (default 128).
+        framed (bool): Frame it like render_image_thumbnail; if False the decoded image is returned as is.
+    Returns:
+        PIL.Image.Image: size x size RGBA image (at most size x size unframed), or None if decoding failed.
+    """
+    try:
+        from PIL import Image, ImageDraw, ImageOps
+        with Image.open(file_path) as img:
+            img.draft('RGB', (size, size))
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((size, size), Image.LANCZOS)
+            img = img.convert('RGBA')
+        if not framed:
+            return img
+        card = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+        x = (size - img.width) // 2
+        y = (size - img.height) // 2
+        card.paste(img, (x, y))
+        ImageDraw.Draw(card).rectangle([x, y, x + img.width - 1, y + img.height - 1], outline=(192, 192, 192, 255))
+        return card
+    except Exception as e:
+        print(f"[THUMBNAIL-IMAGE] PIL decode failed for {file_path}: {e}")
+        return None
+
+def qimage_from_pil_image(img):
+    """Convert a PIL image to a QImage that owns its pixels"""
+    img = img.convert('RGBA')
+    data = img.tobytes('raw', 'RGBA')
+    return QImage(data, img.width, img.height, img.width * 4, QImage.Format_RGBA8888).copy()
+
+def render_thumbnail_pixels(file_path, size=128, framed=True):
+    """
+    Process pool entry point: render a thumbnail and hand back raw RGBA pixels instead of PNG.
+    On POSIX the pixels travel through multiprocessing.shared_memory; the parent copies them
+    out and unlinks the block in ProcessPoolRenderBackend's done-callback. On Windows a block is freed as soon as its last handle closes,
+    so the pixels are returned in the (pickled) result instead.
+    Args:
+        file_path (str): Path to an image, text or PDF file.
+        size (int): Thumbnail size in pixels (default 128).
+        framed (bool): Passed on to render_image_pil_image / render_text_pdf_pil_image.
+    Returns:
+        tuple: (shared memory name or bytes, width, height), or None if rendering failed.
+    """
+    if os.path.splitext(file_path)[1].lower() in IMAGE_THUMBNAIL_EXTENSIONS:
+        img = render_image_pil_image(file_path, size, framed)
+    else:
+        img = render_text_pdf_pil_image(file_path, size, framed)
+    if img is None:
+        return None
+    data = img.convert('RGBA').tobytes('raw', 'RGBA')
+    if os.name == 'nt':
+        return (data, img.width, img.height)
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    shm.buf[:len(data)] = data
+    name = shm.name
+    shm.close()
+    return (name, img.width, img.height)
+
+def qimage_from_rendered_pixels(result):
+    """Build a QImage from a render_thumbnail_pixels() result, releasing its shared memory.
+    The pixels are copied once, out of the block, so that it can be unlinked right away."""
+    pixels, width, height = result
+    if isinstance(pixels, str):
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(name=pixels)
+        try:
+            image = QImage(shm.buf, width, height, width * 4, QImage.Format_RGBA8888).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+        return image
+    return QImage(pixels, width, height, width * 4, QImage.Format_RGBA8888).copy()
+
+def file_content_fingerprint(file_path, chunk_size=1024 * 1024):
+    """
+    Hash the contents of a file, so that byte-identical files can share one thumbnail.
+    Args:
+        file_path (str): Path to the file.
+        chunk_size (int): Bytes read at a time (default 1 MB).
+    Returns:
+        str: Hex BLAKE2b digest, or None on error.
+    """
+    try:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError as e:
+        print(f"[THUMBNAIL-CACHE] Could not fingerprint {file_path}: {e}")
+        return None
+
+def folder_preview_images(folder_path, limit=4):
+    """
+    Pick the image files shown on a folder's icon: the first `limit` visible images in the folder.
+    Uses os.scandir so no extra stat() calls are made for entries that are not images.
+    Args:
+        folder_path (str): Path to the folder.
+        limit (int): Maximum number of images to return (default 4).
+    Returns:
+        list: Paths of up to `limit` image files, or an empty list if the folder cannot be read.
+    """
+    # Platform-specific image extensions for folder previews
+    image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp'}
+    # Add more extensions for non-macOS systems
+    if not PlatformUtils.is_macos():
+        image_extensions.update({'.tiff', '.tif', '.webp', '.ico'})
+    image_files = []
+    try:
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if len(image_files) >= limit:
+                    break
+                name = entry.name
+                if PlatformUtils.is_windows():
+                    if name.lower() in ('thumbs.db', 'desktop.ini'):
+                        continue
+                elif name.startswith('.'):
+                    continue  # Hidden files, and ._ resource forks on macOS
+                if os.path.splitext(name)[1].lower() not in image_extensions:
+                    continue
+                try:
+                    # Same 50MB limit as IconWidget.is_safe_image_file
+                    if entry.is_file() and entry.stat().st_size <= 50 * 1024 * 1024:
+                        image_files.append(entry.path)
+                except OSError:
+                    continue
+    except (OSError, PermissionError):
+        return []
+    return image_files
+
+def render_folder_overlay(folder_path, size, child_thumbnail, image_files=None):
+    """
+    Render the image previews that IconWidget draws over a folder icon, on a transparent background.
+    The folder icon itself is not included - QFileIconProvider only works on the UI thread.
+    Safe to call from worker threads (QImage/QPainter only, no QPixmap).
+    Args:
+        folder_path (str): Path to the folder.
+        size (int): Size of the folder icon in pixels.
+        child_thumbnail (callable): child_thumbnail(image_path, preview_size) returning a QImage or None,
+            e.g. ThumbnailCache.render so that children's cached thumbnails are reused.
+        image_files (list): The images to preview, if the caller already has folder_preview_images(folder_path).
+    Returns:
+        QImage: size x size overlay, fully transparent if the folder has no images.
+    """
+    overlay = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    overlay.fill(Qt.transparent)
+    if image_files is None:
+        image_files = folder_preview_images(folder_path)
+    if not image_files:
+        return overlay
+    preview_size = max(8, size // 4)  # Ensure minimum size, each preview is 1/4 the size
+    positions = [
+        (size - preview_size - 2, 2),  # Top right
+        (size - preview_size - 2, preview_size + 4),  # Middle right
+        (size - preview_size * 2 - 4, 2),  # Top, second from right
+        (size - preview_size * 2 - 4, preview_size + 4)  # Middle, second from right
+    ]
+    painter = QPainter(overlay)
+    painter.setRenderHint(QPainter.Antialiasing)
+    try:
+        for i, img_path in enumerate(image_files):
+            try:
+                thumbnail = child_thumbnail(img_path, preview_size)
+                if thumbnail is None or thumbnail.isNull():
+                    continue
+                if thumbnail.width() > preview_size or thumbnail.height() > preview_size:
+                    thumbnail = thumbnail.scaled(preview_size, preview_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                pos_x, pos_y = positions[i]
+                # White frame with the thumbnail centered in it and a border around it
+                painter.fillRect(pos_x, pos_y, preview_size, preview_size, Qt.white)
+                painter.drawImage(pos_x + (preview_size - thumbnail.width()) // 2,
+                                  pos_y + (preview_size - thumbnail.height()) // 2, thumbnail)
+                painter.setPen(QPen(Qt.darkGray, 1))
+                painter.drawRect(pos_x, pos_y, preview_size - 1, preview_size - 1)
+            except Exception:
+                continue  # Skip this image if there's an error
+    finally:
+        painter.end()
+    return overlay
+
 def precache_text_pdf_thumbnails_in_directory(directory, thumbnail_cache, size=128, max_workers=4):
     """
     Pre-cache thumbnails for text and PDF files in a directory in the background.
+    Returns immediately; the files are rendered by a thread pool that shuts itself
+    down once all of them are done. Use ThumbnailScheduler when the results need
+    to reach the UI in viewport order.
     Args:
         directory (str): Path to the directory to scan for files.
         thumbnail_cache (ThumbnailCache): The thumbnail cache instance to use.
@@ -76,97 +423,26 @@ def precache_text_pdf_thumbnails_in_directory(directory, thumbnail_cache, size=1
     """
     import glob
     import concurrent.futures
-    text_exts = ('.txt', '.md', '.log', '.ini', '.csv', '.json', '.xml', '.py', '.c', '.cpp', '.h', '.java', '.js', '.html', '.css')
-    pdf_exts = ('.pdf',)
-    docx_exts = ('.docx', '.doc')
-    audio_exts = ('.wav', '.mp3', '.flac', '.ogg', '.oga', '.aac', '.m4a', '.wma', '.opus', '.aiff', '.alac')
     print(f"[THUMBNAIL-PRECACHE] Called for directory={directory} size={size}")
-    files = [f for f in glob.glob(os.path.join(directory, '*')) if os.path.splitext(f)[1].lower() in text_exts + pdf_exts + docx_exts + audio_exts]
-    print(f"[THUMBNAIL-PRECACHE] Found {len(files)} files to process: {files}")
+    files = [f for f in glob.glob(os.path.join(directory, '*')) if os.path.splitext(f)[1].lower() in TEXT_THUMBNAIL_EXTENSIONS + PDF_THUMBNAIL_EXTENSIONS]
     def cache_one_file(file_path):
-        ext = os.path.splitext(file_path)[1].lower()
-        print(f"[THUMBNAIL-PRECACHE] Processing {file_path} (ext={ext})")
-        if thumbnail_cache.get(file_path, size) is not None:
-            print(f"[THUMBNAIL-PRECACHE] Already cached: {file_path}")
-            return
-        try:
-            from PIL import Image, ImageDraw, ImageFont
-            import io
-            if ext in text_exts:
-                print(f"[THUMBNAIL-PRECACHE] Generating text thumbnail for {file_path}")
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = []
-                    for _ in range(8):
-                        try:
-                            lines.append(next(f).rstrip())
-                        except StopIteration:
-                            break
-                text = '\n'.join(lines)
-                img = Image.new('RGBA', (size, size), (255, 255, 255, 255))
-                draw = ImageDraw.Draw(img)
-                try:
-                    font = ImageFont.truetype('arial.ttf', 12)
-                except Exception:
-                    font = ImageFont.load_default()
-                try:
-                    text_bbox = draw.multiline_textbbox((0, 0), text, font=font)
-                    text_width = text_bbox[2] - text_bbox[0]
-                    text_height = text_bbox[3] - text_bbox[1]
-                except AttributeError:
-                    text_width, text_height = draw.textsize(text, font=font)
-                x = (size - text_width) // 2 if text_width < size else 4
-                y = (size - text_height) // 2 if text_height < size else 4
-                draw.multiline_text((x, y), text, fill=(0, 0, 0), font=font)
-                img = img.resize((size, size), Image.LANCZOS)
-                buf = io.BytesIO()
-                img.save(buf, format='PNG')
-                png_bytes = buf.getvalue()
-                print(f"[THUMBNAIL-PRECACHE] About to cache text thumbnail for {file_path}, {len(png_bytes)} bytes")
-                thumbnail_cache.put(file_path, size, png_bytes)
-                print(f"[THUMBNAIL-PRECACHE] Cached text thumbnail for {file_path}")
-            elif ext in pdf_exts:
-                print(f"[THUMBNAIL-PRECACHE] Generating PDF thumbnail for {file_path}")
-                import fitz  # PyMuPDF
-                doc = fitz.open(file_path)
-                if doc.page_count > 0:
-                    page = doc.load_page(0)
-                    zoom = max(size / 72, 2)
-                    mat = fitz.Matrix(zoom, zoom)
-                    pix = page.get_pixmap(matrix=mat)
-                    img = Image.frombytes('RGB', [pix.width, pix.height], pix.samples)
-                    img = img.resize((size, size), Image.LANCZOS)
-                    buf = io.BytesIO()
-                    img.save(buf, format='PNG')
-                    png_bytes = buf.getvalue()
-                    print(f"[THUMBNAIL-PRECACHE] About to cache PDF thumbnail for {file_path}, {len(png_bytes)} bytes")
-                    thumbnail_cache.put(file_path, size, png_bytes)
-                    print(f"[THUMBNAIL-PRECACHE] Cached PDF thumbnail for {file_path}")
-        except Exception as e:
-            print(f"[THUMBNAIL-ERROR] Failed for {file_path}: {e}")
+        thumbnail_cache.render(file_path, size)
     print(f"[THUMBNAIL-PRECACHE] Starting cache thread pool for {len(files)} files")
-    import concurrent.futures
     executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
-    futures = []
     for file_path in files:
-        futures.append(executor.submit(cache_one_file, file_path))
-    for future in futures:
-        future.result()
+        executor.submit(cache_one_file, file_path)
+    # Don't wait for the results - let the pool finish and exit on its own
+    executor.shutdown(wait=False)
 def clear_text_pdf_docx_thumbnails(directory, thumbnail_cache, size=128):
     """Delete cached thumbnails for text/pdf/docx files at the given size in the directory."""
     import glob
+    size = ThumbnailCache.master_size(size)  # Only masters are stored; smaller sizes are derived from them
     text_exts = ('.txt', '.md', '.log', '.ini', '.csv', '.json', '.xml', '.py', '.c', '.cpp', '.h', '.java', '.js', '.html', '.css')
     pdf_exts = ('.pdf',)
     docx_exts = ('.docx', '.doc')
     files = [f for f in glob.glob(os.path.join(directory, '*')) if os.path.splitext(f)[1].lower() in text_exts + pdf_exts + docx_exts]
     for file_path in files:
-        cache_key = thumbnail_cache.get_cache_key(file_path, size)
-        cache_file = os.path.join(thumbnail_cache.cache_dir, f"{cache_key}.thumb")
-        if os.path.exists(cache_file):
-            try:
-                os.remove(cache_file)
-                print(f"[THUMBNAIL-CLEAR] Removed {cache_file}")
-            except Exception as e:
-                print(f"[THUMBNAIL-CLEAR] Failed to remove {cache_file}: {e}")
+        thumbnail_cache.invalidate(file_path, size)
         if thumbnail_cache.get(file_path, size) is not None:
             return  # Already cached
         ext = os.path.splitext(file_path)[1].lower()
@@ -207,15 +483,8 @@ def clear_text_pdf_docx_thumbnails(directory, thumbnail_cache, size=128):
                     print(f"[THUMBNAIL-ERROR] Text thumbnail failed for {file_path}: {e}")
             elif ext in pdf_exts:
                 try:
-                    import fitz  # PyMuPDF
-                    doc = fitz.open(file_path)
-                    if doc.page_count > 0:
-                        page = doc.load_page(0)
-                        zoom = max(size / 72, 2)
-                        mat = fitz.Matrix(zoom, zoom)
-                        pix = page.get_pixmap(matrix=mat)
-                        img = Image.frombytes('RGB', [pix.width, pix.height], pix.samples)
-                        img = img.resize((size, size), Image.LANCZOS)
+                    img = render_text_pdf_pil_image(file_path, size)
+                    if img is not None:
                         buf = io.BytesIO()
                         img.save(buf, format='PNG')
                         png_bytes = buf.getvalue()
@@ -407,111 +676,275 @@ class OpenWithDialog(QDialog):
             import traceback
             print(f"[OPENWITH-DIALOG-ERROR] {e}\n{traceback.format_exc()}")
         return None
-def precache_video_thumbnails_in_directory(directory, thumbnail_cache, size=128, max_workers=4):
-    import sys
-    import platform
-    # Use robust ffmpeg finder for macOS
-    if sys.platform == 'darwin':
-        ffmpeg_path = find_ffmpeg()
-        if not ffmpeg_path:
-            print('[ERROR] ffmpeg not found in PATH or common locations. Please install ffmpeg and ensure it is available in your PATH.')
-            print('[ERROR] On macOS, you may need to launch your app from a terminal to inherit PATH, or set PATH in your environment.')
-            print('[ERROR] You can also set the FFMPEG_PATH environment variable to the full path of ffmpeg.')
-            return
-    else:
-        ffmpeg_path = shutil.which('ffmpeg')
-        if not ffmpeg_path:
-            print('[ERROR] ffmpeg not found in PATH. Please install ffmpeg and ensure it is available in your PATH.')
-            return
+def render_video_thumbnail(video_path, size=128, ffmpeg_path=None, seek_time=VIDEO_THUMBNAIL_SEEK_SECONDS, padded=True):
     """
-    Pre-cache video thumbnails for all video files in a directory in the background.
+    Extract one frame of a video as a size x size thumbnail with a single ffmpeg run.
+    Seeks on the input side and decodes keyframes only, so ffmpeg reads and decodes a
+    single frame. Scaling and letterboxing happen inside ffmpeg, and raw RGBA comes back
+    over stdout - no probe, no temporary files, no re-encoding.
+    Safe to call from worker threads (QImage only, no QPixmap).
     Args:
-        directory (str): Path to the directory to scan for videos.
-        thumbnail_cache (ThumbnailCache): The thumbnail cache instance to use.
+        video_path (str): Path to the video file.
         size (int): Thumbnail size in pixels (default 128).
-        max_workers (int): Number of threads for parallel extraction.
+        ffmpeg_path (str): ffmpeg executable, defaults to cached_ffmpeg_path().
+        seek_time (float): Offset in seconds; videos shorter than this use their first keyframe.
+        padded (bool): Letterbox the frame onto a transparent size x size square; if False the
+            scaled frame is returned as is.
+    Returns:
+        QImage: size x size thumbnail (at most size x size unpadded), or None if ffmpeg is missing
+        or extraction failed.
     """
-    import glob
-    import concurrent.futures
-    video_exts = ('.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v')
-    video_files = [f for f in glob.glob(os.path.join(directory, '*')) if os.path.splitext(f)[1].lower() in video_exts]
-    import shutil
-    import platform
-    ffmpeg_path = shutil.which('ffmpeg')
+    import subprocess
+    ffmpeg_path = ffmpeg_path or cached_ffmpeg_path()
     if not ffmpeg_path:
-        print('[ERROR] ffmpeg not found in PATH. Please install ffmpeg and ensure it is available in your PATH.')
-        if platform.system() == 'Darwin':
-            print('[ERROR] On macOS, you may need to launch your app from a terminal to inherit PATH, or set PATH in your environment.')
-        return
-    def cache_one_video(video_path):
-        if thumbnail_cache.get(video_path, size) is not None:
-            print(f'[THUMBNAIL] Already cached: {video_path}')
-            return
+        return None
+    frame_bytes = size * size * 4
+    if padded:
+        video_filter = (f'scale={size}:{size}:force_original_aspect_ratio=decrease,format=rgba,'
+                        f'pad={size}:{size}:(ow-iw)/2:(oh-ih)/2:color=0x00000000')
+        output = ['-f', 'rawvideo', '-pix_fmt', 'rgba']
+    else:
+        # The scaled frame size is not known up front, so ask for a PPM, which carries it in its header
+        video_filter = f'scale={size}:{size}:force_original_aspect_ratio=decrease'
+        output = ['-f', 'image2pipe', '-c:v', 'ppm', '-pix_fmt', 'rgb24']
+    for offset in (seek_time, 0) if seek_time > 0 else (0,):
+        command = [ffmpeg_path, '-v', 'error', '-nostdin',
+                   '-skip_frame', 'nokey', '-noaccurate_seek', '-ss', str(offset), '-i', video_path,
+                   '-map', '0:v:0', '-frames:v', '1', '-vf', video_filter] + output + ['pipe:1']
         try:
-            import ffmpeg
-            from PIL import Image
-            import tempfile
-            print(f'[THUMBNAIL] Probing video: {video_path}')
-            # Use ffmpeg-python with custom ffmpeg path if needed
-            probe = ffmpeg.probe(video_path, cmd=ffmpeg_path)
-            duration = float(probe['format'].get('duration', 0))
-            if duration == 0:
-                print(f'[THUMBNAIL-ERROR] Could not determine duration for {video_path}')
-                return
-            seek_time = max(duration * 0.1, 1.0)
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-                tmp_path = tmp.name
-            print(f'[THUMBNAIL] Extracting frame at {seek_time:.2f}s to {tmp_path}')
-            (
-                ffmpeg
-                .input(video_path, ss=seek_time)
-                .output(tmp_path, vframes=1, format='image2', vcodec='mjpeg')
-                .overwrite_output()
-                .run(cmd=ffmpeg_path, quiet=False, capture_stdout=True, capture_stderr=True)
-            )
-            if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
-                print(f'[THUMBNAIL-ERROR] ffmpeg did not produce a valid thumbnail for {video_path}')
-                return
-            try:
-                img = Image.open(tmp_path)
-                img = img.convert('RGBA').resize((size, size), Image.LANCZOS)
-                img.save(tmp_path)
-            except Exception as e:
-                print(f'[THUMBNAIL-ERROR] PIL failed to process thumbnail for {video_path}: {e}')
-                os.remove(tmp_path)
-                return
-            qimg = QPixmap(tmp_path)
-            if qimg.isNull():
-                print(f'[THUMBNAIL-ERROR] QPixmap failed to load thumbnail for {video_path} (trying QImage fallback)')
-                from PyQt5.QtGui import QImage
-                try:
-                    img_fallback = QImage(tmp_path)
-                    if not img_fallback.isNull():
-                        qimg = QPixmap.fromImage(img_fallback)
-                        print(f'[THUMBNAIL-DEBUG] QImage fallback succeeded for {video_path}')
-                    else:
-                        print(f'[THUMBNAIL-ERROR] QImage fallback also failed for {video_path}')
-                        os.remove(tmp_path)
-                        return
-                except Exception as e:
-                    print(f'[THUMBNAIL-ERROR] Exception in QImage fallback for {video_path}: {e}')
-                    os.remove(tmp_path)
-                    return
-            os.remove(tmp_path)
-            thumbnail_cache.put(video_path, size, qimg)
-            print(f'[THUMBNAIL] Cached video thumbnail for {video_path}')
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=15,
+                                    creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
         except Exception as e:
-            import traceback
-            print(f'[THUMBNAIL-ERROR] Exception for {video_path}: {e}')
-            traceback.print_exc()
-    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
-    for video_path in video_files:
-        executor.submit(cache_one_video, video_path)
-    # Optionally, shutdown executor in background after all tasks are done
-    def shutdown_executor():
-        executor.shutdown(wait=True)
-    import threading
-    threading.Thread(target=shutdown_executor, daemon=True).start()
+            print(f'[THUMBNAIL-VIDEO] ffmpeg failed for {video_path}: {e}')
+            return None
+        if padded and len(result.stdout) >= frame_bytes:
+            return QImage(result.stdout[:frame_bytes], size, size, size * 4, QImage.Format_RGBA8888).copy()
+        if not padded and result.stdout:
+            image = QImage.fromData(result.stdout, 'PPM')
+            if not image.isNull():
+                return image
+        # No frame past the offset - the video is shorter than seek_time, retry from the start
+    print(f'[THUMBNAIL-VIDEO] No frame extracted from {video_path}: {result.stderr.decode(errors="ignore").strip()[:200]}')
+    return None
+
+def probe_video_duration(video_path, ffmpeg_path=None):
+    """
+    Read a video's duration from its container header (ffmpeg -i, nothing is decoded).
+    Args:
+        video_path (str): Path to the video file.
+        ffmpeg_path (str): ffmpeg executable, defaults to cached_ffmpeg_path().
+    Returns:
+        float: Duration in seconds, or None if it is unknown.
+    """
+    import subprocess
+    import re
+    ffmpeg_path = ffmpeg_path or cached_ffmpeg_path()
+    if not ffmpeg_path:
+        return None
+    try:
+        result = subprocess.run([ffmpeg_path, '-hide_banner', '-nostdin', '-i', video_path],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=15,
+                                creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+    except Exception as e:
+        print(f'[THUMBNAIL-VIDEO] Could not read duration of {video_path}: {e}')
+        return None
+    match = re.search(rb'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', result.stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def render_video_storyboard(video_path, size=128, frames=VIDEO_STORYBOARD_FRAMES, ffmpeg_path=None):
+    """
+    Extract `frames` evenly spaced frames of a video as one sprite sheet, in a single ffmpeg pass.
+    Only keyframes are decoded; select keeps the first keyframe of each interval and tile
+    lays them out side by side, so the cost is one sequential read instead of `frames` seeks.
+    Safe to call from worker threads (QImage only, no QPixmap).
+    Args:
+        video_path (str): Path to the video file.
+        size (int): Size of each (square, letterboxed) frame in pixels (default 128).
+        frames (int): Number of frames in the storyboard.
+        ffmpeg_path (str): ffmpeg executable, defaults to cached_ffmpeg_path().
+    Returns:
+        QImage: (frames * size) x size sprite sheet, or None if extraction failed.
+    """
+    import subprocess
+    ffmpeg_path = ffmpeg_path or cached_ffmpeg_path()
+    duration = probe_video_duration(video_path, ffmpeg_path)
+    if not duration:
+        return None
+    interval = duration / frames
+    video_filter = (f"select='isnan(prev_selected_t)+gte(t-prev_selected_t\\,{interval:.3f})',"
+                    f'scale={size}:{size}:force_original_aspect_ratio=decrease,format=rgba,'
+                    f'pad={size}:{size}:(ow-iw)/2:(oh-ih)/2:color=0x00000000,'
+                    f'tile={frames}x1:color=0x00000000')
+    command = [ffmpeg_path, '-v', 'error', '-nostdin', '-skip_frame', 'nokey', '-i', video_path,
+               '-map', '0:v:0', '-an', '-vf', video_filter, '-frames:v', '1',
+               '-f', 'rawvideo', '-pix_fmt', 'rgba', 'pipe:1']
+    try:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=120,
+                                creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+    except Exception as e:
+        print(f'[THUMBNAIL-VIDEO] Storyboard extraction failed for {video_path}: {e}')
+        return None
+    width = size * frames
+    if len(result.stdout) < width * size * 4:
+        print(f'[THUMBNAIL-VIDEO] No storyboard extracted from {video_path}: {result.stderr.decode(errors="ignore").strip()[:200]}')
+        return None
+    return QImage(result.stdout[:width * size * 4], width, size, width * 4, QImage.Format_RGBA8888).copy()
+
+def _audio_pcm_chunks_wave(audio_path, chunk_frames):
+    """Yield interleaved PCM chunks of a WAV file as int16 numpy arrays (the wave module reads PCM only)"""
+    import wave
+    import numpy as np
+    with wave.open(audio_path, 'rb') as wav:
+        width = wav.getsampwidth()
+        if width not in (1, 2, 3, 4):
+            raise wave.Error(f"unsupported sample width {width}")
+        while True:
+            data = wav.readframes(chunk_frames)
+            if not data:
+                break
+            if width == 1:  # Unsigned 8-bit
+                samples = (np.frombuffer(data, dtype=np.uint8).astype(np.int16) - 128) << 8
+            elif width == 2:
+                samples = np.frombuffer(data, dtype='<i2')
+            elif width == 3:  # Keep the top two bytes of each little-endian 24-bit sample
+                raw = np.frombuffer(data[:len(data) - len(data) % 3], dtype=np.uint8).reshape(-1, 3)
+                samples = raw[:, 1].astype(np.uint16) | (raw[:, 2].astype(np.uint16) << 8)
+                samples = samples.view(np.int16)
+            else:
+                samples = (np.frombuffer(data, dtype='<i4') >> 16).astype(np.int16)
+            yield samples
+
+def _audio_pcm_chunks_ffmpeg(audio_path, chunk_frames, ffmpeg_path):
+    """Yield mono 8 kHz PCM chunks of any audio file ffmpeg can decode, streamed over a pipe"""
+    import subprocess
+    import numpy as np
+    command = [ffmpeg_path, '-v', 'error', '-nostdin', '-i', audio_path, '-map', '0:a:0', '-vn',
+               '-ac', '1', '-ar', '8000', '-f', 's16le', '-acodec', 'pcm_s16le', 'pipe:1']
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                               creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+    try:
+        leftover = b''
+        while True:
+            data = process.stdout.read(chunk_frames * 2)
+            if not data:
+                break
+            data = leftover + data
+            usable = len(data) - len(data) % 2
+            leftover = data[usable:]
+            yield np.frombuffer(data[:usable], dtype='<i2')
+    finally:
+        process.stdout.close()
+        process.kill()
+        process.wait()
+
+def decode_audio_peaks(audio_path, columns=AUDIO_PEAK_COLUMNS, ffmpeg_path=None, chunk_frames=65536):
+    """
+    Reduce an audio file to `columns` (min, max) sample pairs for drawing its waveform.
+    The audio is streamed in fixed-size chunks, each reduced to per-block peaks with numpy.
+    When the block peaks outgrow 4 * columns, neighbouring pairs are merged and the block
+    size doubles, so memory stays bounded however long the recording is.
+    WAV files are read with the wave module; everything else is decoded by ffmpeg.
+    Args:
+        audio_path (str): Path to the audio file.
+        columns (int): Number of peak pairs to return (default AUDIO_PEAK_COLUMNS).
+        ffmpeg_path (str): ffmpeg executable, defaults to cached_ffmpeg_path().
+        chunk_frames (int): Samples read per chunk.
+    Returns:
+        numpy.ndarray: int16 array of shape (n, 2) holding (min, max) with n <= columns, or None.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("[THUMBNAIL-AUDIO] numpy is not installed, no waveform thumbnails")
+        return None
+    chunks = None
+    if os.path.splitext(audio_path)[1].lower() == '.wav':
+        try:
+            import wave
+            with wave.open(audio_path, 'rb') as wav:
+                channels = wav.getnchannels()
+            chunks = _audio_pcm_chunks_wave(audio_path, chunk_frames)
+        except Exception as e:
+            print(f"[THUMBNAIL-AUDIO] wave module cannot read {audio_path} ({e}), trying ffmpeg")
+    if chunks is None:
+        ffmpeg_path = ffmpeg_path or cached_ffmpeg_path()
+        if not ffmpeg_path:
+            return None
+        channels = 1
+        chunks = _audio_pcm_chunks_ffmpeg(audio_path, chunk_frames, ffmpeg_path)
+    block = 64 * channels  # Whole frames, so every channel is in each block
+    limit = 4 * columns
+    mins, maxs = np.empty(0, dtype=np.int16), np.empty(0, dtype=np.int16)
+    pending = np.empty(0, dtype=np.int16)
+    try:
+        for samples in chunks:
+            pending = np.concatenate((pending, samples)) if len(pending) else samples
+            usable = len(pending) - len(pending) % block
+            if usable:
+                blocks = pending[:usable].reshape(-1, block)
+                mins = np.concatenate((mins, blocks.min(axis=1)))
+                maxs = np.concatenate((maxs, blocks.max(axis=1)))
+                pending = pending[usable:]
+            while len(mins) > limit:
+                if len(mins) % 2:  # Keep the odd one out for the next merge
+                    mins, maxs = np.append(mins, mins[-1]), np.append(maxs, maxs[-1])
+                mins = mins.reshape(-1, 2).min(axis=1)
+                maxs = maxs.reshape(-1, 2).max(axis=1)
+                block *= 2
+    except Exception as e:
+        print(f"[THUMBNAIL-AUDIO] Could not decode {audio_path}: {e}")
+        return None
+    if len(pending):
+        mins, maxs = np.append(mins, pending.min()), np.append(maxs, pending.max())
+    if not len(mins):
+        return None
+    if len(mins) > columns:
+        starts = np.linspace(0, len(mins), columns, endpoint=False).astype(np.intp)
+        mins, maxs = np.minimum.reduceat(mins, starts), np.maximum.reduceat(maxs, starts)
+    return np.stack((mins, maxs), axis=1).astype(np.int16)
+
+def render_audio_waveform(peaks, size=128):
+    """
+    Draw a waveform thumbnail from decode_audio_peaks() output, rasterized with numpy.
+    Safe to call from worker threads (QImage only, no QPixmap).
+    Args:
+        peaks (numpy.ndarray): int16 array of (min, max) pairs.
+        size (int): Thumbnail size in pixels (default 128).
+    Returns:
+        QImage: size x size thumbnail: the waveform on a white card centered on transparency.
+    """
+    import numpy as np
+    width = size - 2
+    height = max(2, (size * 5 // 8) // 2 * 2)  # Landscape card, even so the centre line is exact
+    inner = width - 2
+    # Map peaks to pixel columns: reduce when there are more peaks than columns, repeat when fewer
+    if len(peaks) >= inner:
+        starts = np.linspace(0, len(peaks), inner, endpoint=False).astype(np.intp)
+        lows = np.minimum.reduceat(peaks[:, 0], starts)
+        highs = np.maximum.reduceat(peaks[:, 1], starts)
+    else:
+        index = np.arange(inner) * len(peaks) // inner
+        lows, highs = peaks[index, 0], peaks[index, 1]
+    half = (height - 2) / 2.0
+    centre = 1 + half
+    top = np.floor(centre - highs.astype(np.float32) / 32768.0 * half).astype(np.int32)
+    bottom = np.ceil(centre - lows.astype(np.float32) / 32768.0 * half).astype(np.int32)
+    rows = np.arange(height, dtype=np.int32)[:, None]
+    wave_mask = np.zeros((height, width), dtype=bool)
+    wave_mask[:, 1:-1] = (rows >= top[None, :]) & (rows <= bottom[None, :])
+    wave_mask[int(centre), 1:-1] = True  # Silence still shows a line
+    card = np.empty((height, width, 4), dtype=np.uint8)
+    card[:] = (255, 255, 255, 255)
+    card[wave_mask] = (46, 139, 87, 255)
+    card[[0, -1], :] = (211, 211, 211, 255)  # Qt.lightGray border, like image thumbnails
+    card[:, [0, -1]] = (211, 211, 211, 255)
+    framed = np.zeros((size, size, 4), dtype=np.uint8)
+    x, y = (size - width) // 2, (size - height) // 2
+    framed[y:y + height, x:x + width] = card
+    return QImage(framed.tobytes(), size, size, size * 4, QImage.Format_RGBA8888).copy()
 
 #!/usr/bin/env python3
 """
@@ -598,7 +1031,13 @@ import threading
 import gc
 import hashlib
 import pickle
+import heapq
+import stat
+import struct
 import tempfile
+from array import array
+from itertools import compress
+from operator import itemgetter
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict, OrderedDict
@@ -609,6 +1048,7 @@ import fnmatch
 import zipfile
 import tarfile
 import gzip
+import zlib
 import tempfile
 from pathlib import Path
 from PyQt5.QtWidgets import (
@@ -618,10 +1058,10 @@ from PyQt5.QtWidgets import (
     QDialog, QLineEdit, QRadioButton, QButtonGroup, QTextEdit, QCheckBox, QStatusBar, QShortcut,
     QComboBox, QToolBar, QFrame, QSlider, QSpinBox, QTabWidget, QPlainTextEdit, QHeaderView, QProgressBar,
     QGroupBox, QTableWidget, QTableWidgetItem, QListWidget, QListWidgetItem, QProgressDialog, QStyle,
-    QTabBar, QStackedWidget, QMdiArea, QMdiSubWindow, QFileDialog, QLayout, QDateEdit, QSpacerItem,
-    QStyledItemDelegate, QFormLayout
+    QTabBar, QStackedWidget, QMdiArea, QMdiSubWindow, QFileDialog, QDateEdit, QSpacerItem,
+    QStyledItemDelegate, QFormLayout, QAbstractItemView, QRubberBand
 )
-from PyQt5.QtCore import QDir, Qt, pyqtSignal, QFileInfo, QPoint, QRect, QTimer, QThread, QStringListModel, QSortFilterProxyModel, QModelIndex, QSize, QMimeData, QUrl, QEvent, QObject, QMutex, QWaitCondition, QDate
+from PyQt5.QtCore import QDir, Qt, pyqtSignal, QFileInfo, QPoint, QRect, QTimer, QThread, QStringListModel, QSortFilterProxyModel, QModelIndex, QAbstractListModel, QAbstractTableModel, QItemSelection, QItemSelectionModel, QSize, QMimeData, QUrl, QObject, QMutex, QWaitCondition, QDate
 
 
 def format_filename_with_underscore_wrap(filename, max_length_before_wrap=20):
@@ -1503,6 +1943,35 @@ class PlatformUtils:
         """Get user's home directory in a cross-platform way"""
         return os.path.expanduser("~")
     
+    @staticmethod
+    def get_cache_directory():
+        """Get the persistent per-user cache directory for garysfm (survives reboots, unlike the temp dir)"""
+        home = os.path.expanduser("~")
+        if PlatformUtils.is_windows():
+            base = os.environ.get('LOCALAPPDATA') or os.path.join(home, 'AppData', 'Local')
+        elif PlatformUtils.is_macos():
+            base = os.path.join(home, 'Library', 'Caches')
+        else:
+            # XDG Base Directory spec: $XDG_CACHE_HOME, defaulting to ~/.cache
+            base = os.environ.get('XDG_CACHE_HOME') or os.path.join(home, '.cache')
+        return os.path.join(base, 'garysfm')
+    
+    @staticmethod
+    def set_current_thread_idle_priority():
+        """Lower the calling thread to idle priority, so it only runs when nothing else wants the CPU"""
+        try:
+            if PlatformUtils.is_windows():
+                import ctypes
+                THREAD_PRIORITY_IDLE = -15
+                kernel32 = ctypes.windll.kernel32
+                kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_IDLE)
+            elif PlatformUtils.is_linux():
+                # On Linux a thread id is a valid PRIO_PROCESS target and only affects that thread
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+            # macOS has no per-thread nice value; the work is batched and interruptible anyway
+        except Exception as e:
+            print(f"[PLATFORM] Could not lower thread priority: {e}")
+    
     @staticmethod
     def get_documents_directory():
         """Get user's documents directory"""
@@ -1600,274 +2069,1970 @@ class PlatformUtils:
                 return os.path.join(home, "Desktop")
 
 # Performance & Memory Optimization Classes
-class ThumbnailCache:
-    """Persistent disk-based thumbnail cache for performance optimization with thread safety"""
+class PdfDocumentPool:
+    """Small LRU of open PyMuPDF documents, shared by the thumbnailer and the preview pane.
+    
+    Flipping through pages of the same PDF reuses the open document instead of reparsing
+    the file. Evicted documents are always closed, and a document whose file changed on
+    disk is reopened. A PyMuPDF document must not be used by two threads at once, so every
+    document has its own lock; the pool lock only guards the LRU itself, and a slow PDF
+    never holds up renders of the others.
+    """
     
-    def __init__(self, cache_dir=None):
-        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'garysfm_thumbnails')
-        self.memory_cache = OrderedDict()  # LRU cache in memory
-        self.max_memory_cache = 200  # Reduced from 500 to 200 for better memory usage
-        self.cleanup_started = False  # Flag to track cleanup thread
-        
-        # Add thread safety with lock
-        import threading
-        self._lock = threading.RLock()  # Reentrant lock for nested calls
-        
-        os.makedirs(self.cache_dir, exist_ok=True)
-        
-        # Cache metadata file
-        self.metadata_file = os.path.join(self.cache_dir, 'cache_metadata.json')
-        self.metadata = self._load_metadata()
-        
-        # Don't start cleanup thread automatically to avoid exit hanging
-        # self._start_cleanup_thread()
+    def __init__(self, max_documents=4):
+        self.max_documents = max_documents
+        self._documents = OrderedDict()  # path -> [mtime, fitz.Document or None, lock, closed]
+        self._lock = threading.Lock()
+    
+    def _checkout(self, file_path):
+        """Get the pool entry of file_path with its lock held and its document open.
+        The caller releases entry[2]; opening and closing happen outside the pool lock."""
+        mtime = os.path.getmtime(file_path)
+        while True:
+            evicted = []
+            with self._lock:
+                entry = self._documents.get(file_path)
+                if entry is not None and entry[0] == mtime:
+                    self._documents.move_to_end(file_path)
+                else:
+                    if entry is not None:
+                        evicted.append(self._documents.pop(file_path))
+                    entry = [mtime, None, threading.Lock(), False]
+                    self._documents[file_path] = entry
+                    while len(self._documents) > self.max_documents:
+                        evicted.append(self._documents.pop(next(iter(self._documents))))
+            for old in evicted:
+                self._close(old)
+            entry[2].acquire()
+            if entry[3]:
+                entry[2].release()  # Evicted before we got it - check out a fresh entry
+                continue
+            if entry[1] is None:
+                try:
+                    import fitz  # PyMuPDF
+                    entry[1] = fitz.open(file_path)
+                except Exception:
+                    entry[2].release()
+                    with self._lock:
+                        if self._documents.get(file_path) is entry:
+                            del self._documents[file_path]
+                    raise
+            return entry
     
-    def _load_metadata(self):
-        """Load cache metadata from disk"""
-        try:
-            with open(self.metadata_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+    @staticmethod
+    def _close(entry):
+        """Close the document of an entry that is no longer in the pool, once no one is using it"""
+        with entry[2]:
+            entry[3] = True
+            doc, entry[1] = entry[1], None
+            if doc is not None:
+                try:
+                    doc.close()
+                except Exception:
+                    pass
     
-    def _save_metadata(self):
-        """Save cache metadata to disk"""
+    def page_count(self, file_path):
+        """Number of pages in the PDF, or 0 if it cannot be opened"""
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f)
-        except Exception:
-            pass  # Fail silently for cache operations
+            entry = self._checkout(file_path)
+        except Exception as e:
+            print(f"[PDF-POOL] Cannot open {file_path}: {e}")
+            return 0
+        try:
+            return entry[1].page_count
+        finally:
+            entry[2].release()
     
-    def _start_cleanup_thread(self):
-        """Start background thread to clean old cache files"""
-        def cleanup_old_files():
-            try:
-                cutoff_time = time.time() - (7 * 24 * 3600)  # 7 days ago
-                for filename in os.listdir(self.cache_dir):
-                    if filename.endswith('.thumb'):
-                        filepath = os.path.join(self.cache_dir, filename)
-                        if os.path.getmtime(filepath) < cutoff_time:
-                            os.remove(filepath)
-                            # Remove from metadata
-                            key = filename[:-6]  # Remove .thumb extension
-                            if key in self.metadata:
-                                del self.metadata[key]
-                self._save_metadata()
-            except Exception:
-                pass  # Fail silently for cleanup
+    def render_page(self, file_path, page_number, width, height, clip=None):
+        """Rasterize one page to fit a width x height box exactly, keeping its aspect ratio.
         
-        cleanup_thread = threading.Thread(target=cleanup_old_files, daemon=True)
-        cleanup_thread.start()
-    
-    def get_cache_key(self, file_path, size):
-        """Generate cache key for file path and size"""
-        path_hash = hashlib.md5(file_path.encode('utf-8')).hexdigest()
-        return f"{path_hash}_{size}"
+        The zoom is computed from the page (or clip) rectangle, so MuPDF renders the final
+        pixels directly with no oversized intermediate and no resampling afterwards.
+        Args:
+            file_path (str): Path to the PDF.
+            page_number (int): Zero-based page index.
+            width (int): Box width in pixels.
+            height (int): Box height in pixels.
+            clip (tuple): Optional (x0, y0, x1, y1) region of the page in PDF points.
+        Returns:
+            PIL.Image.Image: RGB image no larger than the box, or None on failure.
+        """
+        from PIL import Image
+        try:
+            entry = self._checkout(file_path)
+        except Exception as e:
+            print(f"[PDF-POOL] Failed to render page {page_number} of {file_path}: {e}")
+            return None
+        try:
+            import fitz  # PyMuPDF
+            doc = entry[1]
+            if not 0 <= page_number < doc.page_count:
+                return None
+            page = doc.load_page(page_number)
+            area = fitz.Rect(clip) if clip is not None else page.rect
+            if area.is_empty:
+                return None
+            zoom = min(width / area.width, height / area.height)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=area, alpha=False)
+            return Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+        except Exception as e:
+            print(f"[PDF-POOL] Failed to render page {page_number} of {file_path}: {e}")
+            return None
+        finally:
+            entry[2].release()
     
-    def get(self, file_path, size):
-        print(f"[THUMBNAIL-CACHE] get: {file_path} size={size}")
-        """Get cached thumbnail as PNG bytes and reconstruct QPixmap"""
-        cache_key = self.get_cache_key(file_path, size)
-        print(f"[THUMBNAIL-CACHE] get_cache_key: {cache_key}")
+    def close_all(self):
+        """Close every open document"""
         with self._lock:
-            if cache_key in self.memory_cache:
-                print(f"[THUMBNAIL-CACHE] Memory cache hit for {cache_key}")
-                self.memory_cache.move_to_end(cache_key)
-                png_bytes = self.memory_cache[cache_key]
-                return self._pixmap_from_png_bytes(png_bytes)
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.thumb")
-        print(f"[THUMBNAIL-CACHE] cache_file: {cache_file}")
-        if os.path.exists(cache_file):
-            print(f"[THUMBNAIL-CACHE] Disk cache hit for {cache_file}")
-            try:
-                file_mtime = os.path.getmtime(file_path)
-                with self._lock:
-                    cache_meta = self.metadata.get(cache_key, {})
-                cache_mtime = cache_meta.get('mtime', 0)
-                print(f"[THUMBNAIL-CACHE] file_mtime={file_mtime}, cache_mtime={cache_mtime} for {file_path}")
-                if not cache_meta:
-                    print(f"[THUMBNAIL-CACHE] No metadata for {cache_key} (file: {file_path})")
-                if file_mtime <= cache_mtime:
-                    print(f"[THUMBNAIL-CACHE] Cache is valid for {file_path}")
-                    try:
-                        with open(cache_file, 'rb') as f:
-                            png_bytes = f.read()
-                        print(f"[THUMBNAIL-CACHE] Read {len(png_bytes)} bytes from cache file for {file_path}")
-                        self._add_to_memory_cache(cache_key, png_bytes)
-                        return self._pixmap_from_png_bytes(png_bytes)
-                    except Exception as e:
-                        print(f"[THUMBNAIL-CACHE] Exception reading cache file for {file_path}: {e}")
-                else:
-                    print(f"[THUMBNAIL-CACHE] Cache is stale for {file_path}")
-            except Exception as e:
-                print(f"[THUMBNAIL-CACHE] Exception in get() for {file_path}: {e}")
-        else:
-            print(f"[THUMBNAIL-CACHE] No cache file found for {file_path}")
-        return None
+            entries = list(self._documents.values())
+            self._documents.clear()
+        for entry in entries:
+            self._close(entry)
 
-    def _pixmap_from_png_bytes(self, png_bytes):
-        from PyQt5.QtCore import QByteArray
-        pixmap = QPixmap()
-        pixmap.loadFromData(QByteArray(png_bytes), 'PNG')
-        return pixmap
-    
-    def put(self, file_path, size, thumbnail_data):
-        print(f"[THUMBNAIL-CACHE] put: {file_path} size={size}")
-        """Store thumbnail as PNG bytes in cache with thread safety"""
-        from PyQt5.QtCore import QBuffer, QByteArray
-        cache_key = self.get_cache_key(file_path, size)
-        print(f"[THUMBNAIL-CACHE] put_cache_key: {cache_key}")
-        # Accept either QPixmap or PNG bytes
-        if isinstance(thumbnail_data, QPixmap):
-            buffer = QBuffer()
-            buffer.open(QBuffer.ReadWrite)
-            thumbnail_data.save(buffer, 'PNG')
-            png_bytes = buffer.data().data()
-            buffer.close()
-        elif isinstance(thumbnail_data, (bytes, bytearray)):
+pdf_document_pool = PdfDocumentPool()
+
+class PdfPageRenderer(QObject):
+    """Renders preview pages from pdf_document_pool on a background thread, for PreviewPane.
+
+    Only the latest request is kept, so flipping quickly through pages or files skips the
+    pages no one is looking at any more. Pages arrive through pageReady on the UI thread.
+    """
+    pageReady = pyqtSignal(str, int, int, object)  # path, page number, page count, QImage or None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.running = True
+        self._request = None  # (path, page number, box) not yet started
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._worker_loop, name="PdfPageRenderer", daemon=True)
+        self._worker.start()
+
+    def request(self, file_path, page_number, box):
+        """Render a page to fit a box x box square, replacing the request before it if that has not started"""
+        with self._cond:
+            self._request = (file_path, page_number, box)
+            self._cond.notify()
+
+    def shutdown(self):
+        """Stop the worker; a page being rendered is finished but not delivered"""
+        with self._cond:
+            self.running = False
+            self._request = None
+            self._cond.notify()
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while self.running and self._request is None:
+                    self._cond.wait()
+                if not self.running:
+                    return
+                (file_path, page_number, box), self._request = self._request, None
+            page_count = pdf_document_pool.page_count(file_path)
+            image = None
+            if 0 <= page_number < page_count:
+                img = pdf_document_pool.render_page(file_path, page_number, box, box)
+                if img is not None:
+                    image = qimage_from_pil_image(img)
+            with self._cond:
+                if not self.running:
+                    return
+            try:
+                self.pageReady.emit(file_path, page_number, page_count, image)
+            except RuntimeError:
+                return  # The preview pane is gone
+
+class InProcessRenderBackend:
+    """Thumbnail render backend that renders on the calling thread"""
+    
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers  # Suggested number of threads to call render() from
+    
+    def render(self, file_path, size, framed=True):
+        """Render a size x size thumbnail, returns a QImage or None.
+        With framed=False the content is returned unframed and unpadded, at most size x size."""
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in IMAGE_THUMBNAIL_EXTENSIONS:
+            return render_image_thumbnail(file_path, size, framed)
+        if ext in VIDEO_THUMBNAIL_EXTENSIONS:
+            return render_video_thumbnail(file_path, size, padded=framed)
+        img = render_text_pdf_pil_image(file_path, size, framed)
+        return qimage_from_pil_image(img) if img is not None else None
+    
+    def shutdown(self):
+        pass
+
+class ProcessPoolRenderBackend:
+    """Thumbnail render backend that runs PIL/PyMuPDF in worker processes, one per core.
+    
+    Rendering is CPU-bound Python, so threads contend for the GIL with the Qt event loop.
+    Worker processes sidestep that and hand raw pixels back through shared memory.
+    Falls back to InProcessRenderBackend if the pool cannot be started or breaks.
+    """
+    
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 4
+        self._executor = None
+        self._lock = threading.Lock()
+        self._broken = False
+        self._fallback = InProcessRenderBackend(self.max_workers)
+    
+    def _get_executor(self):
+        """Start the pool on first use so application startup does not pay for it"""
+        with self._lock:
+            if self._executor is None and not self._broken:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # Never fork: the parent has Qt and worker threads running
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+    
+    def render(self, file_path, size, framed=True):
+        """Render a size x size thumbnail in a worker process, returns a QImage or None (see InProcessRenderBackend)"""
+        if os.path.splitext(file_path)[1].lower() in VIDEO_THUMBNAIL_EXTENSIONS:
+            return self._fallback.render(file_path, size, framed)  # ffmpeg already runs in its own process
+        from concurrent.futures.process import BrokenProcessPool
+        executor = self._get_executor()
+        if executor is None:
+            return self._fallback.render(file_path, size, framed)
+        try:
+            future = executor.submit(render_thumbnail_pixels, file_path, size, framed)
+            future.collected = threading.Event()
+            future.add_done_callback(self._collect)
+            future.result()
+        except BrokenProcessPool as e:
+            if not self._is_live(executor):
+                return None  # Shut down while this render was queued
+            print(f"[THUMBNAIL-RENDER] Process pool failed, rendering in-process from now on: {e}")
+            with self._lock:
+                self._broken = True
+                self._executor = None
+            executor.shutdown(wait=False)
+            return self._fallback.render(file_path, size, framed)
+        except Exception as e:
+            # Only this file failed (unreadable, corrupt, out of shared memory); the pool is fine
+            if self._is_live(executor):
+                print(f"[THUMBNAIL-RENDER] Rendering {file_path} failed: {e}")
+            return None
+        future.collected.wait()
+        image = future.image
+        return image if image is not None and not image.isNull() else None
+    
+    @staticmethod
+    def _collect(future):
+        """Done-callback of every render: copy the pixels out of shared memory and unlink the block.
+        Runs for cancelled and failed renders too, whether or not render() is still waiting."""
+        future.image = None
+        try:
+            if not future.cancelled() and future.exception() is None and future.result() is not None:
+                future.image = qimage_from_rendered_pixels(future.result())
+        except Exception as e:
+            print(f"[THUMBNAIL-RENDER] Could not collect rendered pixels: {e}")
+        finally:
+            future.collected.set()
+    
+    def _is_live(self, executor):
+        """Check whether executor is still the live pool (shutdown() clears it)"""
+        with self._lock:
+            return self._executor is executor
+    
+    def shutdown(self):
+        """Stop the worker processes without waiting for queued renders"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._broken = True
+        if executor is not None:
+            try:
+                executor.shutdown(wait=False, cancel_futures=True)
+            except TypeError:  # cancel_futures needs Python 3.9
+                executor.shutdown(wait=False)
+
+class ThumbnailStore:
+    """SQLite-backed thumbnail storage: one indexed database file instead of a file per thumbnail.
+    
+    The database runs in WAL mode, so lookups from any number of threads proceed
+    concurrently with the writer, and a crash can at worst lose the last unflushed
+    batch - never corrupt the store. Writes are buffered and committed in batches
+    by a background thread in a single transaction each. Reads record a last-access
+    time, batched the same way, which evict_to_budget() uses to drop the least recently
+    used thumbnails once the store outgrows its byte budget.
+    """
+    
+    def __init__(self, db_path, flush_interval=0.5, batch_size=64):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.running = True
+        self._local = threading.local()  # One connection per thread
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._pending = OrderedDict()  # key -> row tuple, or None for a pending delete
+        self._touched = {}  # key -> last access time, not yet written
+        self._pending_aliases = {}  # path -> (dev, ino, size, mtime_ns, key), not yet written
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_event = threading.Event()
+        
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS thumbnails (
+                key TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                created REAL NOT NULL,
+                data BLOB NOT NULL,
+                last_access REAL NOT NULL DEFAULT 0
+            )
+        """)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(thumbnails)")}
+        if 'last_access' not in columns:  # Databases from before eviction existed
+            conn.execute("ALTER TABLE thumbnails ADD COLUMN last_access REAL NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_thumbnails_path ON thumbnails(path)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_thumbnails_last_access ON thumbnails(last_access)")
+        # Which file key each path had when last seen - lets sweep_orphans() follow renamed files
+        # and saves re-hashing the contents of unchanged files for content keys
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS aliases (
+                path TEXT PRIMARY KEY,
+                dev INTEGER NOT NULL,
+                ino INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                key TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_aliases_key ON aliases(key)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_aliases_inode ON aliases(ino, dev)")
+        conn.commit()
+        
+        self._writer_thread = threading.Thread(target=self._writer_loop, name="ThumbnailStoreWriter", daemon=True)
+        self._writer_thread.start()
+    
+    def _connection(self):
+        """Get (or open) this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            import sqlite3
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            # Lets compact() hand freed pages back in small steps; must precede WAL, which creates the file
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # Durable enough with WAL, much faster than FULL
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def get(self, key):
+        """Return (data, mtime) for key, or None. Sees writes that are still waiting to be flushed."""
+        with self._pending_lock:
+            if key in self._pending:
+                row = self._pending[key]
+                return (row[5], row[3]) if row is not None else None
+        try:
+            result = self._connection().execute(
+                "SELECT data, mtime FROM thumbnails WHERE key = ?", (key,)).fetchone()
+        except Exception as e:
+            print(f"[THUMBNAIL-STORE] Lookup failed for {key}: {e}")
+            return None
+        if not result:
+            return None
+        with self._pending_lock:
+            self._touched[key] = time.time()
+        return (bytes(result[0]), result[1])
+    
+    def put(self, key, path, size, mtime, data):
+        """Queue a thumbnail for the next batched write"""
+        now = time.time()
+        with self._pending_lock:
+            self._pending[key] = (key, path, size, mtime, now, bytes(data), now)
+            self._pending.move_to_end(key)
+            if len(self._pending) >= self.batch_size:
+                self._flush_event.set()
+    
+    def get_alias(self, path):
+        """Return (signature, file key) last recorded for path, or None. signature is (dev, ino, size, mtime_ns)."""
+        with self._pending_lock:
+            row = self._pending_aliases.get(path)
+        if row is None:
+            try:
+                row = self._connection().execute(
+                    "SELECT dev, ino, size, mtime_ns, key FROM aliases WHERE path = ?", (path,)).fetchone()
+            except Exception as e:
+                print(f"[THUMBNAIL-STORE] Alias lookup failed for {path}: {e}")
+                return None
+        return (tuple(row[:4]), row[4]) if row else None
+    
+    def find_key(self, signature):
+        """Return the file key recorded for any path with this stat signature - the same file under
+        an earlier name - or None"""
+        signature = tuple(signature)
+        with self._pending_lock:
+            for row in self._pending_aliases.values():
+                if row[:4] == signature:
+                    return row[4]
+        try:
+            row = self._connection().execute(
+                "SELECT key FROM aliases WHERE ino = ? AND dev = ? AND size = ? AND mtime_ns = ? LIMIT 1",
+                (signature[1], signature[0], signature[2], signature[3])).fetchone()
+        except Exception as e:
+            print(f"[THUMBNAIL-STORE] Alias lookup failed for {signature}: {e}")
+            return None
+        return row[0] if row else None
+    
+    def put_alias(self, path, signature, key):
+        """Queue recording that path, with stat signature (dev, ino, size, mtime_ns), has file key key"""
+        with self._pending_lock:
+            self._pending_aliases[path] = tuple(signature) + (key,)
+    
+    def delete(self, key):
+        """Queue removal of a thumbnail"""
+        with self._pending_lock:
+            self._pending[key] = None
+            self._pending.move_to_end(key)
+    
+    def delete_older_than(self, cutoff_time):
+        """Remove thumbnails created before cutoff_time, returns number removed"""
+        self.flush()
+        with self._flush_lock:
+            conn = self._connection()
+            with conn:
+                return conn.execute("DELETE FROM thumbnails WHERE created < ?", (cutoff_time,)).rowcount
+    
+    def total_bytes(self):
+        """Bytes of thumbnail data in the database"""
+        self.flush()
+        return self._connection().execute("SELECT COALESCE(SUM(length(data)), 0) FROM thumbnails").fetchone()[0]
+    
+    def _delete_keys(self, keys):
+        """Delete keys in one short transaction, so the writer is never held up for long"""
+        with self._flush_lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("DELETE FROM thumbnails WHERE key = ?", [(key,) for key in keys])
+    
+    def evict_to_budget(self, max_bytes, stop_event=None, batch_size=256):
+        """Delete the least recently used thumbnails until at most max_bytes remain.
+        Works in batches and returns early once stop_event is set. Returns the number removed."""
+        excess = self.total_bytes() - max_bytes
+        removed = 0
+        conn = self._connection()
+        while excess > 0 and not (stop_event and stop_event.is_set()):
+            batch = conn.execute("SELECT key, length(data) FROM thumbnails ORDER BY last_access LIMIT ?",
+                                 (batch_size,)).fetchall()
+            if not batch:
+                break
+            keys = []
+            for key, data_bytes in batch:
+                if excess <= 0:
+                    break
+                keys.append(key)
+                excess -= data_bytes
+            self._delete_keys(keys)
+            removed += len(keys)
+        return removed
+    
+    def _live_alias(self, file_key):
+        """Find a path that still holds the file with file_key, returns (path, mtime) or None"""
+        rows = self._connection().execute(
+            "SELECT path, dev, ino, size, mtime_ns FROM aliases WHERE key = ?", (file_key,)).fetchall()
+        for path, dev, ino, size, mtime_ns in rows:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns) == (dev, ino, size, mtime_ns):
+                return path, st.st_mtime
+        return None
+    
+    def sweep_orphans(self, stop_event=None, batch_size=256):
+        """Delete thumbnails whose source was removed or has changed since it was rendered.
+        A thumbnail whose file was renamed, or that another identical file shares, is re-pointed
+        at that path instead. Aliases of paths that are gone or changed, or whose key no longer has
+        any thumbnail, are dropped as well.
+        Works in batches and returns early once stop_event is set. Returns the number removed."""
+        self.flush()
+        removed = 0
+        last_rowid = 0
+        conn = self._connection()
+        while not (stop_event and stop_event.is_set()):
+            batch = conn.execute("SELECT rowid, key, path, mtime FROM thumbnails WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                 (last_rowid, batch_size)).fetchall()
+            if not batch:
+                break
+            last_rowid = batch[-1][0]
+            orphans, moved = [], []
+            for _, key, path, mtime in batch:
+                try:
+                    if os.path.getmtime(path) <= mtime:
+                        continue
+                except OSError:
+                    pass  # Source no longer exists at this path
+                alias = self._live_alias(key.split('_', 1)[0])
+                if alias is not None:
+                    moved.append((alias[0], alias[1], key))
+                else:
+                    orphans.append(key)
+            if moved:
+                with self._flush_lock:
+                    with conn:
+                        conn.executemany("UPDATE thumbnails SET path = ?, mtime = ? WHERE key = ?", moved)
+            if orphans:
+                self._delete_keys(orphans)
+                removed += len(orphans)
+        last_rowid = 0
+        while not (stop_event and stop_event.is_set()):
+            # Thumbnail keys are the file key, '_' and the rest, so a range of the primary key finds them
+            batch = conn.execute("SELECT rowid, path, dev, ino, size, mtime_ns, EXISTS (SELECT 1 FROM thumbnails "
+                                 "WHERE thumbnails.key >= aliases.key || '_' AND thumbnails.key < aliases.key || '`') "
+                                 "FROM aliases WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                 (last_rowid, batch_size)).fetchall()
+            if not batch:
+                break
+            last_rowid = batch[-1][0]
+            dead = []
+            for _, path, dev, ino, size, mtime_ns, has_thumbnails in batch:
+                if not has_thumbnails:
+                    dead.append((path,))
+                    continue
+                try:
+                    st = os.stat(path)
+                    if (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns) == (dev, ino, size, mtime_ns):
+                        continue
+                except OSError:
+                    pass
+                dead.append((path,))
+            if dead:
+                with self._flush_lock:
+                    with conn:
+                        conn.executemany("DELETE FROM aliases WHERE path = ?", dead)
+        return removed
+    
+    def compact(self, stop_event=None, pages_per_step=256):
+        """Return free pages to the file system a few at a time and shrink the WAL.
+        Databases created before incremental auto-vacuum keep their free pages for reuse instead."""
+        conn = self._connection()
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:  # INCREMENTAL
+            while not (stop_event and stop_event.is_set()):
+                if conn.execute("PRAGMA freelist_count").fetchone()[0] == 0:
+                    break
+                with self._flush_lock:
+                    conn.execute(f"PRAGMA incremental_vacuum({int(pages_per_step)})").fetchall()
+                    conn.commit()
+        if not (stop_event and stop_event.is_set()):
+            with self._flush_lock:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    
+    def flush(self):
+        """Write all pending changes in one transaction"""
+        with self._flush_lock:
+            with self._pending_lock:
+                if not self._pending and not self._touched and not self._pending_aliases:
+                    return
+                pending, self._pending = self._pending, OrderedDict()
+                touched, self._touched = self._touched, {}
+                aliases, self._pending_aliases = self._pending_aliases, {}
+            rows = [row for row in pending.values() if row is not None]
+            deleted = [(key,) for key, row in pending.items() if row is None]
+            try:
+                conn = self._connection()
+                with conn:  # Commits on success, rolls back on error
+                    if deleted:
+                        conn.executemany("DELETE FROM thumbnails WHERE key = ?", deleted)
+                    if rows:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO thumbnails (key, path, size, mtime, created, data, last_access) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                    if touched:
+                        conn.executemany("UPDATE thumbnails SET last_access = ? WHERE key = ?",
+                                         [(when, key) for key, when in touched.items()])
+                    if aliases:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO aliases (path, dev, ino, size, mtime_ns, key) VALUES (?, ?, ?, ?, ?, ?)",
+                            [(path,) + row for path, row in aliases.items()])
+            except Exception as e:
+                print(f"[THUMBNAIL-STORE] Batch write of {len(pending)} entries failed: {e}")
+    
+    def _writer_loop(self):
+        """Flush pending writes every flush_interval seconds, or sooner when a batch fills up"""
+        while self.running:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+    
+    def close(self):
+        """Flush outstanding writes and close all connections"""
+        self.running = False
+        self._flush_event.set()
+        self.flush()
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+
+class FreedesktopThumbnails:
+    """The shared thumbnail cache of the freedesktop.org Thumbnail Managing Standard.
+
+    Linux file managers keep thumbnails in $XDG_CACHE_HOME/thumbnails/<flavor>/<md5 of file URI>.png,
+    tagged with the Thumb::URI and Thumb::MTime PNG text keys. ThumbnailCache reads these before
+    rendering, so the first visit to a folder another file manager has seen is already warm.
+    With write_back enabled our own renders are saved there too, instead of in our own store,
+    and files that failed to render are recorded under fail/ so that no one retries them.
+    """
+
+    LOOKUP_FLAVORS = (('large', 256), ('x-large', 512), ('xx-large', 1024))  # 'normal' (128) is smaller than a master
+    WRITE_FLAVORS = (('large', 256), ('normal', 128))
+    WRITE_EXTENSIONS = IMAGE_THUMBNAIL_EXTENSIONS + VIDEO_THUMBNAIL_EXTENSIONS + PDF_THUMBNAIL_EXTENSIONS
+    SOFTWARE = "Gary's File Manager 0.9.0"
+    FAIL_DIR = 'garysfm-0.9.0'  # fail/<appname-version> as required by the spec
+
+    def __init__(self, base_dir=None, write_back=False):
+        if base_dir is None:
+            base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser("~"), '.cache')
+            base_dir = os.path.join(base, 'thumbnails')
+        self.base_dir = base_dir
+        self.write_back = write_back
+
+    @staticmethod
+    def file_uri(file_path):
+        """The file:// URI the spec hashes, escaped the way GLib escapes it so that hashes match"""
+        from urllib.parse import quote
+        return 'file://' + quote(os.path.abspath(file_path), safe="/!$&'()*+,;=:@~")
+
+    def _thumbnail_path(self, flavor, uri):
+        return os.path.join(self.base_dir, flavor, hashlib.md5(uri.encode('utf-8')).hexdigest() + '.png')
+
+    @staticmethod
+    def _read_valid(thumb_path, uri, mtime):
+        """Read a thumbnail PNG, or return None if it is missing or describes another file or version"""
+        if not os.path.exists(thumb_path):
+            return None
+        # Read the pixels too: QImageReader.text() splits keys at ':', so Thumb::URI is only found on the image
+        image = QImage(thumb_path, 'PNG')
+        if image.isNull() or image.text('Thumb::URI') != uri or image.text('Thumb::MTime') != str(mtime):
+            return None
+        return image
+
+    def lookup(self, file_path, size):
+        """Find a valid shared thumbnail of file_path at least size pixels large.
+        Returns it framed like our own renders, as a size x size QImage, or None."""
+        try:
+            mtime = int(os.path.getmtime(file_path))
+        except OSError:
+            return None
+        uri = self.file_uri(file_path)
+        for flavor, flavor_size in self.LOOKUP_FLAVORS:
+            if flavor_size < size:
+                continue
+            try:
+                image = self._read_valid(self._thumbnail_path(flavor, uri), uri, mtime)
+            except Exception as e:
+                print(f"[THUMBNAIL-FREEDESKTOP] Error reading {flavor} thumbnail of {file_path}: {e}")
+                continue
+            if image is not None:
+                # Shared thumbnails are at most flavor_size on their longer side, never padded
+                return frame_thumbnail_image(image, size, os.path.splitext(file_path)[1].lower() in IMAGE_THUMBNAIL_EXTENSIONS)
+        return None
+
+    def has_failed(self, file_path):
+        """Check whether any application recorded that file_path, as it is now, cannot be thumbnailed"""
+        fail_root = os.path.join(self.base_dir, 'fail')
+        try:
+            mtime = int(os.path.getmtime(file_path))
+            apps = os.listdir(fail_root)
+        except OSError:
+            return False
+        uri = self.file_uri(file_path)
+        name = hashlib.md5(uri.encode('utf-8')).hexdigest() + '.png'
+        for app in apps:
+            try:
+                if self._read_valid(os.path.join(fail_root, app, name), uri, mtime) is not None:
+                    return True
+            except Exception:
+                continue
+        return False
+
+    def _write(self, thumb_path, image, uri, mtime):
+        """Atomically write a thumbnail PNG readable only by the user, as the spec requires"""
+        os.makedirs(os.path.dirname(thumb_path), mode=0o700, exist_ok=True)
+        image.setText('Thumb::URI', uri)
+        image.setText('Thumb::MTime', str(mtime))
+        image.setText('Software', self.SOFTWARE)
+        fd, temp_path = tempfile.mkstemp(suffix='.png', dir=os.path.dirname(thumb_path))
+        os.close(fd)
+        try:
+            if not image.save(temp_path, 'PNG'):
+                raise OSError(f"could not write {temp_path}")
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, thumb_path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def save(self, file_path, content):
+        """Save the unframed, unpadded thumbnail of file_path (a render with framed=False) into the shared cache.
+        Returns True if it was saved; only images, videos and PDFs are shared."""
+        if os.path.splitext(file_path)[1].lower() not in self.WRITE_EXTENSIONS:
+            return False
+        try:
+            mtime = int(os.path.getmtime(file_path))
+            uri = self.file_uri(file_path)
+            for flavor, flavor_size in self.WRITE_FLAVORS:
+                if content.width() > flavor_size or content.height() > flavor_size:
+                    scaled = content.scaled(flavor_size, flavor_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                else:
+                    scaled = QImage(content)
+                self._write(self._thumbnail_path(flavor, uri), scaled, uri, mtime)
+            return True
+        except Exception as e:
+            print(f"[THUMBNAIL-FREEDESKTOP] Could not save thumbnail of {file_path}: {e}")
+            return False
+
+    def save_failure(self, file_path):
+        """Record that file_path cannot be thumbnailed, so it is skipped until it changes"""
+        try:
+            mtime = int(os.path.getmtime(file_path))
+            uri = self.file_uri(file_path)
+            marker = QImage(1, 1, QImage.Format_ARGB32)
+            marker.fill(Qt.transparent)
+            name = hashlib.md5(uri.encode('utf-8')).hexdigest() + '.png'
+            self._write(os.path.join(self.base_dir, 'fail', self.FAIL_DIR, name), marker, uri, mtime)
+        except Exception as e:
+            print(f"[THUMBNAIL-FREEDESKTOP] Could not record failure for {file_path}: {e}")
+
+class ThumbnailCache:
+    """Persistent disk-based thumbnail cache for performance optimization with thread safety
+    
+    Sources are rendered once, at MASTER_SIZE, and only the master is stored on disk.
+    Any smaller size is derived by downscaling the master and memoized in memory, so
+    changing the thumbnail size never goes back to the source file.
+    On Linux, thumbnails in the shared freedesktop.org cache are used before rendering.
+    Thumbnails are keyed by file identity rather than path (see file_key), so they
+    survive renames and moves, and with content_keys identical files share one.
+    """
+    
+    CONTENT_KEY_MAX_BYTES = 256 * 1024 * 1024  # Larger files are not worth reading in full to deduplicate
+    
+    MASTER_SIZE = 256  # Largest size offered by SimpleFileManager.increase_thumbnail_size
+    
+    def __init__(self, cache_dir=None, hot_cache_bytes=48 * 1024 * 1024, warm_cache_bytes=16 * 1024 * 1024,
+                 render_backend=None, use_freedesktop=True, disk_cache_bytes=256 * 1024 * 1024, content_keys=False):
+        self.cache_dir = cache_dir or os.path.join(PlatformUtils.get_cache_directory(), 'thumbnails')
+        # Generates masters on a miss in render(); swap in ProcessPoolRenderBackend to use every core
+        self.render_backend = render_backend or InProcessRenderBackend()
+        # Read-through to the thumbnails other Linux file managers already made
+        self.freedesktop = FreedesktopThumbnails() if use_freedesktop and PlatformUtils.is_linux() else None
+        # Two in-memory LRU tiers, each bounded by bytes rather than entry count:
+        # hot entries are decoded QImages ready to draw, warm entries are compressed PNG bytes
+        self.memory_cache = OrderedDict()  # Hot tier: key -> (QImage, png_bytes)
+        self.warm_cache = OrderedDict()  # Warm tier: key -> png_bytes
+        self.hot_cache_bytes = hot_cache_bytes
+        self.warm_cache_bytes = warm_cache_bytes
+        self._hot_bytes = 0
+        self._warm_bytes = 0
+        self.stats = {
+            'hot_hits': 0, 'warm_hits': 0, 'disk_hits': 0, 'misses': 0,
+            'hot_evictions': 0, 'warm_evictions': 0, 'derived': 0, 'desktop_hits': 0,
+        }
+        self._derived_sizes = set()  # (variant, size) pairs that have been derived from a master so far
+        self.disk_cache_bytes = disk_cache_bytes  # Budget for the store, enforced by start_maintenance()
+        self.content_keys = content_keys  # Key regular files by a hash of their bytes, found on a miss in render()
+        self._aliases = OrderedDict()  # path -> (stat signature, file key), most recently used last
+        self._checked_folders = set()  # Folders whose composite render_folder has looked up since they changed
+        self._stale_folders = set()  # Folders with images changed in place, which leaves the folder's key alone
+        
+        # Add thread safety with lock
+        import threading
+        self._lock = threading.RLock()  # Reentrant lock for nested calls
+        self._maintenance_stop = threading.Event()
+        self._maintenance_thread = None
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        
+        # All thumbnails and their metadata live in one SQLite database
+        self.store = ThumbnailStore(os.path.join(self.cache_dir, 'thumbnails.sqlite'))
+        
+        # Maintenance is not started here; the owner calls start_maintenance() once the UI is idle
+    
+    def start_maintenance(self):
+        """Sweep orphaned entries, evict down to disk_cache_bytes and compact the store in the background.
+        Runs on an idle-priority daemon thread in small batches; stop_maintenance() interrupts it
+        between batches without waiting, so shutting down never blocks on it."""
+        if not self.store.running or (self._maintenance_thread is not None and self._maintenance_thread.is_alive()):
+            return
+        self._maintenance_stop.clear()
+        self._maintenance_thread = threading.Thread(target=self._run_maintenance, name="ThumbnailCacheMaintenance",
+                                                    daemon=True)
+        self._maintenance_thread.start()
+    
+    def stop_maintenance(self):
+        """Ask a running maintenance pass to stop after its current batch"""
+        self._maintenance_stop.set()
+    
+    def _run_maintenance(self):
+        PlatformUtils.set_current_thread_idle_priority()
+        stop = self._maintenance_stop
+        try:
+            started = time.time()
+            swept = self.store.sweep_orphans(stop)
+            evicted = 0 if stop.is_set() else self.store.evict_to_budget(self.disk_cache_bytes, stop)
+            if not stop.is_set() and (swept or evicted):
+                self.store.compact(stop)
+            print(f"[THUMBNAIL-CACHE] Maintenance removed {swept} orphaned and {evicted} least recently used "
+                  f"thumbnails in {time.time() - started:.1f}s{' (interrupted)' if stop.is_set() else ''}")
+        except Exception as e:
+            if not stop.is_set():  # Errors after an interruption are just the store closing underneath us
+                print(f"[THUMBNAIL-CACHE] Maintenance failed: {e}")
+    
+    def get_cache_key(self, file_path, size, variant=''):
+        """Generate cache key for file path and size (variant tells apart other images of the same file, e.g. storyboards)"""
+        return self._cache_key(self.file_key(file_path), size, variant)
+    
+    @staticmethod
+    def _cache_key(file_key, size, variant=''):
+        if variant:
+            return f"{file_key}_{variant}_{size}"
+        return f"{file_key}_{size}"
+    
+    def file_key(self, file_path):
+        """Key of the file at file_path, by identity rather than path: a hash of (device, inode, size, mtime_ns).
+        It follows the file through renames and moves within a file system, and changes whenever the
+        file does, so a key never needs validating against the source. Once render() has fingerprinted
+        the file for content_keys, its content hash is used instead for as long as the file is unchanged.
+        Falls back to hashing the path if the file cannot be stat'ed.
+
+        The key is remembered per path, so only the first lookup of a path stats the file (and reads the
+        store); a hit from the UI thread touches neither. forget_paths and refresh_folder drop remembered
+        keys when the file monitor or a new listing shows that the file changed. The store only records
+        the key once a thumbnail is stored under it (see _record_alias)."""
+        with self._lock:
+            alias = self._aliases.get(file_path)
+            if alias is not None:
+                self._aliases.move_to_end(file_path)
+                return alias[1]
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return hashlib.md5(file_path.encode('utf-8')).hexdigest()
+        signature = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        alias = self.store.get_alias(file_path)
+        if alias is not None and alias[0] == signature:
+            self._remember_alias(file_path, signature, alias[1])
+            return alias[1]
+        # A renamed file keeps its content key, if it had one, under the new name
+        file_key = self.store.find_key(signature) or hashlib.md5(repr(signature).encode('utf-8')).hexdigest()
+        self._remember_alias(file_path, signature, file_key)
+        return file_key
+    
+    def _remember_alias(self, file_path, signature, file_key):
+        with self._lock:
+            self._aliases[file_path] = (signature, file_key)
+            self._aliases.move_to_end(file_path)
+            while len(self._aliases) > 50000:
+                self._aliases.popitem(last=False)
+    
+    def _record_alias(self, file_path):
+        """Record the key remembered for file_path in the store, once a thumbnail is stored under it"""
+        with self._lock:
+            alias = self._aliases.get(file_path)
+        if alias is not None:
+            self.store.put_alias(file_path, alias[0], alias[1])
+    
+    def known_key(self, file_path, size, mtime):
+        """Key remembered for file_path if it was taken from the file as it is in a listing (size and mtime
+        from a DirectorySnapshot), else None. Never stats the file or reads the store, unlike file_key."""
+        with self._lock:
+            alias = self._aliases.get(file_path)
+            if alias is None or not self._signature_matches(alias[0], size, mtime):
+                return None
+            self._aliases.move_to_end(file_path)
+            return alias[1]
+    
+    @staticmethod
+    def _signature_matches(signature, size, mtime):
+        """Whether a (dev, ino, size, mtime_ns) signature has a listing's size and float mtime"""
+        return signature[2] == size and abs(mtime - signature[3] / 1e9) <= 1e-6
+    
+    def forget_paths(self, paths):
+        """Drop the keys remembered for paths (their files changed); the next lookup stats them again.
+        The folder composites of the paths are looked up again, and those of their folders are recomposed."""
+        with self._lock:
+            for path in paths:
+                self._aliases.pop(path, None)
+                path = os.path.normpath(path)
+                self._checked_folders.discard(path)
+                self._checked_folders.discard(os.path.dirname(path))
+                self._stale_folders.add(os.path.dirname(path))
+    
+    def refresh_folder(self, snapshot):
+        """Drop the keys remembered for entries of snapshot's folder whose size or modification time differ
+        from the snapshot, or that are gone: files changed while their folder was not being watched.
+        The folder's composite is recomposed if any did."""
+        folder = snapshot.path
+        with self._lock:
+            if len(snapshot) < len(self._aliases):
+                paths = [os.path.join(folder, name) for name in snapshot.names]
+                paths = [path for path in paths if path in self._aliases]
+            else:
+                folder = os.path.normpath(folder)
+                paths = [path for path in self._aliases if os.path.dirname(path) == folder]
+            stale = []
+            for path in paths:
+                position = snapshot.lookup(path)
+                if (position is None or not self._signature_matches(
+                        self._aliases[path][0], snapshot.sizes[position], snapshot.mtimes[position])):
+                    stale.append(path)
+            for path in stale:
+                del self._aliases[path]
+            if stale:
+                folder = os.path.normpath(snapshot.path)
+                self._checked_folders.discard(folder)
+                self._stale_folders.add(folder)
+    
+    def _rekey(self, file_path):
+        """Check the key remembered for file_path against a fresh stat and drop it if the file changed
+        unnoticed. Returns True if it was dropped, i.e. a lookup is worth repeating."""
+        with self._lock:
+            alias = self._aliases.get(file_path)
+        if alias is None:
+            return False
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return False
+        if alias[0] == (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns):
+            return False
+        self.forget_paths([file_path])
+        return True
+    
+    def _fingerprint(self, file_path):
+        """Switch file_path over to a content key, if content_keys is on and it is a regular file of
+        reasonable size. Returns True if the key changed, i.e. a lookup is worth repeating."""
+        if not self.content_keys:
+            return False
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return False
+        import stat
+        if not stat.S_ISREG(st.st_mode) or st.st_size > self.CONTENT_KEY_MAX_BYTES:
+            return False
+        signature = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            alias = self._aliases.get(file_path)
+        if alias is not None and alias[0] == signature and alias[1].startswith('content'):
+            return False  # Already fingerprinted
+        digest = file_content_fingerprint(file_path)
+        if digest is None:
+            return False
+        file_key = 'content' + digest  # Never mistaken for a stat-based key, which is plain hex
+        self._remember_alias(file_path, signature, file_key)
+        return True
+    
+    @classmethod
+    def master_size(cls, size):
+        """Size a thumbnail should be rendered at so that `size` can be derived from it"""
+        return max(size, cls.MASTER_SIZE)
+    
+    def get(self, file_path, size, variant='', stat=None):
+        """Get cached thumbnail as a QPixmap (UI thread only).
+        stat is the file's (size, mtime) from a DirectorySnapshot; with it only keys and thumbnails already in
+        memory are used, so painting a row never touches the file or the store. render() finds the rest."""
+        entry = self._lookup_listed(file_path, size, variant, stat)
+        if entry is None:
+            return None
+        return QPixmap.fromImage(entry[0])
+
+    def get_image(self, file_path, size, variant='', stat=None):
+        """Get cached thumbnail as a QImage (safe to call from worker threads, unlike get()); stat as for get()"""
+        entry = self._lookup_listed(file_path, size, variant, stat)
+        return entry[0] if entry is not None else None
+
+    def _lookup_listed(self, file_path, size, variant='', stat=None):
+        if stat is None:
+            return self._lookup(file_path, size, variant)
+        file_key = self.known_key(file_path, *stat)
+        if file_key is None:
+            return None
+        return self._lookup(file_path, size, variant, file_key)
+
+    def render(self, file_path, size):
+        """Get a thumbnail as a QImage, rendering and storing the master with render_backend on a miss.
+        Blocks until rendered - call from worker threads, not the UI thread."""
+        image = self.get_image(file_path, size)
+        if image is not None:
+            return image
+        # Before rendering, make sure the miss is not down to a key remembered from before the file changed
+        rekeyed = self._rekey(file_path)
+        if self._fingerprint(file_path) or rekeyed:
+            # An identical file elsewhere may have been rendered already
+            image = self.get_image(file_path, size)
+            if image is not None:
+                self._record_alias(file_path)
+                return image
+        master = self.master_size(size)
+        if os.path.splitext(file_path)[1].lower() in AUDIO_THUMBNAIL_EXTENSIONS:
+            return self._render_audio(file_path, size)
+        if self.freedesktop is not None and self.freedesktop.has_failed(file_path):
+            return None  # Known to fail until the file changes
+        write_back = self.freedesktop is not None and self.freedesktop.write_back
+        if write_back:
+            # The shared cache gets the bare content; our own frame is only added for the master
+            content = self.render_backend.render(file_path, master, framed=False)
+            rendered = None if content is None else frame_thumbnail_image(
+                content, master, os.path.splitext(file_path)[1].lower() in IMAGE_THUMBNAIL_EXTENSIONS)
+        else:
+            rendered = self.render_backend.render(file_path, master)
+        if rendered is None:
+            if write_back:
+                self.freedesktop.save_failure(file_path)
+            return None
+        persist = True
+        if write_back:
+            # Once it is in the shared cache a second copy in our own store would be a duplicate
+            persist = not self.freedesktop.save(file_path, content)
+        self.put(file_path, master, rendered, persist=persist)
+        return self.get_image(file_path, size)
+    
+    def get_audio_peaks(self, file_path):
+        """Get the cached waveform peaks of an audio file (see decode_audio_peaks), or None"""
+        stored = self.store.get(self.get_cache_key(file_path, 0, 'peaks'))
+        if stored is None:
+            return None
+        import numpy as np
+        return np.frombuffer(stored[0], dtype='<i2').reshape(-1, 2)
+    
+    def _render_audio(self, file_path, size):
+        """Draw a waveform thumbnail from the cached peaks, decoding the audio only if there are none.
+        Only the peaks are stored on disk - redrawing them at any size is cheaper than a PNG round trip."""
+        peaks = self.get_audio_peaks(file_path)
+        if peaks is None:
+            peaks = decode_audio_peaks(file_path)
+            if peaks is None:
+                return None
+            try:
+                self.store.put(self.get_cache_key(file_path, 0, 'peaks'), file_path, 0,
+                               os.path.getmtime(file_path), peaks.astype('<i2').tobytes())
+                self._record_alias(file_path)
+            except OSError:
+                pass
+        master = self.master_size(size)
+        self.put(file_path, master, render_audio_waveform(peaks, master), persist=False)
+        return self.get_image(file_path, size)
+    
+    def get_storyboard(self, file_path):
+        """Get the cached hover-scrub storyboard of a video as a QImage (square frames side by side), or None"""
+        entry = self._lookup_stored(file_path, self.file_key(file_path), self.MASTER_SIZE, 'storyboard')
+        return entry[0] if entry is not None else None
+    
+    def render_storyboard(self, file_path, frames=VIDEO_STORYBOARD_FRAMES):
+        """Get a video storyboard, extracting and storing it on a miss. Blocks - call from worker threads."""
+        image = self.get_storyboard(file_path)
+        if image is not None:
+            return image
+        sheet = render_video_storyboard(file_path, self.MASTER_SIZE, frames)
+        if sheet is None:
+            return None
+        self.put(file_path, self.MASTER_SIZE, sheet, 'storyboard')
+        return self.get_storyboard(file_path)
+
+    def folder_checked(self, folder_path):
+        """Whether render_folder has looked up the folder's composite since the folder last changed.
+        Until then the composite in memory (if any) is shown, but may be stale."""
+        return os.path.normpath(folder_path) in self._checked_folders
+
+    def render_folder(self, folder_path, size):
+        """Get the image previews drawn over a folder icon as a QImage, composing and storing them on a miss.
+        The composite is keyed on the folder, i.e. on its mtime, so it goes stale when entries are added,
+        removed or renamed; until then it is used without listing the folder. Folders without images store
+        an empty entry instead, so they are not listed again either. Images edited in place leave the mtime
+        alone; forget_paths and refresh_folder hear of them and have the composite redone. It is built from
+        the children's own cached thumbnails, so no image is decoded twice.
+        Returns None for a folder without images, or a transparent overlay if it had a composite before.
+        Blocks - call from worker threads."""
+        folder = os.path.normpath(folder_path)
+        master = self.master_size(size)
+        file_key = self.file_key(folder_path)
+        cache_key = self._cache_key(file_key, master, 'folder')
+        image = self.get_image(folder_path, size, 'folder')
+        with self._lock:
+            stale = folder in self._stale_folders
+        if not stale and (image is not None or self.store.get(cache_key) is not None):
+            with self._lock:
+                self._checked_folders.add(folder)
+            return image
+        image_files = folder_preview_images(folder_path)
+        with self._lock:
+            self._stale_folders.discard(folder)
+            for path in image_files:
+                self._aliases.pop(path, None)  # An image edited in place may still have its old key
+        if image_files:
+            self.put(folder_path, master, render_folder_overlay(folder_path, master, self.render, image_files),
+                     'folder')
+            image = self.get_image(folder_path, size, 'folder')
+        else:
+            if image is not None:
+                image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+                image.fill(Qt.transparent)
+            with self._lock:
+                self._drop_from_memory(cache_key)
+                self._drop_derived(file_key, 'folder')
+            try:
+                # Empty data: the folder has no images (it decodes to no image, like a miss)
+                self.store.put(cache_key, folder_path, master, os.path.getmtime(folder_path), b'')
+            except OSError:
+                pass
+        with self._lock:
+            self._checked_folders.add(folder)
+        return image
+
+    def _lookup(self, file_path, size, variant='', file_key=None):
+        """Find (QImage, png_bytes) for size, deriving it from the master if size is smaller.
+        With a known file_key only the memory tiers are searched."""
+        in_memory = file_key is not None
+        if file_key is None:
+            file_key = self.file_key(file_path)
+        master = self.master_size(size)
+        if size == master:
+            return self._lookup_stored(file_path, file_key, size, variant, in_memory)
+        cache_key = self._cache_key(file_key, size, variant)
+        with self._lock:
+            entry = self.memory_cache.get(cache_key)
+            if entry is not None:
+                self.memory_cache.move_to_end(cache_key)
+                self.stats['hot_hits'] += 1
+                return entry
+        master_entry = self._lookup_stored(file_path, file_key, master, variant, in_memory)
+        if master_entry is None:
+            return None
+        image = master_entry[0].scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        if image.isNull():
+            return None
+        # Derived entries are never persisted - re-deriving is cheaper than a disk read
+        entry = (image, None)
+        with self._lock:
+            self.stats['derived'] += 1
+            self._derived_sizes.add((variant, size))
+        self._add_to_memory_cache(cache_key, entry)
+        return entry
+    
+    def _lookup_stored(self, file_path, file_key, size, variant='', in_memory=False):
+        """Find (QImage, png_bytes) in the hot tier, then the warm tier, then (unless in_memory) on disk.
+        Only warm and disk hits decode; the result is promoted to the hot tier."""
+        cache_key = self._cache_key(file_key, size, variant)
+        with self._lock:
+            entry = self.memory_cache.get(cache_key)
+            if entry is not None:
+                self.memory_cache.move_to_end(cache_key)
+                self.stats['hot_hits'] += 1
+                return entry
+            png_bytes = self.warm_cache.get(cache_key)
+            if png_bytes is not None:
+                del self.warm_cache[cache_key]
+                self._warm_bytes -= len(png_bytes)
+                self.stats['warm_hits'] += 1
+        if png_bytes is None and in_memory:
+            return None
+        if png_bytes is None:
+            # Keys change with the file, so whatever is stored under the key is current
+            stored = self.store.get(cache_key)
+            if stored is not None:
+                png_bytes = stored[0]
+                self.stats['disk_hits'] += 1
+            else:
+                return self._lookup_freedesktop(file_path, cache_key, size, variant)
+        image = QImage.fromData(png_bytes, 'PNG')
+        if image.isNull():
+            return None
+        entry = (image, png_bytes)
+        self._add_to_memory_cache(cache_key, entry)
+        return entry
+
+    def _lookup_freedesktop(self, file_path, cache_key, size, variant=''):
+        """Find (QImage, None) in the shared freedesktop.org cache, which only has plain thumbnails.
+        The entry is kept in the hot tier without PNG bytes, so it is never stored a second time."""
+        image = None
+        if self.freedesktop is not None and not variant:
+            image = self.freedesktop.lookup(file_path, size)
+        if image is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['desktop_hits'] += 1
+        entry = (image, None)
+        self._add_to_memory_cache(cache_key, entry)
+        return entry
+
+    def put(self, file_path, size, thumbnail_data, variant='', persist=True):
+        """Store thumbnail (QPixmap, QImage or PNG bytes) in memory and, if persist, on disk with thread safety"""
+        from PyQt5.QtCore import QBuffer
+        file_key = self.file_key(file_path)
+        cache_key = self._cache_key(file_key, size, variant)
+        if isinstance(thumbnail_data, (QPixmap, QImage)):
+            image = thumbnail_data.toImage() if isinstance(thumbnail_data, QPixmap) else thumbnail_data
+            buffer = QBuffer()
+            buffer.open(QBuffer.ReadWrite)
+            image.save(buffer, 'PNG')
+            png_bytes = buffer.data().data()
+            buffer.close()
+        elif isinstance(thumbnail_data, (bytes, bytearray)):
             png_bytes = bytes(thumbnail_data)
+            image = QImage.fromData(png_bytes, 'PNG')
         else:
             print(f"[THUMBNAIL-CACHE] Unsupported thumbnail_data type: {type(thumbnail_data)}")
             return
         print(f"[THUMBNAIL-CACHE] Writing {len(png_bytes)} bytes to cache for {file_path} size={size}")
-        self._add_to_memory_cache(cache_key, png_bytes)
+        with self._lock:
+            self._drop_from_memory(cache_key)
+            self._drop_derived(file_key, variant)
+        if not image.isNull():
+            self._add_to_memory_cache(cache_key, (image, png_bytes))
+        if not persist:
+            return
         try:
-            cache_file = os.path.join(self.cache_dir, f"{cache_key}.thumb")
-            with open(cache_file, 'wb') as f:
-                f.write(png_bytes)
-            with self._lock:
-                self.metadata[cache_key] = {
-                    'mtime': os.path.getmtime(file_path),
-                    'created': time.time()
-                }
-            self._save_metadata()
+            self.store.put(cache_key, file_path, size, os.path.getmtime(file_path), png_bytes)
+            self._record_alias(file_path)
         except Exception:
             pass
     
-    def _add_to_memory_cache(self, key, value):
-        """Add item to memory cache with LRU eviction and thread safety"""
+    def invalidate(self, file_path, size, variant=''):
+        """Drop the cached thumbnail for file_path at size, and everything derived from the same master"""
+        file_key = self.file_key(file_path)
+        cache_key = self._cache_key(file_key, self.master_size(size), variant)
+        with self._lock:
+            self._drop_from_memory(cache_key)
+            self._drop_derived(file_key, variant)
+        self.store.delete(cache_key)
+    
+    def _drop_derived(self, file_key, variant=''):
+        """Remove memoized derived sizes of the file keyed file_key - caller holds the lock"""
+        for derived_variant, size in self._derived_sizes:
+            if derived_variant == variant:
+                self._drop_from_memory(self._cache_key(file_key, size, variant))
+    
+    @staticmethod
+    def _entry_bytes(entry):
+        """Memory held by a hot tier entry: decoded pixels plus the PNG bytes kept for demotion"""
+        image, png_bytes = entry
+        return image.sizeInBytes() + (len(png_bytes) if png_bytes else 0)
+    
+    def _add_to_memory_cache(self, key, entry):
+        """Add (QImage, png_bytes) to the hot tier; least recently used entries are demoted to the warm tier"""
         with self._lock:  # Thread-safe access to cache
             if key in self.memory_cache:
                 self.memory_cache.move_to_end(key)
-            else:
-                self.memory_cache[key] = value
-                # Remove oldest items if cache is full
-                while len(self.memory_cache) > self.max_memory_cache:
-                    self.memory_cache.popitem(last=False)
+                return
+            self.memory_cache[key] = entry
+            self._hot_bytes += self._entry_bytes(entry)
+            while self._hot_bytes > self.hot_cache_bytes and len(self.memory_cache) > 1:
+                old_key, old_entry = self.memory_cache.popitem(last=False)
+                self._hot_bytes -= self._entry_bytes(old_entry)
+                self.stats['hot_evictions'] += 1
+                if old_entry[1]:  # Derived entries have no PNG and are simply re-derived
+                    self._add_to_warm_cache(old_key, old_entry[1])
+    
+    def _add_to_warm_cache(self, key, png_bytes):
+        """Add compressed bytes to the warm tier; its least recently used entries are dropped (they remain on disk)"""
+        if key in self.warm_cache:
+            self.warm_cache.move_to_end(key)
+            return
+        self.warm_cache[key] = png_bytes
+        self._warm_bytes += len(png_bytes)
+        while self._warm_bytes > self.warm_cache_bytes and self.warm_cache:
+            _, old_bytes = self.warm_cache.popitem(last=False)
+            self._warm_bytes -= len(old_bytes)
+            self.stats['warm_evictions'] += 1
+    
+    def _drop_from_memory(self, key):
+        """Remove key from both memory tiers - caller holds the lock"""
+        entry = self.memory_cache.pop(key, None)
+        if entry is not None:
+            self._hot_bytes -= self._entry_bytes(entry)
+        png_bytes = self.warm_cache.pop(key, None)
+        if png_bytes is not None:
+            self._warm_bytes -= len(png_bytes)
+    
+    def get_stats(self):
+        """Return hit/miss/eviction counters and current memory use of both tiers"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update({
+                'hot_entries': len(self.memory_cache), 'hot_bytes': self._hot_bytes,
+                'warm_entries': len(self.warm_cache), 'warm_bytes': self._warm_bytes,
+            })
+        return stats
     
     def clear_memory_cache(self):
-        """Clear the in-memory cache with thread safety"""
+        """Clear both in-memory tiers with thread safety"""
         with self._lock:
             self.memory_cache.clear()
+            self.warm_cache.clear()
+            self._hot_bytes = 0
+            self._warm_bytes = 0
     
     def cleanup(self):
         """Clean up cache resources and memory"""
+        self.stop_maintenance()
         try:
-            self.memory_cache.clear()
+            self.store.close()
+        except Exception as e:
+            print(f"[THUMBNAIL-CACHE] Error closing thumbnail store: {e}")
+        try:
+            self.clear_memory_cache()
             import gc
             gc.collect()
         except Exception:
             pass
 
-class VirtualFileLoader:
-    """Virtual file loader for large directories with lazy loading"""
-    
-    def __init__(self, chunk_size=100):
-        self.chunk_size = chunk_size
-        self.loaded_chunks = {}
-        self.total_items = 0
-        self.directory_cache = {}
-        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="FileLoader")
-    
-    def load_directory_async(self, directory_path, callback, sort_func=None):
-        """Load directory contents asynchronously in chunks"""
-        def load_worker():
-            try:
-                if not os.path.exists(directory_path):
-                    callback([], True)  # Empty list, done
+class ThumbnailScheduler(QObject):
+    """Background thumbnail renderer that works through visible icons first, then nearby ones, then the rest"""
+    thumbnailReady = pyqtSignal(str, int, object)  # path, size, QImage
+    storyboardReady = pyqtSignal(str, object)  # path, QImage sprite sheet
+
+    PRIORITY_VISIBLE = 0
+    PRIORITY_NEARBY = 1
+    PRIORITY_BACKGROUND = 2
+    STORYBOARD_OWNER = 'storyboard'  # Queue owner of storyboard jobs, which are never cancelled
+
+    def __init__(self, thumbnail_cache, max_workers=4, parent=None):
+        super().__init__(parent)
+        self.thumbnail_cache = thumbnail_cache
+        self.running = True
+        self._queue = []  # Heap of (priority, seq, owner, generation, path, size)
+        self._queued = {}  # (owner, path, size) -> (priority, seq) of the live queue entry
+        self._generations = defaultdict(int)  # Bumped by cancel() to drop in-flight results
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._workers = []
+        for i in range(max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"ThumbnailWorker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    @staticmethod
+    def can_render(file_path):
+        """Check whether the scheduler knows how to render a thumbnail for this file"""
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext == '.svg' and PlatformUtils.is_macos():
+            return False  # Matches IconWidget, which never renders SVG thumbnails on macOS
+        if ext in VIDEO_THUMBNAIL_EXTENSIONS:
+            return cached_ffmpeg_path() is not None
+        if ext in AUDIO_THUMBNAIL_EXTENSIONS:
+            return numpy_available() and (ext == '.wav' or cached_ffmpeg_path() is not None)
+        return ext in TEXT_THUMBNAIL_EXTENSIONS + PDF_THUMBNAIL_EXTENSIONS + IMAGE_THUMBNAIL_EXTENSIONS
+
+    def schedule(self, owner, batches, size):
+        """Replace the queued work of owner with batches of (priority, paths).
+        Renders already in flight for owner are kept and still delivered."""
+        with self._cond:
+            self._drop_queued(owner)
+            generation = self._generations[owner]
+            for priority, paths in batches:
+                for path in paths:
+                    key = (owner, path, size)
+                    if key in self._queued:
+                        continue  # Already queued at a higher priority
+                    self._seq += 1
+                    self._queued[key] = (priority, self._seq)
+                    heapq.heappush(self._queue, (priority, self._seq, owner, generation, path, size))
+            self._cond.notify_all()
+
+    def request_storyboard(self, path):
+        """Queue a video storyboard ahead of all thumbnails (the user is hovering over it)"""
+        with self._cond:
+            key = (self.STORYBOARD_OWNER, path, 0)
+            if key in self._queued:
+                return
+            self._seq += 1
+            self._queued[key] = (self.PRIORITY_VISIBLE - 1, self._seq)
+            heapq.heappush(self._queue, (self.PRIORITY_VISIBLE - 1, self._seq, self.STORYBOARD_OWNER, 0, path, 0))
+            self._cond.notify()
+
+    def has_pending(self):
+        """Whether any view is waiting for queued thumbnails or storyboards"""
+        with self._cond:
+            return bool(self._queued)
+
+    def cancel(self, owner):
+        """Drop all queued work for owner and discard results still being rendered"""
+        with self._cond:
+            self._generations[owner] += 1
+            self._drop_queued(owner)
+
+    def _drop_queued(self, owner):
+        """Remove queued (not yet started) entries for owner - caller holds the lock"""
+        if not any(key[0] == owner for key in self._queued):
+            return
+        self._queued = {key: value for key, value in self._queued.items() if key[0] != owner}
+        self._queue = [entry for entry in self._queue if entry[2] != owner]
+        heapq.heapify(self._queue)
+
+    def _worker_loop(self):
+        """Pop the most urgent job, render it and report it back to the UI thread"""
+        while True:
+            with self._cond:
+                while self.running and not self._queue:
+                    self._cond.wait()
+                if not self.running:
                     return
-                
-                # Get all items
+                priority, seq, owner, generation, path, size = heapq.heappop(self._queue)
+                key = (owner, path, size)
+                if self._queued.get(key) != (priority, seq):
+                    continue  # Superseded by a later schedule() call
+                del self._queued[key]
+            if owner == self.STORYBOARD_OWNER:
+                self._render_storyboard(path)
+                continue
+            image = self._render(path, size)
+            if image is None or not self.running:
+                continue
+            with self._cond:
+                if generation != self._generations[owner]:
+                    continue  # Owner navigated away while we were rendering
+            # Emitted from a worker thread, so Qt queues delivery to the UI thread
+            self.thumbnailReady.emit(path, size, image)
+
+    def _render(self, path, size):
+        """Return a QImage thumbnail from the cache, rendering and caching it if needed"""
+        try:
+            if os.path.isdir(path):
+                return self.thumbnail_cache.render_folder(path, size)
+            return self.thumbnail_cache.render(path, size)
+        except Exception as e:
+            print(f"[THUMBNAIL-SCHEDULER] Failed to render {path}: {e}")
+            return None
+
+    def _render_storyboard(self, path):
+        """Render a storyboard job and report it back to the UI thread"""
+        try:
+            image = self.thumbnail_cache.render_storyboard(path)
+        except Exception as e:
+            print(f"[THUMBNAIL-SCHEDULER] Failed to render storyboard for {path}: {e}")
+            return
+        if image is not None and self.running:
+            self.storyboardReady.emit(path, image)
+
+    def shutdown(self):
+        """Stop the workers without waiting for them (they are daemon threads)"""
+        with self._cond:
+            self.running = False
+            self._queue.clear()
+            self._queued.clear()
+            self._cond.notify_all()
+
+# Group keys for "group by type" sorting; any other file extension is "7_other", folders ""
+SORT_TYPE_GROUPS = {extension: group for group, extensions in (
+    ("1_images", ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp')),
+    ("2_documents", ('.txt', '.pdf', '.doc', '.docx', '.rtf', '.odt')),
+    ("3_videos", ('.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm')),
+    ("4_audio", ('.mp3', '.wav', '.flac', '.aac', '.ogg', '.wma')),
+    ("5_code", ('.py', '.js', '.html', '.css', '.cpp', '.java', '.c')),
+    ("6_archives", ('.zip', '.rar', '.7z', '.tar', '.gz')),
+) for extension in extensions}
+
+_NATURAL_SORT_DIGITS = re.compile(r'\d+')
+
+def _encode_sort_number(match):
+    digits = match.group().lstrip('0') or '0'
+    return '\x00%03d%s' % (len(digits), digits)
+
+def natural_sort_text(text, natural=True, case_sensitive=False):
+    """
+    Encode a file name so that plain string order is the order of FileManagerTab.sort_items' name key.
+
+    Each run of digits becomes NUL, the number's length and the number without leading zeros, so numbers
+    compare by value and a name sorts after the names it extends with a number ("a" < "a5" < "a!").
+
+    Args:
+        text (str): file name
+        natural (bool): compare digit runs as numbers
+        case_sensitive (bool): keep letter case
+
+    Returns:
+        str: sort key usable by sorted() and numpy alike
+    """
+    if not case_sensitive:
+        text = text.lower()
+    if not natural:
+        return text
+    return _NATURAL_SORT_DIGITS.sub(_encode_sort_number, text)
+
+class DirectorySnapshot:
+    """Names, types, sizes and modification times of one directory, from a single stat call per entry.
+
+    Filled from os.scandir in scan order (by DirectorySnapshot.scan or DirectoryLoader) and kept in compact
+    columns. Sorting, counts, selection helpers and the icon view read from it instead of calling
+    os.path.isdir/getsize/getmtime for each entry again. Sort keys are derived once into columns as well
+    (see sort_order), so changing the sort settings only permutes positions.
+    """
+    IS_DIR = 1
+    IS_FILE = 2
+    IS_LINK = 4
+    SAVE_FORMAT = b'GDS1'  # First bytes of to_bytes() data
+
+    def __init__(self, path):
+        self.path = path
+        self.names = []
+        self.flags = bytearray()
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.taken_at = time.time()
+        self._index = None  # name -> position, built on first lookup
+        self._counts = None  # (folders, files), computed on first use
+        self._entries = None  # Icon view rows in scan order, built on first use
+        self._sort_columns = {}  # Sort key columns, built on first use per key
+        self._sort_orders = {}  # Positions ordered by one sort key column (numpy only)
+        self._display_order = None  # (sort settings, positions) of the last sort_order call, saved with the snapshot
+
+    @classmethod
+    def scan(cls, path):
+        """List and stat path on the calling thread and return its snapshot"""
+        snapshot = cls(path)
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                snapshot.add(entry)
+        return snapshot
+
+    def add(self, entry):
+        """Append an os.DirEntry and return its position.
+
+        entry.stat() follows symlinks like os.path.isdir; it is the one syscall per entry on POSIX and free
+        on Windows, where scandir already returned the data. Broken symlinks are described by the link itself.
+        """
+        try:
+            st = entry.stat()
+        except OSError:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                st = None
+        try:
+            is_link = entry.is_symlink()  # From d_type, no extra syscall
+        except OSError:
+            is_link = False
+        return self._append(entry.name, st, is_link)
+
+    def add_path(self, name):
+        """Stat name in this directory and append it like add(); returns its position, or None if it is gone"""
+        full_path = os.path.join(self.path, name)
+        try:
+            link_st = os.lstat(full_path)
+        except OSError:
+            return None
+        st = link_st
+        if stat.S_ISLNK(link_st.st_mode):
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                pass  # Broken symlink, described by the link itself
+        return self._append(name, st, stat.S_ISLNK(link_st.st_mode))
+
+    def _append(self, name, st, is_link):
+        flags = self.IS_LINK if is_link else 0
+        if st is not None:
+            if stat.S_ISDIR(st.st_mode):
+                flags |= self.IS_DIR
+            elif stat.S_ISREG(st.st_mode):
+                flags |= self.IS_FILE
+        self.names.append(name)
+        self.flags.append(flags)
+        self.sizes.append(st.st_size if st is not None else 0)
+        self.mtimes.append(st.st_mtime if st is not None else 0.0)
+        self._index = None
+        self._counts = None
+        self._entries = None
+        self._sort_columns = {}
+        self._sort_orders = {}
+        self._display_order = None
+        return len(self.names) - 1
+
+    def __len__(self):
+        return len(self.names)
+
+    def is_dir(self, position):
+        return bool(self.flags[position] & self.IS_DIR)
+
+    def is_file(self, position):
+        return bool(self.flags[position] & self.IS_FILE)
+
+    def entry(self, position):
+        """Return the (name, path, is_dir) icon view row for position"""
+        name = self.names[position]
+        return (name, os.path.join(self.path, name), bool(self.flags[position] & self.IS_DIR))
+
+    def entries(self, order=None):
+        """Return icon view rows for every entry, in order (a list of positions) or scan order"""
+        rows = self._entries
+        if rows is None or len(rows) != len(self.names):
+            prefix = os.path.join(self.path, '')  # Same paths as os.path.join(self.path, name), built faster
+            names, flags, is_dir = self.names, self.flags, self.IS_DIR
+            rows = [(name, prefix + name, bool(flags[position] & is_dir)) for position, name in enumerate(names)]
+            self._entries = rows
+        if order is None:
+            return list(rows)
+        return list(map(rows.__getitem__, order))
+
+    def patched(self, changes):
+        """Return a new snapshot with a BackgroundFileMonitor batch ({name: change}) applied.
+
+        Changed names are dropped and stat-ed again (names that are gone stay dropped); every other entry is
+        copied as it is, so a batch costs len(changes) stat calls instead of a new listing.
+        """
+        snapshot = DirectorySnapshot(self.path)
+        dropped = sorted(position for position in map(self.index_of, changes) if position is not None)
+        start = 0
+        for position in dropped + [len(self.names)]:
+            snapshot.names.extend(self.names[start:position])
+            snapshot.flags.extend(self.flags[start:position])
+            snapshot.sizes.extend(self.sizes[start:position])
+            snapshot.mtimes.extend(self.mtimes[start:position])
+            start = position + 1
+        for name in changes:
+            snapshot.add_path(name)
+        return snapshot
+
+    def changed_names(self, other):
+        """Names in both snapshots whose type, size or modification time differ in other"""
+        changed = []
+        for position, name in enumerate(other.names):
+            old = self.index_of(name)
+            if old is not None and (self.flags[old] != other.flags[position] or self.sizes[old] != other.sizes[position]
+                                    or self.mtimes[old] != other.mtimes[position]):
+                changed.append(name)
+        return changed
+
+    def to_bytes(self):
+        """Serialize the columns and the last display order into a compact blob (see from_bytes)"""
+        settings, order = self._display_order or ((), [])
+        names = '\0'.join(self.names).encode('utf-8', 'surrogateescape')
+        header = json.dumps({"count": len(self.names), "names": len(names), "taken_at": self.taken_at,
+                             "sort": list(settings)}).encode('utf-8')
+        data = b''.join([self.SAVE_FORMAT, struct.pack('<I', len(header)), header, names, bytes(self.flags),
+                         self.sizes.tobytes(), self.mtimes.tobytes(), array('I', order).tobytes()])
+        return zlib.compress(data, 1)
+
+    @classmethod
+    def from_bytes(cls, path, blob):
+        """Rebuild a snapshot of path from to_bytes(); raises ValueError if the blob does not fit"""
+        data = zlib.decompress(blob)
+        if data[:4] != cls.SAVE_FORMAT:
+            raise ValueError("Unknown snapshot format")
+        (header_length,) = struct.unpack_from('<I', data, 4)
+        offset = 8 + header_length
+        header = json.loads(data[8:offset].decode('utf-8'))
+        count = header["count"]
+        snapshot = cls(path)
+        snapshot.taken_at = header["taken_at"]
+        end = offset + header["names"]
+        snapshot.names = data[offset:end].decode('utf-8', 'surrogateescape').split('\0') if count else []
+        snapshot.flags = bytearray(data[end:end + count])
+        offset = end + count
+        for column in (snapshot.sizes, snapshot.mtimes):
+            end = offset + count * column.itemsize
+            column.frombytes(data[offset:end])
+            offset = end
+        order = array('I')
+        order.frombytes(data[offset:])
+        if len(snapshot.names) != count or len(snapshot.flags) != count or len(snapshot.mtimes) != count:
+            raise ValueError("Truncated snapshot")
+        if header["sort"] and len(order) == count:
+            snapshot._display_order = (tuple(header["sort"]), order.tolist())
+        return snapshot
+
+    def index_of(self, name):
+        """Return the position of name, or None"""
+        if self._index is None:
+            self._index = {name: position for position, name in enumerate(self.names)}
+        return self._index.get(name)
+
+    def lookup(self, path):
+        """Return the position of path if it is an entry of this directory, else None"""
+        if os.path.dirname(path) != os.path.normpath(self.path):
+            return None
+        return self.index_of(os.path.basename(path))
+
+    def counts(self):
+        """Return (folders, files) like the status bar shows them"""
+        if self._counts is None:
+            folders = files = 0
+            for flags in self.flags:
+                if flags & self.IS_DIR:
+                    folders += 1
+                elif flags & self.IS_FILE:
+                    files += 1
+            self._counts = (folders, files)
+        return self._counts
+
+    def sort_order(self, sort_by="name", descending=False, directories_first=True, group_by_type=False,
+                   natural_sort=True, case_sensitive=False):
+        """Return the positions of all entries in display order, as FileManagerTab.sort_items orders names.
+
+        With numpy, the order by the chosen key is computed once per snapshot; folders first and type groups
+        are then one radix sort of small integers over it. Without numpy, a sort over tuples of cached columns.
+        Both are stable, so ties keep scan order just like sorted() on the names.
+        """
+        if sort_by not in ("size", "date", "type", "extension"):
+            sort_by = "name"
+        settings = (sort_by, descending, directories_first, group_by_type, natural_sort, case_sensitive)
+        if self._display_order is not None and self._display_order[0] == settings:
+            return list(self._display_order[1])  # Same settings as last time (or as saved by to_bytes)
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        key = (sort_by, natural_sort, case_sensitive)
+        if numpy is None:
+            columns = [self._sort_column(key)]  # Least significant first
+            if group_by_type:
+                columns.append(self._sort_column(("group", False, False)))
+            if directories_first:
+                columns.append(self._sort_column(("files_last", False, False)))
+            columns.reverse()
+            order = sorted(range(len(self.names)), key=lambda position: tuple(column[position] for column in columns))
+        else:
+            order = self._sort_orders.get(key)
+            if order is None:
+                column = self._sort_column(key)
+                values = numpy.array(column) if isinstance(column, list) else numpy.frombuffer(column, dtype=column.typecode)
+                order = numpy.argsort(values, kind='stable') if len(column) else numpy.zeros(0, dtype=numpy.intp)
+                self._sort_orders[key] = order
+            if group_by_type or directories_first:
+                groups = numpy.zeros(len(order), dtype=numpy.int8)
+                if group_by_type:
+                    groups += numpy.frombuffer(self._sort_column(("group", False, False)), dtype=numpy.int8)
+                if directories_first:
+                    groups += 8 * numpy.frombuffer(self._sort_column(("files_last", False, False)), dtype=numpy.int8)
+                order = order[numpy.argsort(groups[order], kind='stable')]
+            order = order.tolist()
+        if descending:
+            order.reverse()
+        self._display_order = (settings, order)
+        return list(order)
+
+    def sort_key(self, position, sort_by="name", directories_first=True, group_by_type=False,
+                 natural_sort=True, case_sensitive=False):
+        """Return what sort_order compares for one entry, to place a single new entry without sorting again"""
+        name, is_dir = self.names[position], bool(self.flags[position] & self.IS_DIR)
+        extension = os.path.splitext(name)[1].lower()
+        if sort_by == "size":
+            key = (0 if is_dir else self.sizes[position],)
+        elif sort_by == "date":
+            key = (self.mtimes[position],)
+        elif sort_by == "type":
+            key = ("0_directory" if is_dir else "1_" + (extension or "no_extension"),)
+        elif sort_by == "extension":
+            key = ("" if is_dir else (extension[1:] if extension else "zzz_no_extension"),)
+        else:
+            key = (natural_sort_text(name, natural_sort, case_sensitive),)
+        if group_by_type:
+            key = (0 if is_dir else int(SORT_TYPE_GROUPS.get(extension, "7_other")[0]),) + key
+        if directories_first:
+            key = (0 if is_dir else 1,) + key
+        return key
+
+    def _sort_column(self, key):
+        """Return (and cache) the sort key of every entry for key, a (sort_by, natural_sort, case_sensitive) tuple"""
+        column = self._sort_columns.get(key)
+        if column is not None:
+            return column
+        sort_by, natural_sort, case_sensitive = key
+        names, flags, is_dir = self.names, self.flags, self.IS_DIR
+        if sort_by in ("group", "type", "extension"):
+            extensions = self._sort_columns.get("extensions")
+            if extensions is None:
+                extensions = [os.path.splitext(name)[1].lower() for name in names]
+                self._sort_columns["extensions"] = extensions
+        if sort_by == "files_last":
+            column = array('b', [0 if value & is_dir else 1 for value in flags])
+        elif sort_by == "group":
+            column = array('b', [0 if value & is_dir else int(SORT_TYPE_GROUPS.get(extension, "7_other")[0])
+                                 for extension, value in zip(extensions, flags)])
+        elif sort_by == "size":
+            column = array('q', [0 if value & is_dir else size for size, value in zip(self.sizes, flags)])
+        elif sort_by == "date":
+            column = self.mtimes
+        elif sort_by == "type":
+            column = ["0_directory" if value & is_dir else "1_" + (extension or "no_extension")
+                      for extension, value in zip(extensions, flags)]
+        elif sort_by == "extension":
+            column = ["" if value & is_dir else (extension[1:] if extension else "zzz_no_extension")
+                      for extension, value in zip(extensions, flags)]
+        else:
+            column = [natural_sort_text(name, natural_sort, case_sensitive) for name in names]
+        self._sort_columns[key] = column
+        return column
+
+class DirectorySnapshotStore:
+    """Snapshots of recently visited directories on disk, so the folders of the last session render at once.
+
+    One SQLite table of DirectorySnapshot.to_bytes() blobs keyed by folder, keeping the MAX_SNAPSHOTS most
+    recently saved. Saves are written by a background thread; load() reads on the calling thread, which
+    costs a few milliseconds even for large folders, much less than listing a slow or network mount.
+    """
+    MAX_SNAPSHOTS = 64
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(PlatformUtils.get_cache_directory(), 'directory_snapshots.db')
+        self._lock = threading.Lock()
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SnapshotStore")
+
+    def _connection(self):
+        """Open the database on first use; caller holds the lock"""
+        if self._conn is None:
+            import sqlite3
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    path TEXT PRIMARY KEY,
+                    saved REAL NOT NULL,
+                    data BLOB NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_saved ON snapshots(saved)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def load(self, path):
+        """Return the saved DirectorySnapshot of path, or None"""
+        try:
+            with self._lock:
+                row = self._connection().execute("SELECT data FROM snapshots WHERE path = ?", (path,)).fetchone()
+            return DirectorySnapshot.from_bytes(path, row[0]) if row else None
+        except Exception as e:
+            print(f"[SNAPSHOT-STORE] Cannot load snapshot of {path}: {e}")
+            return None
+
+    def save(self, snapshot):
+        """Queue snapshot to be written, replacing the folder's previous one"""
+        try:
+            self._executor.submit(self._write, snapshot)
+        except RuntimeError:
+            pass  # Shut down
+
+    def _write(self, snapshot):
+        try:
+            data = snapshot.to_bytes()
+            with self._lock:
+                conn = self._connection()
+                conn.execute("INSERT OR REPLACE INTO snapshots (path, saved, data) VALUES (?, ?, ?)",
+                             (snapshot.path, time.time(), data))
+                conn.execute("DELETE FROM snapshots WHERE path NOT IN "
+                             "(SELECT path FROM snapshots ORDER BY saved DESC LIMIT ?)", (self.MAX_SNAPSHOTS,))
+                conn.commit()
+        except Exception as e:
+            print(f"[SNAPSHOT-STORE] Cannot save snapshot of {snapshot.path}: {e}")
+
+    def cleanup(self):
+        """Write the queued snapshots and close the database"""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            if self._conn is not None:
                 try:
-                    # Clear caches first
-                    if hasattr(self, 'loaded_chunks'):
-                        self.loaded_chunks.clear()
-                    if hasattr(self, 'directory_cache'):
-                        self.directory_cache.clear()
-                    # Shutdown executor with timeout
-                    if hasattr(self, 'executor') and self.executor:
-                        try:
-                            # Cancel all pending futures
-                            self.executor.shutdown(wait=False)
-                            import time
-                            time.sleep(0.1)
-                        except Exception as e:
-                            print(f"Error shutting down executor: {e}")
-                            try:
-                                self.executor.shutdown(wait=False)
-                            except:
-                                pass
-                except Exception as e:
-                    print(f"Error during VirtualFileLoader cleanup: {e}")
-                
-                # Send items in chunks
-                for i in range(0, len(items), self.chunk_size):
-                    chunk = items[i:i + self.chunk_size]
-                    chunk_index = i // self.chunk_size
-                    self.loaded_chunks[chunk_index] = chunk
-                    
-                    # Call callback with chunk and completion status
-                    is_complete = (i + self.chunk_size) >= len(items)
-                    callback(chunk, is_complete)
-                    
-                    # Small delay to prevent UI blocking
-                    time.sleep(0.001)
-                
-            except Exception as e:
-                callback([], True)  # Error occurred, return empty
-        
-        future = self.executor.submit(load_worker)
-        return future
-    
-    def get_chunk(self, chunk_index):
-        """Get a specific chunk by index"""
-        return self.loaded_chunks.get(chunk_index, [])
-    
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+
+
+class DirectoryLoader(QObject):
+    """Lists directories with os.scandir on background threads and streams the entries to the UI thread.
+
+    Each entry is stat-ed once into a DirectorySnapshot; the view gets (name, path, is_dir) rows from it.
+    A listing that completes within FIRST_BATCH_SECONDS arrives in one piece through listingFinished.
+    A longer one first sends what it has so far through entriesLoaded, then more batches every
+    BATCH_SECONDS, and finally the snapshot with every row in display order through listingFinished.
+    """
+    entriesLoaded = pyqtSignal(object, int, object)  # owner, generation, list of entries to append
+    # owner, generation, DirectorySnapshot, display order (snapshot positions, or None), all entries in that order
+    listingFinished = pyqtSignal(object, int, object, object, object)
+    listingFailed = pyqtSignal(object, int, str)  # owner, generation, error message
+
+    FIRST_BATCH_SECONDS = 0.05
+    BATCH_SECONDS = 0.25
+    CHECK_EVERY = 256  # Entries scanned between looks at the clock and at cancellation
+
+    def __init__(self, max_workers=2, parent=None):
+        super().__init__(parent)
+        self.running = True
+        self._generations = defaultdict(int)  # Bumped by load() and cancel() to drop older listings
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="DirectoryLoader")
+
+    def load(self, owner, directory_path, sort_func=None):
+        """Start listing directory_path for owner, cancelling the owner's previous listing.
+
+        Args:
+            owner: key of the requester (FileManagerTab uses id(self)); signals carry it back
+            directory_path (str): directory to list
+            sort_func: optional callable taking the DirectorySnapshot and returning its positions in display
+                order, run on the loader thread once the listing is complete
+
+        Returns:
+            int: generation carried by the signals of this listing
+        """
+        with self._lock:
+            self._generations[owner] += 1
+            generation = self._generations[owner]
+        self._executor.submit(self._list, owner, generation, directory_path, sort_func)
+        return generation
+
+    def cancel(self, owner):
+        """Stop the owner's listing; batches still in the event queue are ignored by generation"""
+        with self._lock:
+            self._generations[owner] += 1
+
+    def _is_current(self, owner, generation):
+        with self._lock:
+            return self.running and self._generations[owner] == generation
+
+    def _list(self, owner, generation, directory_path, sort_func):
+        """Scan directory_path, emitting timed batches, then the sorted listing"""
+        try:
+            snapshot = DirectorySnapshot(directory_path)
+            sent = 0
+            next_batch = time.monotonic() + self.FIRST_BATCH_SECONDS
+            with os.scandir(directory_path) as iterator:
+                for entry in iterator:
+                    count = snapshot.add(entry) + 1
+                    if count % self.CHECK_EVERY:
+                        continue
+                    if not self._is_current(owner, generation):
+                        return
+                    now = time.monotonic()
+                    if now >= next_batch:
+                        # Emitted from a worker thread, so Qt queues delivery to the UI thread. Only the
+                        # new rows are built; snapshot.entries() would redo all of them after each add
+                        self.entriesLoaded.emit(owner, generation, list(map(snapshot.entry, range(sent, count))))
+                        sent = count
+                        next_batch = now + self.BATCH_SECONDS
+            order = sort_func(snapshot) if sort_func is not None else None
+            if self._is_current(owner, generation):
+                self.listingFinished.emit(owner, generation, snapshot, order, snapshot.entries(order))
+        except Exception as e:
+            print(f"[DIRECTORY-LOADER] Failed to list {directory_path}: {e}")
+            if self._is_current(owner, generation):
+                self.listingFailed.emit(owner, generation, str(e))
+
     def cleanup(self):
-        """Clean up resources with improved shutdown handling"""
+        """Stop accepting work and drop listings in progress without waiting for them"""
+        with self._lock:
+            self.running = False
         try:
-            # ...removed debug print...
-            
-            # Clear caches first
-            if hasattr(self, 'loaded_chunks'):
-                self.loaded_chunks.clear()
-            if hasattr(self, 'directory_cache'):
-                self.directory_cache.clear()
-            
-            # Shutdown executor with timeout
-            if hasattr(self, 'executor') and self.executor:
-                try:
-                    # ...removed debug print...
-                    # Cancel all pending futures
-                    self.executor.shutdown(wait=False)
-                    
-                    # Give it a moment to shut down gracefully
-                    import time
-                    time.sleep(0.1)
-                    
-                    # ...removed debug print...
-                except Exception as e:
-                    print(f"Error shutting down executor: {e}")
-                    # Force shutdown if graceful fails
-                    try:
-                        self.executor.shutdown(wait=False)
-                    except:
-                        pass
-                        
-            # ...removed debug print...
-            
+            self._executor.shutdown(wait=False)
         except Exception as e:
-            print(f"Error during VirtualFileLoader cleanup: {e}")
+            print(f"[DIRECTORY-LOADER] Error shutting down: {e}")
 
 class MemoryManager:
     """Memory usage optimization and automatic garbage collection"""
@@ -2045,95 +4210,787 @@ class MemoryManager:
             
             # Force daemon thread termination - don't wait beyond timeout
 
-class BackgroundFileMonitor:
-    """Background file system monitoring for automatic updates with thread safety"""
-    
-    def __init__(self):
+class BackgroundFileMonitor(QObject):
+    """Watches directories for changes and reports them in coalesced batches, one per directory.
+
+    On Linux the kernel reports each create/delete/rename/modify through inotify (via ctypes, no extra
+    package). Where inotify is not available, or a directory cannot be watched (e.g. the watch limit is
+    reached), that directory is polled for mtime changes once a second instead.
+
+    Events are collected per directory until it has been quiet for COALESCE_SECONDS (or for at most
+    MAX_BATCH_SECONDS during a long copy), then delivered through directoryChanged on the UI thread, so
+    copying 10k files into a watched folder produces a few batches rather than 10k notifications.
+    """
+    # directory, {name: "created" | "deleted" | "modified"} (renames are a delete plus a create),
+    # or None when the entries are unknown and the directory has to be listed again
+    directoryChanged = pyqtSignal(str, object)
+
+    COALESCE_SECONDS = 0.2
+    MAX_BATCH_SECONDS = 1.0
+    POLL_SECONDS = 1.0
+
+    # inotify(7) constants
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_EXCL_UNLINK = 0x04000000
+    IN_NONBLOCK = 0x00000800
+    IN_CLOEXEC = 0x00080000
+    # Content changes are reported once the writer closes the file, not for every write() of a copy
+    WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+                  | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_EXCL_UNLINK)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
         self.monitored_directories = set()
         self.callbacks = defaultdict(list)
-        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="FileMonitor")
         self.running = True
-        
+
         # Add thread safety
         import threading
         self._lock = threading.RLock()
-        
-        # Start monitoring thread
-        self._start_monitoring()
-    
-    def _start_monitoring(self):
-        """Start background file monitoring"""
-        def monitor_worker():
-            directory_mtimes = {}
-            
-            while self.running:
+        self._watch_counts = defaultdict(int)  # directory -> number of add_directory calls not yet removed
+        self._watches = {}  # inotify watch descriptor -> directory
+        self._descriptors = {}  # directory -> inotify watch descriptor
+        self._polled = {}  # directory -> last seen mtime, for directories without an inotify watch
+        self._pending = {}  # directory -> {name: change} not delivered yet, or None for "list again"
+        self._pending_since = {}  # directory -> (first event time, last event time)
+
+        self._libc = None
+        self._inotify_fd = -1
+        self._wake_read = self._wake_write = -1  # Pipe that interrupts the wait on the inotify descriptor
+        self._wake_event = threading.Event()  # Interrupts the wait when there is no inotify
+        self._init_inotify()
+
+        # Start monitoring thread; a daemon, so an unfinished wait never blocks interpreter exit
+        self._thread = threading.Thread(target=self._monitor_worker, name="FileMonitor", daemon=True)
+        self._thread.start()
+
+    def _init_inotify(self):
+        """Open an inotify instance if the platform has one; otherwise every directory is polled"""
+        if not sys.platform.startswith('linux'):
+            return
+        try:
+            import ctypes
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            self._libc, self._inotify_fd = libc, fd
+            self._wake_read, self._wake_write = os.pipe()
+        except Exception as e:
+            print(f"[FILE-MONITOR] inotify unavailable, polling directories instead: {e}")
+
+    def add_directory(self, directory_path, callback=None):
+        """Add directory to monitor (thread-safe); watches are counted, so several tabs can share one.
+
+        Args:
+            directory_path (str): directory to watch
+            callback: optional callable(directory, changes), called on the monitor thread with each batch;
+                UI code should connect to directoryChanged instead
+        """
+        with self._lock:
+            self.monitored_directories.add(directory_path)
+            if callback is not None:
+                self.callbacks[directory_path].append(callback)
+            self._watch_counts[directory_path] += 1
+            if self._watch_counts[directory_path] > 1:
+                return
+            if self._libc is not None:
+                descriptor = self._libc.inotify_add_watch(self._inotify_fd, os.fsencode(directory_path), self.WATCH_MASK)
+                if descriptor >= 0:
+                    self._watches[descriptor] = directory_path
+                    self._descriptors[directory_path] = descriptor
+                    return
+                import ctypes
+                print(f"[FILE-MONITOR] Cannot watch {directory_path} ({os.strerror(ctypes.get_errno())}), polling it")
+            try:
+                self._polled[directory_path] = os.stat(directory_path).st_mtime
+            except OSError:
+                self._polled[directory_path] = 0
+        self._wake()
+
+    def remove_directory(self, directory_path, callback=None):
+        """Drop one watch of directory_path (thread-safe); monitoring stops when the last one is removed"""
+        with self._lock:
+            if callback is not None and callback in self.callbacks.get(directory_path, ()):
+                self.callbacks[directory_path].remove(callback)
+            if self._watch_counts.get(directory_path, 0) > 1:
+                self._watch_counts[directory_path] -= 1
+                return
+            self._forget(directory_path)
+            descriptor = self._descriptors.pop(directory_path, None)
+            if descriptor is not None:
+                self._watches.pop(descriptor, None)
                 try:
-                    for directory in list(self.monitored_directories):
-                        if not os.path.exists(directory):
-                            self.remove_directory(directory)
-                            continue
-                        
-                        try:
-                            current_mtime = os.path.getmtime(directory)
-                            last_mtime = directory_mtimes.get(directory, 0)
-                            
-                            if current_mtime > last_mtime:
-                                directory_mtimes[directory] = current_mtime
-                                
-                                # Directory changed, notify callbacks
-                                for callback in self.callbacks[directory]:
-                                    try:
-                                        callback(directory)
-                                    except Exception:
-                                        pass
-                        except (OSError, PermissionError):
-                            pass
-                    
-                    time.sleep(1)  # Check every second
+                    self._libc.inotify_rm_watch(self._inotify_fd, descriptor)
                 except Exception:
-                    time.sleep(1)
-        
-        self.executor.submit(monitor_worker)
-    
-    def add_directory(self, directory_path, callback):
-        """Add directory to monitor with callback (thread-safe)"""
+                    pass
+
+    def _forget(self, directory_path):
+        """Drop all state of directory_path; caller holds the lock"""
+        self.monitored_directories.discard(directory_path)
+        self.callbacks.pop(directory_path, None)
+        self._watch_counts.pop(directory_path, None)
+        self._polled.pop(directory_path, None)
+        self._pending.pop(directory_path, None)
+        self._pending_since.pop(directory_path, None)
+
+    def _wake(self):
+        """Make the monitor thread re-read its state (new polled directory, shutdown)"""
+        self._wake_event.set()
+        if self._wake_write >= 0:
+            try:
+                os.write(self._wake_write, b'x')
+            except OSError:
+                pass
+
+    def _wait(self, timeout):
+        """Wait up to timeout seconds (None: until woken); returns True when inotify events are ready"""
+        if self._inotify_fd < 0:
+            self._wake_event.wait(timeout)
+            self._wake_event.clear()
+            return False
+        import select
+        ready = select.select([self._wake_read, self._inotify_fd], [], [], timeout)[0]
+        if self._wake_read in ready:
+            os.read(self._wake_read, 4096)
+        return self._inotify_fd in ready
+
+    def _monitor_worker(self):
+        """Read inotify events and poll the remaining directories, delivering coalesced batches"""
+        next_poll = time.monotonic() + self.POLL_SECONDS
+        while self.running:
+            try:
+                now = time.monotonic()
+                with self._lock:
+                    deadlines = [min(first + self.MAX_BATCH_SECONDS, last + self.COALESCE_SECONDS)
+                                 for first, last in self._pending_since.values()]
+                    polling = bool(self._polled)
+                if polling:
+                    deadlines.append(next_poll)
+                timeout = max(0.0, min(deadlines) - now) if deadlines else None
+                events_ready = self._wait(timeout)
+                if not self.running:
+                    break
+                if events_ready:
+                    self._read_events()
+                now = time.monotonic()
+                if polling and now >= next_poll:
+                    self._poll_directories()
+                    next_poll = now + self.POLL_SECONDS
+                self._flush(now)
+            except Exception as e:
+                print(f"[FILE-MONITOR] Monitor error: {e}")
+                time.sleep(self.POLL_SECONDS)
+
+    def _read_events(self):
+        """Parse the queued inotify events into the pending batches"""
+        try:
+            data = os.read(self._inotify_fd, 65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        now = time.monotonic()
+        header = struct.Struct('iIII')
+        offset = 0
         with self._lock:
-            self.monitored_directories.add(directory_path)
-            self.callbacks[directory_path].append(callback)
-    
-    def remove_directory(self, directory_path):
-        """Remove directory from monitoring (thread-safe)"""
+            while offset + header.size <= len(data):
+                descriptor, mask, cookie, length = header.unpack_from(data, offset)
+                name = os.fsdecode(data[offset + header.size:offset + header.size + length].rstrip(b'\0'))
+                offset += header.size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    for directory in self._descriptors:
+                        self._queue(directory, None, None, now)  # Events were lost; list everything again
+                    continue
+                directory = self._watches.get(descriptor)
+                if directory is None:
+                    continue
+                if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF | self.IN_IGNORED):
+                    self._queue(directory, None, None, now)  # The directory itself went away
+                elif mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._queue(directory, name, "created", now)
+                elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    self._queue(directory, name, "deleted", now)
+                elif name:
+                    self._queue(directory, name, "modified", now)
+
+    def _poll_directories(self):
+        """Check the mtime of directories that have no inotify watch"""
+        now = time.monotonic()
         with self._lock:
-            self.monitored_directories.discard(directory_path)
-            if directory_path in self.callbacks:
-                del self.callbacks[directory_path]
-    
+            for directory, last_mtime in list(self._polled.items()):
+                try:
+                    current_mtime = os.stat(directory).st_mtime
+                except OSError:
+                    current_mtime = -1  # Gone or unreadable; report once
+                if current_mtime != last_mtime:
+                    self._polled[directory] = current_mtime
+                    self._queue(directory, None, None, now)  # Polling cannot tell which entries changed
+
+    def _queue(self, directory, name, change, now):
+        """Merge one event into directory's pending batch; caller holds the lock.
+
+        A name created and deleted within one batch disappears from it, deleted and created again becomes
+        modified, and a created entry that is then modified stays created.
+        """
+        first, last = self._pending_since.get(directory, (now, now))
+        self._pending_since[directory] = (first, now)
+        if name is None:
+            self._pending[directory] = None
+            return
+        changes = self._pending.setdefault(directory, {})
+        if changes is None:
+            return  # Already listing everything again
+        previous = changes.get(name)
+        if previous == "created" and change == "deleted":
+            del changes[name]
+        elif previous == "created":
+            pass
+        elif previous == "deleted" and change == "created":
+            changes[name] = "modified"
+        else:
+            changes[name] = change
+
+    def _flush(self, now):
+        """Deliver the batches of directories that have been quiet long enough"""
+        ready = []
+        with self._lock:
+            for directory, (first, last) in list(self._pending_since.items()):
+                if now - last >= self.COALESCE_SECONDS or now - first >= self.MAX_BATCH_SECONDS:
+                    changes = self._pending.pop(directory, None)
+                    del self._pending_since[directory]
+                    if changes is None or changes:
+                        ready.append((directory, changes, list(self.callbacks.get(directory, ()))))
+        for directory, changes, callbacks in ready:
+            # Emitted from the monitor thread, so Qt queues delivery to the UI thread
+            self.directoryChanged.emit(directory, changes)
+            for callback in callbacks:
+                try:
+                    callback(directory, changes)
+                except Exception as e:
+                    print(f"[FILE-MONITOR] Callback error for {directory}: {e}")
+
     def cleanup(self):
-        """Clean up resources - PLATFORM AWARE"""
+        """Stop the monitor thread and release the inotify instance"""
         self.running = False
-        
-        import platform
-        platform_name = platform.system().lower()
-        
+        self._wake()
         try:
-            if platform_name == 'darwin':  # macOS
-                # macOS can handle a brief wait for graceful shutdown
-                self.executor.shutdown(wait=True, timeout=0.1)
-            elif platform_name == 'windows':  # Windows
-                # Windows needs immediate shutdown
-                self.executor.shutdown(wait=False)
-            else:  # Linux and others
-                # Standard immediate shutdown
-                self.executor.shutdown(wait=False)
+            self._thread.join(timeout=0.5)
         except Exception:
-            # Fallback for any platform
+            pass
+        with self._lock:
+            for descriptor in list(self._watches):
+                try:
+                    self._libc.inotify_rm_watch(self._inotify_fd, descriptor)
+                except Exception:
+                    pass
+            self._watches.clear()
+            self._descriptors.clear()
+            self.monitored_directories.clear()
+            self.callbacks.clear()
+            self._watch_counts.clear()
+            self._polled.clear()
+            self._pending.clear()
+            self._pending_since.clear()
+        if not self._thread.is_alive():
+            for fd in (self._inotify_fd, self._wake_read, self._wake_write):
+                try:
+                    if fd >= 0:
+                        os.close(fd)
+                except OSError:
+                    pass
+            self._inotify_fd = -1
+
+class DirectoryModelRegistry(QObject):
+    """Process-wide DirectorySnapshots by folder, shared by every tab that shows the folder.
+
+    Tabs acquire() the folder they show and release() it when they leave; while a folder is held, and
+    for the RECENT_FOLDERS folders released most recently, its snapshot stays here and its watch stays
+    with BackgroundFileMonitor. Monitor batches are applied to the snapshot once, with
+    DirectorySnapshot.patched, and announced through snapshotChanged, so back/forward and a second tab
+    on the same folder show it without listing it again. Snapshots listed ahead of time by the
+    DirectoryPrefetcher are kept (and watched) the same way, PREFETCHED_FOLDERS of them at most.
+
+    With a DirectorySnapshotStore, completed listings and the snapshots of released and still-held folders
+    (at cleanup) are saved, and load_saved() returns them in the next session to render before listing.
+    With a ThumbnailCache, the file keys it remembers are refreshed from new listings and monitor batches.
+    """
+    # folder, previous snapshot (or None), new snapshot, changes: {name: change} when new is old patched
+    # with a monitor batch, None when new replaces old (a new listing) or new is None (list it again)
+    snapshotChanged = pyqtSignal(str, object, object, object)
+
+    RECENT_FOLDERS = 16  # Released folders whose snapshots are kept (and watched) for back/forward
+    PREFETCHED_FOLDERS = 8  # Prefetched folders not opened yet; kept apart so they do not push out history
+    MAX_PATCH_CHANGES = 256  # Larger monitor batches drop the snapshot; listing again is cheaper
+
+    def __init__(self, monitor=None, snapshot_store=None, thumbnail_cache=None, parent=None):
+        super().__init__(parent)
+        self.monitor = monitor
+        self.snapshot_store = snapshot_store
+        self.thumbnail_cache = thumbnail_cache
+        self._snapshots = {}  # folder -> DirectorySnapshot
+        self._unsaved = set()  # Folders whose snapshot was patched since it was last saved
+        self._references = defaultdict(int)  # folder -> number of tabs showing it
+        self._recent = OrderedDict()  # Released folders still watched, least recently released first
+        self._prefetched = OrderedDict()  # Prefetched folders still watched, least recently prefetched first
+        if monitor is not None:
+            monitor.directoryChanged.connect(self.on_directory_changed)
+
+    def acquire(self, folder):
+        """Hold folder for a tab: keep its snapshot and watch it until release()"""
+        self._references[folder] += 1
+        if self._references[folder] > 1:
+            return
+        if folder in self._recent or folder in self._prefetched:
+            self._recent.pop(folder, None)  # Still watched since it was released or prefetched
+            self._prefetched.pop(folder, None)
+            return
+        if self.monitor is not None:
+            self.monitor.add_directory(folder)
+
+    def release(self, folder):
+        """Drop a tab's hold on folder; its snapshot is kept among the recent folders"""
+        if self._references.get(folder, 0) > 1:
+            self._references[folder] -= 1
+            return
+        self._references.pop(folder, None)
+        if folder not in self._snapshots:
+            self._unwatch(folder)
+            return
+        self._save(folder)
+        self._recent[folder] = None
+        while len(self._recent) > self.RECENT_FOLDERS:
+            self._forget(next(iter(self._recent)))
+
+    def get(self, folder):
+        """Return the current snapshot of folder, or None if it has to be listed"""
+        return self._snapshots.get(folder)
+
+    def add_prefetched(self, snapshot, mtime_ns):
+        """Keep a snapshot the DirectoryPrefetcher listed, unless the folder changed since (see
+        DirectoryPrefetcher.snapshotPrefetched) or is already known"""
+        folder = snapshot.path
+        if folder in self._snapshots or folder in self._references:
+            return
+        if self.monitor is not None:
+            self.monitor.add_directory(folder)
+        try:
+            unchanged = os.stat(folder).st_mtime_ns == mtime_ns
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            self._unwatch(folder)  # Changes before the watch started would be missing from the snapshot
+            return
+        self._snapshots[folder] = snapshot
+        if self.thumbnail_cache is not None:
+            self.thumbnail_cache.refresh_folder(snapshot)
+        self._prefetched[folder] = None
+        while len(self._prefetched) > self.PREFETCHED_FOLDERS:
+            self._forget(next(iter(self._prefetched)))
+
+    def load_saved(self, folder):
+        """Return the snapshot of folder saved in an earlier session (possibly out of date), or None"""
+        return self.snapshot_store.load(folder) if self.snapshot_store is not None else None
+
+    def store(self, snapshot):
+        """Keep a completed listing of a held or recent folder and announce it to the other tabs"""
+        folder = snapshot.path
+        if folder not in self._references and folder not in self._recent and folder not in self._prefetched:
+            return
+        previous = self._snapshots.get(folder)
+        if previous is snapshot:
+            return
+        self._snapshots[folder] = snapshot
+        self._unsaved.add(folder)
+        self._save(folder)
+        if self.thumbnail_cache is not None:
+            self.thumbnail_cache.refresh_folder(snapshot)
+        self.snapshotChanged.emit(folder, previous, snapshot, None)
+
+    def on_directory_changed(self, folder, changes):
+        """Apply a monitor batch to the folder's snapshot, or drop it when it has to be listed again"""
+        if changes is not None and self.thumbnail_cache is not None:
+            self.thumbnail_cache.forget_paths([os.path.join(folder, name) for name in changes])
+        snapshot = self._snapshots.get(folder)
+        if snapshot is None:
+            if folder in self._references:
+                self.snapshotChanged.emit(folder, None, None, changes)  # Not listed yet (or being listed)
+            return
+        if changes is None or len(changes) > self.MAX_PATCH_CHANGES:
+            if folder in self._recent or folder in self._prefetched:
+                self._forget(folder)
+                return
+            del self._snapshots[folder]
+            self._unsaved.discard(folder)
+            self.snapshotChanged.emit(folder, snapshot, None, changes)
+            return
+        try:
+            patched = snapshot.patched(changes)
+        except Exception as e:
+            print(f"[FILE-MONITOR] Cannot apply changes to {folder}: {e}")
+            patched = None
+        if patched is None:
+            del self._snapshots[folder]
+        else:
+            self._snapshots[folder] = patched
+            self._unsaved.add(folder)
+        self.snapshotChanged.emit(folder, snapshot, patched, changes)
+
+    def _forget(self, folder):
+        """Drop a released or prefetched folder's snapshot and its watch"""
+        self._recent.pop(folder, None)
+        self._prefetched.pop(folder, None)
+        self._snapshots.pop(folder, None)
+        self._unsaved.discard(folder)
+        self._unwatch(folder)
+
+    def _save(self, folder):
+        """Queue folder's snapshot for the DirectorySnapshotStore if it changed since it was saved"""
+        if folder in self._unsaved and self.snapshot_store is not None:
+            self.snapshot_store.save(self._snapshots[folder])
+        self._unsaved.discard(folder)
+
+    def _unwatch(self, folder):
+        if self.monitor is not None:
+            self.monitor.remove_directory(folder)
+
+    def cleanup(self):
+        """Save the snapshots that changed, then drop every snapshot and watch"""
+        for folder in list(self._unsaved):
+            if folder in self._snapshots:
+                self._save(folder)
+        for folder in list(self._references) + list(self._recent) + list(self._prefetched):
+            self._unwatch(folder)
+        self._snapshots.clear()
+        self._references.clear()
+        self._recent.clear()
+        self._prefetched.clear()
+
+class DirectoryPrefetcher(QObject):
+    """Warms the folders the user is likely to open next, on one idle-priority thread.
+
+    For each requested folder it lists and sorts a DirectorySnapshot (handed to the DirectoryModelRegistry
+    through snapshotPrefetched, so opening the folder needs no listing) and then renders the thumbnails of
+    its first screen into the ThumbnailCache. Work is strictly budgeted: folders over MAX_ENTRIES are given
+    up, and at most first_screen thumbnails and MAX_THUMBNAIL_BYTES of source files are read per folder.
+    Everything queued is dropped by cancel(), which tabs call when they start listing a folder, and nothing
+    is read while the ThumbnailScheduler has thumbnails queued for the views.
+    """
+    # DirectorySnapshot, folder mtime (ns) before it was listed: changes from then on are not in the snapshot
+    snapshotPrefetched = pyqtSignal(object, object)
+
+    MAX_ENTRIES = 10000
+    MAX_THUMBNAIL_BYTES = 64 * 1024 * 1024
+    CHECK_EVERY = 256  # Entries listed between looks at cancellation
+    FOREGROUND_POLL_SECONDS = 0.05
+
+    def __init__(self, thumbnail_cache=None, thumbnail_scheduler=None, parent=None):
+        super().__init__(parent)
+        self.thumbnail_cache = thumbnail_cache
+        self.thumbnail_scheduler = thumbnail_scheduler
+        self.running = True
+        self.visits = defaultdict(int)  # folder -> times opened this session, to rank children
+        self._queue = []  # (folder, sort_func, thumbnail size, first_screen) still to prefetch
+        self._generation = 0  # Bumped by cancel() to stop the job in progress
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._worker_loop, name="DirectoryPrefetcher", daemon=True)
+        self._thread.start()
+
+    def note_visit(self, folder):
+        """Count that folder was opened"""
+        self.visits[folder] += 1
+
+    def prefetch(self, folders, sort_func=None, size=64, first_screen=0):
+        """Replace the queued work with folders, most likely first.
+
+        Args:
+            folders (list): folders to list, skipping any that cannot be read
+            sort_func: callable returning a snapshot's display order (as for DirectoryLoader.load)
+            size (int): thumbnail size of the icon view
+            first_screen (int): number of icons on one screen, whose thumbnails are rendered
+        """
+        with self._cond:
+            self._queue = [(folder, sort_func, size, first_screen) for folder in folders]
+            self._cond.notify()
+
+    def cancel(self):
+        """Drop the queued folders and stop the one in progress (foreground work has arrived)"""
+        with self._cond:
+            self._generation += 1
+            self._queue = []
+
+    def _is_current(self, generation):
+        return self.running and generation == self._generation
+
+    def _wait_for_foreground(self, generation):
+        """Wait while the views have thumbnails queued; returns False if the job was cancelled meanwhile"""
+        scheduler = self.thumbnail_scheduler
+        while self._is_current(generation) and scheduler is not None and scheduler.has_pending():
+            time.sleep(self.FOREGROUND_POLL_SECONDS)
+        return self._is_current(generation)
+
+    def _worker_loop(self):
+        PlatformUtils.set_current_thread_idle_priority()
+        while True:
+            with self._cond:
+                while self.running and not self._queue:
+                    self._cond.wait()
+                if not self.running:
+                    return
+                folder, sort_func, size, first_screen = self._queue.pop(0)
+                generation = self._generation
             try:
-                self.executor.shutdown(wait=False)
-            except:
-                pass
-        
-        self.monitored_directories.clear()
-        self.callbacks.clear()
+                self._prefetch_folder(generation, folder, sort_func, size, first_screen)
+            except Exception as e:
+                print(f"[PREFETCH] Failed to prefetch {folder}: {e}")
+
+    def _prefetch_folder(self, generation, folder, sort_func, size, first_screen):
+        """List one folder within the budget, hand over its snapshot, then warm its first screen"""
+        if not self._wait_for_foreground(generation):
+            return
+        mtime_ns = os.stat(folder).st_mtime_ns
+        snapshot = DirectorySnapshot(folder)
+        with os.scandir(folder) as iterator:
+            for entry in iterator:
+                snapshot.add(entry)
+                if len(snapshot) % self.CHECK_EVERY == 0:
+                    if len(snapshot) > self.MAX_ENTRIES or not self._is_current(generation):
+                        return
+        order = sort_func(snapshot) if sort_func else list(range(len(snapshot)))
+        if not self._is_current(generation):
+            return
+        # Emitted from the prefetch thread, so Qt queues delivery to the UI thread
+        self.snapshotPrefetched.emit(snapshot, mtime_ns)
+
+        if self.thumbnail_cache is None or first_screen <= 0:
+            return
+        budget = self.MAX_THUMBNAIL_BYTES
+        for position in order[:first_screen]:
+            path = os.path.join(folder, snapshot.names[position])
+            if not snapshot.is_file(position) or not ThumbnailScheduler.can_render(path):
+                continue
+            budget -= snapshot.sizes[position]
+            if budget < 0 or not self._wait_for_foreground(generation):
+                return
+            self.thumbnail_cache.render(path, size)
+
+    def cleanup(self):
+        """Stop the prefetch thread after the render in progress"""
+        with self._cond:
+            self.running = False
+            self._queue = []
+            self._cond.notify_all()
+
+class DetailColumnLoader(QObject):
+    """Background workers for the detail view columns that need more than the directory listing: image
+    dimensions, media duration and the recursive size of folders.
+
+    Work is queued like ThumbnailScheduler's, visible rows first, and each owner's queue is replaced on every
+    schedule() call. Results are not sent one by one: they collect for BATCH_MS and are then delivered with a
+    single valuesReady signal per owner, so the view sees a few dataChanged ranges instead of one per cell.
+    """
+    valuesReady = pyqtSignal(object, object)  # owner, list of (path, kind, value)
+    _resultsPending = pyqtSignal()  # Worker -> UI thread: start the batch timer
+
+    DIMENSIONS = 'dimensions'  # (width, height) or None
+    DURATION = 'duration'  # Seconds or None
+    FOLDER_SIZE = 'folder_size'  # (bytes, complete) or None
+    PRIORITY_VISIBLE = 0
+    PRIORITY_NEARBY = 1
+    BATCH_MS = 50
+    MAX_FOLDER_ENTRIES = 100000  # A folder size stops counting here and is shown as a lower bound
+
+    def __init__(self, max_workers=2, parent=None):
+        super().__init__(parent)
+        self.running = True
+        self._queue = []  # Heap of (priority, seq, owner, generation, path, kind)
+        self._queued = {}  # (owner, path, kind) -> (priority, seq) of the live queue entry
+        self._generations = defaultdict(int)  # Bumped by cancel() to drop in-flight results
+        self._seq = 0
+        self._results = []  # (owner, generation, path, kind, value) not yet delivered
+        self._cond = threading.Condition()
+        self._batch_timer = QTimer(self)
+        self._batch_timer.setSingleShot(True)
+        self._batch_timer.timeout.connect(self._deliver)
+        self._resultsPending.connect(self._on_results_pending)
+        self._workers = []
+        for i in range(max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"DetailColumnWorker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    @classmethod
+    def kind_for(cls, name, is_dir):
+        """Return the expensive column a detail view row has, or None"""
+        if is_dir:
+            return cls.FOLDER_SIZE
+        ext = os.path.splitext(name)[1].lower()
+        if ext in IMAGE_THUMBNAIL_EXTENSIONS:
+            return cls.DIMENSIONS
+        if ext == '.wav' or (ext in VIDEO_THUMBNAIL_EXTENSIONS + AUDIO_THUMBNAIL_EXTENSIONS
+                             and cached_ffmpeg_path() is not None):
+            return cls.DURATION
+        return None
+
+    def schedule(self, owner, batches):
+        """Replace the queued work of owner with batches of (priority, [(path, kind), ...]).
+        Values already being computed for owner are kept and still delivered."""
+        with self._cond:
+            self._drop_queued(owner)
+            generation = self._generations[owner]
+            for priority, jobs in batches:
+                for path, kind in jobs:
+                    key = (owner, path, kind)
+                    if key in self._queued:
+                        continue  # Already queued at a higher priority
+                    self._seq += 1
+                    self._queued[key] = (priority, self._seq)
+                    heapq.heappush(self._queue, (priority, self._seq, owner, generation, path, kind))
+            self._cond.notify_all()
+
+    def cancel(self, owner):
+        """Drop all queued work for owner, stop its folder sizes and discard values still being computed"""
+        with self._cond:
+            self._generations[owner] += 1
+            self._drop_queued(owner)
+
+    def _drop_queued(self, owner):
+        """Remove queued (not yet started) entries for owner - caller holds the lock"""
+        if not any(key[0] == owner for key in self._queued):
+            return
+        self._queued = {key: value for key, value in self._queued.items() if key[0] != owner}
+        self._queue = [entry for entry in self._queue if entry[2] != owner]
+        heapq.heapify(self._queue)
+
+    def _is_current(self, owner, generation):
+        with self._cond:
+            return self.running and generation == self._generations[owner]
+
+    def _worker_loop(self):
+        """Pop the most urgent job, compute it and add the value to the next batch"""
+        while True:
+            with self._cond:
+                while self.running and not self._queue:
+                    self._cond.wait()
+                if not self.running:
+                    return
+                priority, seq, owner, generation, path, kind = heapq.heappop(self._queue)
+                key = (owner, path, kind)
+                if self._queued.get(key) != (priority, seq):
+                    continue  # Superseded by a later schedule() call
+                del self._queued[key]
+            try:
+                value = self._compute(path, kind, lambda: not self._is_current(owner, generation))
+            except Exception as e:
+                print(f"[DETAIL-COLUMNS] Failed to read {kind} of {path}: {e}")
+                value = None
+            with self._cond:
+                if not self.running or generation != self._generations[owner]:
+                    continue  # Owner navigated away while we were computing
+                first = not self._results
+                self._results.append((owner, generation, path, kind, value))
+            if first:
+                # Emitted from a worker thread, so Qt queues delivery to the UI thread
+                self._resultsPending.emit()
+
+    def _on_results_pending(self):
+        if not self._batch_timer.isActive():
+            self._batch_timer.start(self.BATCH_MS)
+
+    def _deliver(self):
+        """Hand the values computed since the last batch to their owners, one signal per owner"""
+        with self._cond:
+            results, self._results = self._results, []
+            generations = dict(self._generations)
+        by_owner = defaultdict(list)
+        for owner, generation, path, kind, value in results:
+            if generation == generations.get(owner, 0):
+                by_owner[owner].append((path, kind, value))
+        for owner, values in by_owner.items():
+            self.valuesReady.emit(owner, values)
+
+    def _compute(self, path, kind, cancelled):
+        if kind == self.DIMENSIONS:
+            return self.image_dimensions(path)
+        if kind == self.DURATION:
+            return self.media_duration(path)
+        if kind == self.FOLDER_SIZE:
+            return self.folder_size(path, cancelled)
+        return None
+
+    @staticmethod
+    def image_dimensions(path):
+        """Return (width, height) of an image from its header, or None"""
+        size = QImageReader(path).size()  # Reads the header only
+        if size.isValid():
+            return (size.width(), size.height())
+        try:
+            from PIL import Image
+        except ImportError:
+            return None
+        try:
+            with Image.open(path) as image:
+                return image.size
+        except Exception:
+            return None
+
+    @staticmethod
+    def media_duration(path):
+        """Return the duration of a video or audio file in seconds, or None"""
+        if path.lower().endswith('.wav'):
+            try:
+                import wave
+                with wave.open(path, 'rb') as wav:
+                    return wav.getnframes() / float(wav.getframerate())
+            except Exception:
+                pass  # Compressed WAV, which the wave module cannot read; ffmpeg can
+        return probe_video_duration(path)
+
+    def folder_size(self, path, cancelled):
+        """Return (total size of the files below path, whether all of them were counted), or None if cancelled.
+        Symlinks are not followed; counting stops after MAX_FOLDER_ENTRIES entries."""
+        total, count, pending = 0, 0, [path]
+        while pending:
+            if cancelled():
+                return None
+            try:
+                with os.scandir(pending.pop()) as iterator:
+                    for entry in iterator:
+                        count += 1
+                        if count > self.MAX_FOLDER_ENTRIES:
+                            return (total, False)
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                total += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            continue
+            except OSError:
+                continue  # Unreadable subfolder, counted as empty
+        return (total, True)
+
+    def shutdown(self):
+        """Stop the workers without waiting for them (they are daemon threads)"""
+        with self._cond:
+            self.running = False
+            self._queue.clear()
+            self._queued.clear()
+            self._results = []
+            self._cond.notify_all()
+        self._batch_timer.stop()
 
 # Advanced Search and Filtering Classes
 class SearchEngine:
@@ -3517,6 +6374,26 @@ class PreviewPane(QWidget):
         self.preview_area.setWidget(self.preview_content)
         self.content_layout.addWidget(self.preview_area)
         
+        # Page navigation for PDFs
+        self.pdf_page = 0
+        self.pdf_renderer = PdfPageRenderer(self)
+        self.pdf_renderer.pageReady.connect(self.on_pdf_page_ready)
+        self.pdf_nav = QWidget()
+        pdf_nav_layout = QHBoxLayout()
+        pdf_nav_layout.setContentsMargins(0, 0, 0, 0)
+        self.pdf_prev_button = QPushButton("◀")
+        self.pdf_prev_button.clicked.connect(lambda: self.show_pdf_page(self.pdf_page - 1))
+        self.pdf_page_label = QLabel()
+        self.pdf_page_label.setAlignment(Qt.AlignCenter)
+        self.pdf_next_button = QPushButton("▶")
+        self.pdf_next_button.clicked.connect(lambda: self.show_pdf_page(self.pdf_page + 1))
+        pdf_nav_layout.addWidget(self.pdf_prev_button)
+        pdf_nav_layout.addWidget(self.pdf_page_label, 1)
+        pdf_nav_layout.addWidget(self.pdf_next_button)
+        self.pdf_nav.setLayout(pdf_nav_layout)
+        self.pdf_nav.hide()
+        self.content_layout.addWidget(self.pdf_nav)
+        
         # Text editor for text files
         self.text_editor = QPlainTextEdit()
         self.text_editor.setReadOnly(True)
@@ -3553,6 +6430,7 @@ class PreviewPane(QWidget):
         self.update_properties(file_info)
         
         # Update content preview
+        self.pdf_nav.hide()
         if file_info.isFile():
             self.update_content_preview(file_path)
         else:
@@ -3561,6 +6439,7 @@ class PreviewPane(QWidget):
     def update_content_preview(self, file_path):
         """Enhanced content preview with syntax highlighting"""
         self.text_editor.hide()
+        self.pdf_nav.hide()
         self.preview_area.show()
         
         file_ext = os.path.splitext(file_path)[1].lower()
@@ -3661,7 +6540,12 @@ class PreviewPane(QWidget):
         return '\n'.join(formatted_lines)
     
     def preview_pdf_info(self, file_path):
-        """Show PDF file information"""
+        """Show the first page of a PDF, or its file information if it cannot be rendered (see on_pdf_page_ready)"""
+        self.preview_content.setText("Loading PDF preview...")
+        self.show_pdf_page(0)
+
+    def show_pdf_file_info(self, file_path):
+        """Show the file information of a PDF that cannot be rendered"""
         try:
             file_size = os.path.getsize(file_path)
             info_text = f"PDF Document\n\n"
@@ -3673,6 +6557,33 @@ class PreviewPane(QWidget):
         except Exception as e:
             self.preview_content.setText(f"Error reading PDF info: {str(e)}")
     
+    def show_pdf_page(self, page_number):
+        """Ask pdf_renderer for one page of the current PDF; the document stays open in pdf_document_pool for flipping"""
+        if self.current_file is None or page_number < 0:
+            return
+        box = max(200, min(self.preview_area.viewport().width(), self.preview_area.viewport().height()) - 10)
+        self.pdf_renderer.request(self.current_file, page_number, box)
+
+    def on_pdf_page_ready(self, file_path, page_number, page_count, image):
+        """Show a page rendered by pdf_renderer, unless the user has moved on to another file"""
+        if file_path != self.current_file:
+            return
+        if page_count == 0:
+            self.show_pdf_file_info(file_path)
+            return
+        if not 0 <= page_number < page_count:
+            return
+        if image is None:
+            self.preview_content.setText("Cannot render PDF page")
+            return
+        self.pdf_page = page_number
+        self.preview_content.setPixmap(QPixmap.fromImage(image))
+        self.preview_content.adjustSize()
+        self.pdf_page_label.setText(f"Page {page_number + 1} of {page_count}")
+        self.pdf_prev_button.setEnabled(page_number > 0)
+        self.pdf_next_button.setEnabled(page_number < page_count - 1)
+        self.pdf_nav.show()
+    
     def preview_video_info(self, file_path):
         """Show video file information"""
         try:
@@ -3755,6 +6666,7 @@ class PreviewPane(QWidget):
         
         # Hide text editor and show preview area
         self.text_editor.hide()
+        self.pdf_nav.hide()
         self.preview_area.show()
     
     def update_properties(self, file_info):
@@ -5114,118 +8026,62 @@ class ViewModeManager:
         self.view_widgets = {}
     
     def set_mode(self, mode):
-        if mode in [self.ICON_VIEW, self.LIST_VIEW, self.DETAIL_VIEW]:
-            self.current_mode = mode
-    
-    def get_mode(self):
-        return self.current_mode
-
-class IconWidget(QWidget):
-    clicked = pyqtSignal(str, object)  # Pass the event modifiers
-    doubleClicked = pyqtSignal(str)
-    rightClicked = pyqtSignal(str, QPoint)
-
-    def __init__(self, file_name, full_path, is_dir, thumbnail_size=64, thumbnail_cache=None, parent=None):
-        super().__init__(parent)
-        self.file_name = file_name
-        self.full_path = full_path
-        self.is_dir = is_dir
-        self.thumbnail_size = thumbnail_size
-        self.thumbnail_cache = thumbnail_cache
-        self.dark_mode = False  # Default value, will be updated by parent
-        self.is_selected = False  # Track selection state
-        
-        layout = QVBoxLayout()
-        # Optimize spacing for compact layout
-        layout.setSpacing(2)  # Adequate spacing between icon and label
-        layout.setContentsMargins(4, 4, 4, 4)  # More margins to prevent text cutoff
-        
-        # Create icon or thumbnail
-        pixmap = self.create_icon_or_thumbnail(full_path, is_dir)
-        self.icon_label = QLabel()
-        self.icon_label.setPixmap(pixmap)
-        self.icon_label.setAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-        
-        # Create label with filename (apply truncation and underscore wrapping)
-        self.label = QLabel()
-        self.update_label_text()  # Set initial text
-        self.label.setWordWrap(True)
-        self.label.setAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-        # Make the text smaller and more compact but with adequate margins
-        font = self.label.font()
-        font.setPointSize(8)  # Smaller font for more compact layout
-        self.label.setFont(font)
-        # Add padding to prevent text cutoff at edges
-        self.label.setContentsMargins(2, 2, 2, 2)
-        self.label.setStyleSheet("QLabel { padding: 2px; }")
-        
-        layout.addWidget(self.icon_label)
-        layout.addWidget(self.label)
-        self.setLayout(layout)
-        self.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Minimum)
-        self.setToolTip(full_path)
-        self.setStyleSheet("QWidget { border: 2px solid transparent; }")
-    
-    def update_label_text(self):
-        """Update label text based on selection state and apply formatting"""
-        # Apply truncation based on selection state
-        display_name = truncate_filename_for_display(self.file_name, max_chars=13, selected=self.is_selected)
-        
-        # Apply underscore wrapping if showing full name or if short enough
-        if self.is_selected or len(self.file_name) <= 13:
-            display_name = format_filename_with_underscore_wrap(display_name)
-        
-        self.label.setText(display_name)
-    
-    def set_selected(self, selected):
-        """Set the selection state and update display accordingly"""
-        if self.is_selected != selected:
-            self.is_selected = selected
-            self.update_label_text()
-            # Update border style to show selection
-            if selected:
-                self.setStyleSheet("QWidget { border: 2px solid #0078d4; background-color: rgba(0, 120, 212, 0.1); }")
-            else:
-                self.setStyleSheet("QWidget { border: 2px solid transparent; }")
-
-    def update_style_for_theme(self, dark_mode):
-        """Update the widget style based on the current theme"""
-        self.dark_mode = dark_mode
-        if dark_mode:
-            self.label.setStyleSheet("QLabel { color: #ffffff; padding: 2px; }")
-        else:
-            self.label.setStyleSheet("QLabel { padding: 2px; }")
-    
-    def update_thumbnail_size(self, new_size):
-        """Update the icon/thumbnail size for this widget"""
-    # ...removed thumbnail debug message...
-        if self.thumbnail_size != new_size:
-            self.thumbnail_size = new_size
-            # Regenerate the icon with the new size
-            pixmap = self.create_icon_or_thumbnail(self.full_path, self.is_dir)
-            self.icon_label.setPixmap(pixmap)
-            self.update()  # Force a repaint
+        if mode in [self.ICON_VIEW, self.LIST_VIEW, self.DETAIL_VIEW]:
+            self.current_mode = mode
+    
+    def get_mode(self):
+        return self.current_mode
+
+def count_storyboard_frames(image):
+    """Count the frames of a storyboard sprite sheet (square frames side by side) that hold a picture
+
+    Args:
+        image: QImage as returned by ThumbnailCache.get_storyboard
 
-    def create_icon_or_thumbnail(self, full_path, is_dir):
-        print(f'[THUMBNAIL-DEBUG] create_icon_or_thumbnail called: {full_path} (is_dir={is_dir})')
-        """Create either a file icon or an image thumbnail"""
+    Returns:
+        int: number of leading frames; short videos have fewer keyframes than slots and the empty slots
+        at the end are transparent
+    """
+    frame_size = image.height()
+    if frame_size <= 0:
+        return 0
+    frames = 0
+    for index in range(image.width() // frame_size):
+        if image.pixelColor(index * frame_size + frame_size // 2, frame_size // 2).alpha() == 0:
+            break
+        frames += 1
+    return frames
+
+class IconPainter:
+    """Paints file, folder and thumbnail icons for IconWidget and the icon view model.
+
+    Plain object rather than a widget: IconWidget mixes it in, IconViewModel keeps one instance and paints
+    rows with it on demand. Uses thumbnail_size, thumbnail_cache and dark_mode, and sets thumbnail_pending
+    when the real thumbnail still has to come from ThumbnailScheduler.
+    """
+    thumbnail_size = 64
+    thumbnail_cache = None
+    thumbnail_pending = False
+    dark_mode = False
+
+    def create_icon_or_thumbnail(self, full_path, is_dir, stat=None):
+        """Create either a file icon or an image thumbnail.
+        stat is (size, mtime) from the folder's DirectorySnapshot, so the file is not stat'ed again."""
         size = self.thumbnail_size
-        # Try to get thumbnail from cache first
-        if self.thumbnail_cache and not is_dir:
-            print(f'[THUMBNAIL-DEBUG] Checking cache for {full_path}')
-            cached_thumbnail = self.thumbnail_cache.get(full_path, size)
+        self.thumbnail_pending = False
+        # Only files with real content thumbnails are in the cache; they are rendered at master size by
+        # ThumbnailScheduler. Type icons (archives, executables, unknown files) are cheap to paint at the
+        # display size and are never stored.
+        content_exts = {'.docx', '.doc'}.union(TEXT_THUMBNAIL_EXTENSIONS, PDF_THUMBNAIL_EXTENSIONS, IMAGE_THUMBNAIL_EXTENSIONS,
+                                                VIDEO_THUMBNAIL_EXTENSIONS, AUDIO_THUMBNAIL_EXTENSIONS)
+        if self.thumbnail_cache and not is_dir and os.path.splitext(full_path)[1].lower() in content_exts:
+            cached_thumbnail = self.thumbnail_cache.get(full_path, size, stat=stat)
             if cached_thumbnail:
-                print(f'[THUMBNAIL-DEBUG] Cache hit for {full_path}, returning cached thumbnail')
-                # Always return a QPixmap, never raw bytes
-                if isinstance(cached_thumbnail, QPixmap):
-                    return cached_thumbnail
-                elif isinstance(cached_thumbnail, (bytes, bytearray)):
-                    pixmap = QPixmap()
-                    pixmap.loadFromData(cached_thumbnail, 'PNG')
-                    return pixmap
-                else:
-                    print(f'[THUMBNAIL-DEBUG] Unexpected cached_thumbnail type: {type(cached_thumbnail)}')
-                    return QPixmap()
+                return cached_thumbnail
+        return self.paint_icon_or_thumbnail(full_path, is_dir, size, stat)
+
+    def paint_icon_or_thumbnail(self, full_path, is_dir, size, stat=None):
+        """Paint the icon or thumbnail for full_path into a size x size pixmap, without caching it"""
         # Create a consistent-sized frame for all icons
         framed_pixmap = QPixmap(size, size)
         framed_pixmap.fill(Qt.transparent)
@@ -5233,45 +8089,27 @@ class IconWidget(QWidget):
         painter.setRenderHint(QPainter.Antialiasing)
         try:
             if is_dir:
-                folder_preview = self.create_folder_preview(full_path, size)
+                if self.thumbnail_cache:
+                    # Show the plain folder icon now; ThumbnailScheduler composes the previews off the UI thread
+                    overlay = self.thumbnail_cache.get_image(full_path, size, 'folder', stat)
+                    self.thumbnail_pending = not self.thumbnail_cache.folder_checked(full_path)
+                else:
+                    overlay = render_folder_overlay(full_path, size, render_image_thumbnail)
+                folder_preview = self.create_folder_preview(full_path, size, overlay)
                 painter.drawPixmap(0, 0, folder_preview)
             else:
                 image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp', '.ico'}
                 if not PlatformUtils.is_macos():
                     image_extensions.add('.svg')
                 file_ext = os.path.splitext(full_path)[1].lower()
-                print(f'[THUMBNAIL-DEBUG] file_ext for {full_path}: {file_ext}')
 
-                # Check for cached text/PDF/DOCX thumbnail
+                # Text/PDF/DOCX thumbnails were looked up in create_icon_or_thumbnail
                 text_exts = {'.txt', '.md', '.log', '.ini', '.csv', '.json', '.xml', '.py', '.c', '.cpp', '.h', '.java', '.js', '.html', '.css'}
                 pdf_exts = {'.pdf'}
                 docx_exts = {'.docx', '.doc'}
                 if self.thumbnail_cache and (file_ext in text_exts or file_ext in pdf_exts or file_ext in docx_exts):
-                    print(f'[THUMBNAIL-DEBUG] Entered text/pdf/docx cache/painter block for {full_path}')
-                    cached_thumb = self.thumbnail_cache.get(full_path, size)
-                    print(f'[THUMBNAIL-DEBUG] After cache get for {full_path}, cached_thumb type: {type(cached_thumb)}')
-                    if cached_thumb:
-                        print(f'[THUMBNAIL-DEBUG] Using cached text/pdf/docx thumbnail for {full_path}')
-                        if isinstance(cached_thumb, bytes):
-                            pixmap = QPixmap()
-                            pixmap.loadFromData(cached_thumb, 'PNG')
-                            print(f'[THUMBNAIL-DEBUG] Loaded pixmap from bytes for {full_path}, isNull={pixmap.isNull()}')
-                        else:
-                            pixmap = cached_thumb
-                            print(f'[THUMBNAIL-DEBUG] Loaded pixmap from QPixmap for {full_path}, isNull={pixmap.isNull()}')
-                        if not pixmap.isNull() and pixmap.width() > 0 and pixmap.height() > 0:
-                            painter.drawPixmap(0, 0, pixmap)
-                            painter.end()
-                            print(f'[THUMBNAIL-DEBUG] Returning framed_pixmap for {full_path} (valid cached pixmap)')
-                            return framed_pixmap
-                        else:
-                            print(f'[THUMBNAIL-DEBUG] Cached pixmap for {full_path} is invalid, drawing default icon')
-                            self.draw_default_file_icon(painter, full_path, size)
-                            painter.end()
-                            print(f'[THUMBNAIL-DEBUG] Returning framed_pixmap for {full_path} (default icon)')
-                            return framed_pixmap
-                    else:
-                        print(f'[THUMBNAIL-DEBUG] No cached_thumb for {full_path} in text/pdf/docx block')
+                    # Show the default icon now; ThumbnailScheduler delivers the real one later
+                    self.thumbnail_pending = ThumbnailScheduler.can_render(full_path)
                 if ArchiveManager.is_archive(full_path):
                     self.draw_archive_icon(painter, full_path, size)
                 elif file_ext == '.exe' and not is_dir:
@@ -5286,251 +8124,51 @@ class IconWidget(QWidget):
                     except Exception as e:
                         print(f"[EXE-ICON] Error drawing icon for {full_path}: {e}")
                         self.draw_default_file_icon(painter, full_path, size)
-                elif file_ext in image_extensions and self.is_safe_image_file(full_path):
-                    try:
-                        original_pixmap = QPixmap(full_path)
-                        if not original_pixmap.isNull() and original_pixmap.width() > 0 and original_pixmap.height() > 0:
-                            thumbnail = original_pixmap.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                            x = (size - thumbnail.width()) // 2
-                            y = (size - thumbnail.height()) // 2
-                            painter.drawPixmap(x, y, thumbnail)
-                            pen = QPen(Qt.lightGray, 1)
-                            painter.setPen(pen)
-                            painter.drawRect(x, y, thumbnail.width() - 1, thumbnail.height() - 1)
+                elif file_ext in image_extensions and self.is_safe_image_file(full_path, stat[0] if stat else None):
+                    if self.thumbnail_cache:
+                        # Show the default icon now; ThumbnailScheduler decodes the image off the UI thread
+                        self.draw_default_file_icon(painter, full_path, size)
+                        self.thumbnail_pending = True
+                    else:
+                        thumbnail = render_image_thumbnail(full_path, size)
+                        if thumbnail is not None:
+                            painter.drawImage(0, 0, thumbnail)
                         else:
                             self.draw_default_file_icon(painter, full_path, size)
-                    except Exception:
+                elif file_ext in VIDEO_THUMBNAIL_EXTENSIONS:
+                    if self.thumbnail_cache and ThumbnailScheduler.can_render(full_path):
+                        # Show the default icon now; ThumbnailScheduler extracts the frame off the UI thread
                         self.draw_default_file_icon(painter, full_path, size)
-                elif file_ext in {'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v'}:
-                    print(f'[THUMBNAIL-DEBUG] Entered video thumbnail code for {full_path} (ext={file_ext})')
-                    import sys
-                    if sys.platform == 'darwin':
-                        # On macOS, use cache if available, else generate on demand (with robust display fallback)
-                        cached_thumb = self.thumbnail_cache.get(full_path, size) if self.thumbnail_cache else None
-                        if cached_thumb:
-                            print(f'[THUMBNAIL-DEBUG] Using cached video thumbnail for {full_path}')
-                            if isinstance(cached_thumb, bytes):
-                                pixmap = QPixmap()
-                                pixmap.loadFromData(cached_thumb, 'PNG')
-                                print(f'[THUMBNAIL-DEBUG] Loaded pixmap from bytes for {full_path}, isNull={{pixmap.isNull()}}')
-                            else:
-                                pixmap = cached_thumb
-                                print(f'[THUMBNAIL-DEBUG] Loaded pixmap from QPixmap for {full_path}, isNull={{pixmap.isNull()}}')
-                            if not pixmap.isNull() and pixmap.width() > 0 and pixmap.height() > 0:
-                                painter.drawPixmap(0, 0, pixmap)
-                                painter.end()
-                                print(f'[THUMBNAIL-DEBUG] Returning framed_pixmap for {full_path} (valid cached video pixmap)')
-                                return framed_pixmap
-                            else:
-                                print(f'[THUMBNAIL-DEBUG] Cached video pixmap for {full_path} is invalid, drawing default icon')
-                                self.draw_default_file_icon(painter, full_path, size)
-                                painter.end()
-                                print(f'[THUMBNAIL-DEBUG] Returning framed_pixmap for {full_path} (default icon)')
-                                return framed_pixmap
-                        # If not cached, generate on demand (like other platforms)
-                        print(f'[THUMBNAIL-DEBUG] No cached video thumbnail for {full_path}, generating on demand')
-                        try:
-                            import shutil
-                            ffmpeg_path = shutil.which('ffmpeg')
-                            if not ffmpeg_path:
-                                print(f'[THUMBNAIL-DEBUG] ffmpeg not found in PATH for {full_path}')
-                                self.draw_default_file_icon(painter, full_path, size)
-                                painter.end()
-                                return framed_pixmap
-                            import ffmpeg
-                            from PIL import Image
-                            import tempfile
-                            import threading
-                            import time
-                            thumb_result = {'success': False, 'path': None, 'error': None}
-                            def ffmpeg_thumb():
-                                try:
-                                    print(f'[THUMBNAIL-DEBUG] Running ffmpeg.probe on {full_path}')
-                                    probe = ffmpeg.probe(full_path)
-                                    duration = float(probe['format']['duration'])
-                                    seek_time = max(duration * 0.1, 1.0)
-                                    with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-                                        tmp_path = tmp.name
-                                    print(f'[THUMBNAIL-DEBUG] Extracting frame at {seek_time}s to {tmp_path}')
-                                    (
-                                        ffmpeg
-                                        .input(full_path, ss=seek_time)
-                                        .output(tmp_path, vframes=1, format='image2', vcodec='mjpeg')
-                                        .overwrite_output()
-                                        .run(quiet=True)
-                                    )
-                                    thumb_result['success'] = True
-                                    thumb_result['path'] = tmp_path
-                                except Exception as e:
-                                    print(f'[THUMBNAIL-DEBUG] ffmpeg error: {e}')
-                                    thumb_result['error'] = str(e)
-                            thread = threading.Thread(target=ffmpeg_thumb)
-                            thread.start()
-                            thread.join(timeout=5)
-                            if thread.is_alive():
-                                print(f'[THUMBNAIL-DEBUG] ffmpeg thread timeout for {full_path}')
-                                thumb_result['error'] = 'timeout'
-                            if thumb_result['success'] and thumb_result['path']:
-                                try:
-                                    print(f'[THUMBNAIL-DEBUG] Opening image {thumb_result["path"]}')
-                                    img = Image.open(thumb_result['path'])
-                                    img = img.convert('RGBA').resize((size, size), Image.LANCZOS)
-                                    img.save(thumb_result['path'], 'PNG')
-                                    video_pixmap = QPixmap(thumb_result['path'])
-                                    if video_pixmap.isNull():
-                                        # Fallback: try QImage then convert to QPixmap
-                                        from PyQt5.QtGui import QImage
-                                        img_fallback = QImage(thumb_result['path'])
-                                        if not img_fallback.isNull():
-                                            video_pixmap = QPixmap.fromImage(img_fallback)
-                                            print(f'[THUMBNAIL-DEBUG] QImage fallback succeeded for {full_path}')
-                                        else:
-                                            print(f'[THUMBNAIL-DEBUG] QImage fallback also failed for {full_path}')
-                                    os.remove(thumb_result['path'])
-                                    if not video_pixmap.isNull():
-                                        print(f'[THUMBNAIL-DEBUG] Successfully drew thumbnail for {full_path}')
-                                        painter.drawPixmap(0, 0, video_pixmap)
-                                    else:
-                                        print(f'[THUMBNAIL-DEBUG] QPixmap is null for {full_path}')
-                                        self.draw_default_file_icon(painter, full_path, size)
-                                except Exception as e:
-                                    print(f'[THUMBNAIL-DEBUG] PIL/QPixmap error: {e}')
-                                    self.draw_default_file_icon(painter, full_path, size)
-                            else:
-                                print(f'[THUMBNAIL-DEBUG] Thumbnail extraction failed for {full_path}: {thumb_result["error"]}')
-                                self.draw_default_file_icon(painter, full_path, size)
-                        except Exception as e:
-                            print(f'[THUMBNAIL-DEBUG] Exception in macOS video thumbnail code for {full_path}: {e}')
-                            self.draw_default_file_icon(painter, full_path, size)
-                        painter.end()
-                        return framed_pixmap
-                    # All other platforms: use cache if available, else generate on demand
-                    # ...existing code for Linux/Windows video thumbnail extraction...
-                    try:
-                        if sys.platform.startswith('linux'):
-                            print(f'[THUMBNAIL-DEBUG] Platform is Linux, using PyAV for {full_path}')
-                            try:
-                                print(f'[THUMBNAIL-DEBUG] PyAV: Opening {full_path}')
-                                import av
-                                from PIL import Image
-                                import numpy as np
-                                import tempfile
-                                container = av.open(full_path)
-                                video_streams = [s for s in container.streams if s.type == 'video']
-                                if not video_streams:
-                                    print(f'[THUMBNAIL-DEBUG] PyAV: No video streams found in {full_path}')
-                                    self.draw_default_file_icon(painter, full_path, size)
-                                    return
-                                stream = video_streams[0]
-                                print(f'[THUMBNAIL-DEBUG] PyAV: Using stream {stream.index}, duration={stream.duration}, time_base={stream.time_base}')
-                                seek_time = max(float(stream.duration * stream.time_base) * 0.1, 1.0) if stream.duration else 1.0
-                                print(f'[THUMBNAIL-DEBUG] PyAV: Seeking to {seek_time}s')
-                                container.seek(int(seek_time / stream.time_base), any_frame=False, backward=True, stream=stream)
-                                frame = next(container.decode(stream), None)
-                                if frame is None:
-                                    print(f'[THUMBNAIL-DEBUG] PyAV: No frame decoded for {full_path}')
-                                    self.draw_default_file_icon(painter, full_path, size)
-                                    return
-                                print(f'[THUMBNAIL-DEBUG] PyAV: Got frame for {full_path}')
-                                img = frame.to_image().convert('RGBA').resize((size, size), Image.LANCZOS)
-                                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                                    img.save(tmp.name, 'PNG')
-                                    video_pixmap = QPixmap(tmp.name)
-                                if not video_pixmap.isNull():
-                                    print(f'[THUMBNAIL-DEBUG] PyAV: Successfully drew thumbnail for {full_path}')
-                                    painter.drawPixmap(0, 0, video_pixmap)
-                                else:
-                                    print(f'[THUMBNAIL-DEBUG] PyAV QPixmap is null for {full_path}')
-                                    self.draw_default_file_icon(painter, full_path, size)
-                            except Exception as e:
-                                print(f'[THUMBNAIL-DEBUG] PyAV error: {e}')
-                                self.draw_default_file_icon(painter, full_path, size)
+                        self.thumbnail_pending = True
+                    else:
+                        thumbnail = render_video_thumbnail(full_path, size)
+                        if thumbnail is not None:
+                            painter.drawImage(0, 0, thumbnail)
                         else:
-                            print(f'[THUMBNAIL-DEBUG] Platform is not Linux, using ffmpeg-python for {full_path}')
-                            import shutil
-                            ffmpeg_path = shutil.which('ffmpeg')
-                            if not ffmpeg_path:
-                                print(f'[THUMBNAIL-DEBUG] ffmpeg not found in PATH for {full_path}')
-                                if 'painter' in locals() and painter is not None:
-                                    self.draw_default_file_icon(painter, full_path, size)
-                                # Ensure we do not proceed further to avoid segfaults
-                                return
-                            import ffmpeg
-                            from PIL import Image
-                            import tempfile
-                            import threading
-                            import time
-                            thumb_result = {'success': False, 'path': None, 'error': None}
-                            def ffmpeg_thumb():
-                                try:
-                                    print(f'[THUMBNAIL-DEBUG] Running ffmpeg.probe on {full_path}')
-                                    probe = ffmpeg.probe(full_path)
-                                    duration = float(probe['format']['duration'])
-                                    seek_time = max(duration * 0.1, 1.0)
-                                    with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-                                        tmp_path = tmp.name
-                                    print(f'[THUMBNAIL-DEBUG] Extracting frame at {seek_time}s to {tmp_path}')
-                                    (
-                                        ffmpeg
-                                        .input(full_path, ss=seek_time)
-                                        .output(tmp_path, vframes=1, format='image2', vcodec='mjpeg')
-                                        .overwrite_output()
-                                        .run(quiet=True)
-                                    )
-                                    thumb_result['success'] = True
-                                    thumb_result['path'] = tmp_path
-                                except Exception as e:
-                                    print(f'[THUMBNAIL-DEBUG] ffmpeg error: {e}')
-                                    thumb_result['error'] = str(e)
-                            thread = threading.Thread(target=ffmpeg_thumb)
-                            thread.start()
-                            thread.join(timeout=5)
-                            if thread.is_alive():
-                                print(f'[THUMBNAIL-DEBUG] ffmpeg thread timeout for {full_path}')
-                                thumb_result['error'] = 'timeout'
-                            if thumb_result['success'] and thumb_result['path']:
-                                try:
-                                    print(f'[THUMBNAIL-DEBUG] Opening image {thumb_result["path"]}')
-                                    img = Image.open(thumb_result['path'])
-                                    img = img.convert('RGBA').resize((size, size), Image.LANCZOS)
-                                    img.save(thumb_result['path'], 'PNG')
-                                    video_pixmap = QPixmap(thumb_result['path'])
-                                    os.remove(thumb_result['path'])
-                                    if not video_pixmap.isNull():
-                                        print(f'[THUMBNAIL-DEBUG] Successfully drew thumbnail for {full_path}')
-                                        painter.drawPixmap(0, 0, video_pixmap)
-                                    else:
-                                        print(f'[THUMBNAIL-DEBUG] QPixmap is null for {full_path}')
-                                        self.draw_default_file_icon(painter, full_path, size)
-                                except Exception as e:
-                                    print(f'[THUMBNAIL-DEBUG] PIL/QPixmap error: {e}')
-                                    self.draw_default_file_icon(painter, full_path, size)
-                            else:
-                                print(f'[THUMBNAIL-DEBUG] Thumbnail extraction failed for {full_path}: {thumb_result["error"]}')
-                                self.draw_default_file_icon(painter, full_path, size)
-                    except Exception as e:
-                        print(f'[THUMBNAIL-DEBUG] Exception in thumbnail code for {full_path}: {e}')
-                        self.draw_default_file_icon(painter, full_path, size)
+                            self.draw_default_file_icon(painter, full_path, size)
+                elif file_ext in AUDIO_THUMBNAIL_EXTENSIONS:
+                    # Waveforms need the whole file decoded, so they are only ever drawn in the background
+                    self.draw_default_file_icon(painter, full_path, size)
+                    self.thumbnail_pending = bool(self.thumbnail_cache) and ThumbnailScheduler.can_render(full_path)
                 else:
                     self.draw_default_file_icon(painter, full_path, size)
         except Exception:
             self.draw_generic_file_icon(painter, size, is_dir)
         painter.end()
-        # Only cache generic icons for file types that are not text, PDF, DOCX, or audio
-        text_exts = {'.txt', '.md', '.log', '.ini', '.csv', '.json', '.xml', '.py', '.c', '.cpp', '.h', '.java', '.js', '.html', '.css'}
-        pdf_exts = {'.pdf'}
-        docx_exts = {'.docx', '.doc'}
-        audio_exts = {'.wav', '.mp3', '.flac', '.ogg', '.oga', '.aac', '.m4a', '.wma', '.opus', '.aiff', '.alac'}
-        file_ext = os.path.splitext(full_path)[1].lower()
-        if self.thumbnail_cache and not is_dir and file_ext not in text_exts | pdf_exts | docx_exts | audio_exts:
-            self.thumbnail_cache.put(full_path, size, framed_pixmap)
         return framed_pixmap
 
-    def is_safe_image_file(self, file_path):
-        """Check if the file is safe to load as an image on the current platform"""
+    def is_safe_image_file(self, file_path, file_size=None):
+        """Check if the file is safe to load as an image on the current platform.
+        Given file_size from a listing, the file itself is not touched; whether it can be read then shows
+        when ThumbnailScheduler decodes it."""
         try:
             # Check file size - avoid very large files that could cause memory issues
-            if os.path.getsize(file_path) > 50 * 1024 * 1024:  # 50MB limit
+            if file_size is None:
+                file_size = os.path.getsize(file_path)
+                check_access = True
+            else:
+                check_access = False
+            if file_size > 50 * 1024 * 1024:  # 50MB limit
                 return False
             
             # Platform-specific safety checks
@@ -5548,7 +8186,7 @@ class IconWidget(QWidget):
                     return False
                 
                 # Check if file is readable
-                if not os.access(file_path, os.R_OK):
+                if check_access and not os.access(file_path, os.R_OK):
                     return False
             elif PlatformUtils.is_windows():
                 # Windows-specific checks
@@ -5558,7 +8196,7 @@ class IconWidget(QWidget):
                     return False
             else:  # Linux/Unix
                 # Unix-specific checks
-                if not os.access(file_path, os.R_OK):
+                if check_access and not os.access(file_path, os.R_OK):
                     return False
             
             return True
@@ -5860,8 +8498,8 @@ class IconWidget(QWidget):
             painter.setPen(QPen(Qt.gray, 1))
             painter.drawRect(size//4, size//4, size//2, size//2)
 
-    def create_folder_preview(self, folder_path, size):
-        """Create a folder icon with preview thumbnails of images inside"""
+    def create_folder_preview(self, folder_path, size, overlay=None):
+        """Create a folder icon with overlay (previews of images inside, from render_folder_overlay) drawn on top"""
         preview_pixmap = QPixmap(size, size)
         preview_pixmap.fill(Qt.transparent)
         
@@ -5911,87 +8549,118 @@ class IconWidget(QWidget):
             print(f"Error getting folder icon for {folder_path}: {e}")
             self.draw_generic_file_icon(painter, size, True)
         
-        # Try to find image files in the folder for preview
-        try:
-            # Platform-specific image extensions for folder previews
-            image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp'}
-            # Add more extensions for non-macOS systems
-            if not PlatformUtils.is_macos():
-                image_extensions.update({'.tiff', '.tif', '.webp', '.ico'})
-            
-            image_files = []
-            
-            # Get first few image files from the folder
-            try:
-                files = os.listdir(folder_path)
-                # Platform-specific file filtering
-                if PlatformUtils.is_macos():
-                    files = [f for f in files if not f.startswith('.') and not f.startswith('._')]
-                elif PlatformUtils.is_windows():
-                    files = [f for f in files if f.lower() not in ('thumbs.db', 'desktop.ini')]
-                else:  # Linux/Unix
-                    files = [f for f in files if not f.startswith('.')]
-                
-                for file_name in files:
-                    if len(image_files) >= 4:  # Limit to 4 images max
-                        break
-                    file_ext = os.path.splitext(file_name)[1].lower()
-                    if file_ext in image_extensions:
-                        file_path = os.path.join(folder_path, file_name)
-                        if os.path.isfile(file_path) and self.is_safe_image_file(file_path):
-                            image_files.append(file_path)
-            except (OSError, PermissionError):
-                # If we can't read the folder, just show the folder icon
-                painter.end()
-                return preview_pixmap
-            
-            # If we found images, create small previews
-            if image_files:
-                preview_size = max(8, size // 4)  # Ensure minimum size, each preview is 1/4 the size
-                positions = [
-                    (size - preview_size - 2, 2),  # Top right
-                    (size - preview_size - 2, preview_size + 4),  # Middle right
-                    (size - preview_size * 2 - 4, 2),  # Top, second from right
-                    (size - preview_size * 2 - 4, preview_size + 4)  # Middle, second from right
-                ]
-                
-                for i, img_path in enumerate(image_files[:4]):
-                    try:
-                        img_pixmap = QPixmap(img_path)
-                        if not img_pixmap.isNull() and img_pixmap.width() > 0 and img_pixmap.height() > 0:
-                            # Scale to preview size
-                            thumbnail = img_pixmap.scaled(preview_size, preview_size, 
-                                                        Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                            
-                            # Create a small frame for the preview
-                            preview_frame = QPixmap(preview_size, preview_size)
-                            preview_frame.fill(Qt.white)
-                            
-                            frame_painter = QPainter(preview_frame)
-                            frame_painter.setRenderHint(QPainter.Antialiasing)
-                            
-                            # Center thumbnail in frame
-                            thumb_x = (preview_size - thumbnail.width()) // 2
-                            thumb_y = (preview_size - thumbnail.height()) // 2
-                            frame_painter.drawPixmap(thumb_x, thumb_y, thumbnail)
-                            
-                            # Draw border
-                            pen = QPen(Qt.darkGray, 1)
-                            frame_painter.setPen(pen)
-                            frame_painter.drawRect(0, 0, preview_size - 1, preview_size - 1)
-                            frame_painter.end()
-                            
-                            # Draw the preview on the folder icon
-                            pos_x, pos_y = positions[i]
-                            painter.drawPixmap(pos_x, pos_y, preview_frame)
-                    except Exception:
-                        continue  # Skip this image if there's an error
-        except Exception:
-            pass  # If we can't read the folder, just show the regular folder icon
+        if overlay is not None and not overlay.isNull():
+            if overlay.width() != size or overlay.height() != size:
+                overlay = overlay.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            painter.drawImage(0, 0, overlay)
         
         painter.end()
         return preview_pixmap
 
+    def thumbnail_pixmap(self, full_path, is_dir, image):
+        """Turn a QImage from ThumbnailScheduler into the size x size pixmap shown for full_path, or None"""
+        size = self.thumbnail_size
+        if is_dir:
+            # Folders get the preview overlay from ThumbnailCache.render_folder
+            return self.create_folder_preview(full_path, size, image)
+        pixmap = QPixmap.fromImage(image)
+        if pixmap.isNull():
+            return None
+        if pixmap.width() > size or pixmap.height() > size:
+            pixmap = pixmap.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        framed_pixmap = QPixmap(size, size)
+        framed_pixmap.fill(Qt.transparent)
+        painter = QPainter(framed_pixmap)
+        painter.drawPixmap((size - pixmap.width()) // 2, (size - pixmap.height()) // 2, pixmap)
+        painter.end()
+        return framed_pixmap
+
+class IconWidget(QWidget, IconPainter):
+    clicked = pyqtSignal(str, object)  # Pass the event modifiers
+    doubleClicked = pyqtSignal(str)
+    rightClicked = pyqtSignal(str, QPoint)
+
+    def __init__(self, file_name, full_path, is_dir, thumbnail_size=64, thumbnail_cache=None, parent=None):
+        super().__init__(parent)
+        self.file_name = file_name
+        self.full_path = full_path
+        self.is_dir = is_dir
+        self.thumbnail_size = thumbnail_size
+        self.thumbnail_cache = thumbnail_cache
+        self.dark_mode = False  # Default value, will be updated by parent
+        self.is_selected = False  # Track selection state
+        
+        layout = QVBoxLayout()
+        # Optimize spacing for compact layout
+        layout.setSpacing(2)  # Adequate spacing between icon and label
+        layout.setContentsMargins(4, 4, 4, 4)  # More margins to prevent text cutoff
+        
+        # Create icon or thumbnail
+        pixmap = self.create_icon_or_thumbnail(full_path, is_dir)
+        self.icon_label = QLabel()
+        self.icon_label.setPixmap(pixmap)
+        self.icon_label.setAlignment(Qt.AlignCenter | Qt.AlignVCenter)
+        
+        # Create label with filename (apply truncation and underscore wrapping)
+        self.label = QLabel()
+        self.update_label_text()  # Set initial text
+        self.label.setWordWrap(True)
+        self.label.setAlignment(Qt.AlignCenter | Qt.AlignVCenter)
+        # Make the text smaller and more compact but with adequate margins
+        font = self.label.font()
+        font.setPointSize(8)  # Smaller font for more compact layout
+        self.label.setFont(font)
+        # Add padding to prevent text cutoff at edges
+        self.label.setContentsMargins(2, 2, 2, 2)
+        self.label.setStyleSheet("QLabel { padding: 2px; }")
+        
+        layout.addWidget(self.icon_label)
+        layout.addWidget(self.label)
+        self.setLayout(layout)
+        self.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Minimum)
+        self.setToolTip(full_path)
+        self.setStyleSheet("QWidget { border: 2px solid transparent; }")
+    
+    def update_label_text(self):
+        """Update label text based on selection state and apply formatting"""
+        # Apply truncation based on selection state
+        display_name = truncate_filename_for_display(self.file_name, max_chars=13, selected=self.is_selected)
+        
+        # Apply underscore wrapping if showing full name or if short enough
+        if self.is_selected or len(self.file_name) <= 13:
+            display_name = format_filename_with_underscore_wrap(display_name)
+        
+        self.label.setText(display_name)
+    
+    def set_selected(self, selected):
+        """Set the selection state and update display accordingly"""
+        if self.is_selected != selected:
+            self.is_selected = selected
+            self.update_label_text()
+            # Update border style to show selection
+            if selected:
+                self.setStyleSheet("QWidget { border: 2px solid #0078d4; background-color: rgba(0, 120, 212, 0.1); }")
+            else:
+                self.setStyleSheet("QWidget { border: 2px solid transparent; }")
+
+    def update_style_for_theme(self, dark_mode):
+        """Update the widget style based on the current theme"""
+        self.dark_mode = dark_mode
+        if dark_mode:
+            self.label.setStyleSheet("QLabel { color: #ffffff; padding: 2px; }")
+        else:
+            self.label.setStyleSheet("QLabel { padding: 2px; }")
+    
+    def update_thumbnail_size(self, new_size):
+        """Update the icon/thumbnail size for this widget"""
+    # ...removed thumbnail debug message...
+        if self.thumbnail_size != new_size:
+            self.thumbnail_size = new_size
+            # Regenerate the icon with the new size
+            pixmap = self.create_icon_or_thumbnail(self.full_path, self.is_dir)
+            self.icon_label.setPixmap(pixmap)
+            self.update()  # Force a repaint
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.clicked.emit(self.full_path, event.modifiers())
@@ -6003,362 +8672,919 @@ class IconWidget(QWidget):
             self.doubleClicked.emit(self.full_path)
             event.accept()  # Explicitly accept to prevent propagation issues on Linux
 
-class IconContainer(QWidget):
+class IconViewModel(QAbstractListModel):
+    """Rows of the icon view as (name, path, is_dir) tuples; icons are painted only for rows that get shown.
+
+    The delegate asks for Qt.DecorationRole only while painting, so a 100k-entry folder costs one tuple per
+    entry plus pixmaps for the rows that have actually been on screen (kept in a bounded LRU).
+    """
+    PathRole = Qt.UserRole + 1
+    IsDirRole = Qt.UserRole + 2
+    MAX_DECORATIONS = 2000  # Painted icons kept around, several screens even at the smallest size
+    MAX_PATCH_RUNS = 256  # Separate insert/remove runs apply_entries patches before it resets instead
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self.snapshot = None  # DirectorySnapshot the rows were listed in, read for the size and mtime of a row
+        self._rows = {}  # path -> row, rebuilt on first use after a reset or reorder (see rows)
+        self.thumbnail_size = 64
+        self.thumbnail_cache = None
+        self.video_storyboards = False
+        self.pending = set()  # Painted rows still showing a placeholder until ThumbnailScheduler delivers
+        self.storyboards = {}  # path -> (QImage sprite sheet, frame count) for hovered videos
+        self._decorations = OrderedDict()  # path -> QPixmap, least recently shown first
+        self._painter = IconPainter()
+        self._hover = None  # (path, x, width) of the mouse over a video row
+        self._hover_frame = None  # (path, frame index, QPixmap) shown instead of the icon while scrubbing
+
+    @property
+    def rows(self):
+        """Dictionary of path -> row"""
+        if self._rows is None:
+            self._rows = {entry[1]: row for row, entry in enumerate(self.entries)}
+        return self._rows
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.entries):
+            return None
+        name, path, is_dir = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            return name
+        if role == Qt.DecorationRole:
+            if self._hover_frame is not None and self._hover_frame[0] == path:
+                return self._hover_frame[2]
+            return self.decoration(index.row())
+        if role == Qt.ToolTipRole or role == self.PathRole:
+            return path
+        if role == self.IsDirRole:
+            return is_dir
+        return None
+
+    def set_entries(self, entries, thumbnail_size=None, thumbnail_cache=None, video_storyboards=False):
+        """Replace all rows with entries, a list of (name, path, is_dir) in display order"""
+        self.beginResetModel()
+        self.entries = list(entries)
+        self._rows = None
+        if thumbnail_size is not None:
+            self.thumbnail_size = thumbnail_size
+        self.thumbnail_cache = thumbnail_cache
+        self.video_storyboards = video_storyboards and thumbnail_cache is not None
+        self._reset_painted()
+        self.endResetModel()
+
+    def append_entries(self, entries):
+        """Add rows at the end, e.g. while a large directory is still being listed"""
+        if not entries:
+            return
+        first = len(self.entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        self.entries.extend(entries)
+        if self._rows is not None:
+            for row, entry in enumerate(entries, first):
+                self._rows[entry[1]] = row
+        self.endInsertRows()
+
+    def reorder(self, entries, new_rows=None):
+        """Show the current rows in the order of entries (the same rows, permuted), keeping selection and icons.
+
+        new_rows optionally maps a list of current rows to their rows in entries, for callers that know the
+        permutation; otherwise rows are matched by path.
+        """
+        if len(entries) != len(self.entries):
+            self.set_entries(entries, thumbnail_cache=self.thumbnail_cache, video_storyboards=self.video_storyboards)
+            return
+        self.layoutAboutToBeChanged.emit()
+        old_entries = self.entries
+        self.entries = list(entries)
+        self._rows = None  # Rebuilding path -> row for a 100k folder costs more than the sort; defer it
+        persistent = self.persistentIndexList()
+        if persistent and new_rows is not None:
+            moved = new_rows([index.row() for index in persistent])
+            self.changePersistentIndexList(persistent, [self.index(row, 0) for row in moved])
+        elif persistent:
+            # Selection and current item are few; find just their new rows in one pass
+            old_paths = [old_entries[index.row()][1] if index.row() < len(old_entries) else None
+                         for index in persistent]
+            paths = list(map(itemgetter(1), self.entries))
+            hits = compress(range(len(paths)), map(set(old_paths).__contains__, paths))
+            new_rows = {paths[row]: row for row in hits}
+            moved = [self.index(new_rows[path], 0) if path in new_rows else QModelIndex() for path in old_paths]
+            self.changePersistentIndexList(persistent, moved)
+        self.layoutChanged.emit()
+
+    def insert_entries(self, row, entries):
+        """Insert entries before row (row == rowCount() appends)"""
+        self.insert_runs([(row, entries)])
+
+    def insert_runs(self, runs):
+        """Insert runs of (row, entries), ascending by row, each row counting the runs inserted before it.
+        One beginInsertRows per run; the path -> row map is renumbered once, from the first run on."""
+        runs = [(row, entries) for row, entries in runs if entries]
+        if not runs:
+            return
+        rows, self._rows = self._rows, None  # Rebuilt if looked up from a rowsInserted slot, which is rare
+        for row, entries in runs:
+            self.beginInsertRows(QModelIndex(), row, row + len(entries) - 1)
+            self.entries[row:row] = entries
+            self.endInsertRows()
+        if rows is not None and self._rows is None:
+            self._rows = self._renumbered(rows, runs[0][0])
+
+    def remove_rows(self, rows):
+        """Remove rows (any order), one beginRemoveRows per run of consecutive rows, last run first"""
+        runs = self._runs(sorted(set(rows)))
+        if not runs:
+            return
+        path_rows, self._rows = self._rows, None
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for name, path, is_dir in self.entries[first:last + 1]:
+                self._forget_painted(path)
+                if path_rows is not None:
+                    path_rows.pop(path, None)
+            del self.entries[first:last + 1]
+            self.endRemoveRows()
+        if path_rows is not None and self._rows is None:
+            self._rows = self._renumbered(path_rows, runs[0][0])
+
+    def _renumbered(self, rows, first):
+        """Update the path -> row map rows for the rows from first on, which moved; returns it"""
+        rows.update(zip(map(itemgetter(1), self.entries[first:]), range(first, len(self.entries))))
+        return rows
+
+    def refresh_paths(self, paths):
+        """Repaint the rows of paths from scratch (their file changed), leaving every other row alone"""
+        rows = self.rows
+        for path in paths:
+            row = rows.get(path)
+            if row is not None:
+                self._forget_painted(path)
+                index = self.index(row, 0)
+                self.dataChanged.emit(index, index)
+
+    def apply_entries(self, entries, changed_paths=()):
+        """Turn the rows into entries (a new listing of the same folder) by patching instead of resetting.
+
+        Rows that are gone are removed and new ones inserted where entries has them, so scroll position,
+        selection and painted icons of every other row stay. If the surviving rows also changed order (e.g.
+        a file grew while sorting by size) one permutation follows. changed_paths are repainted.
+
+        Returns:
+            bool: False if the changes were too scattered to patch and the rows were replaced in one reset
+                (painted icons are kept, selection is not)
+        """
+        new_paths = set(map(itemgetter(1), entries))
+        old_paths = list(map(itemgetter(1), self.entries))
+        kept_paths = set(old_paths)
+        removed = [row for row, path in enumerate(old_paths) if path not in new_paths]
+        inserted = [row for row, entry in enumerate(entries) if entry[1] not in kept_paths]
+        inserted_runs = self._runs(inserted)
+        if len(self._runs(removed)) + len(inserted_runs) > self.MAX_PATCH_RUNS:
+            # Each run moves the rows after it; past this point one reset is cheaper for the view too
+            self.beginResetModel()
+            for row in removed:
+                self._forget_painted(old_paths[row])
+            self.entries = list(entries)
+            self._rows = None
+            self.endResetModel()
+            self.refresh_paths(changed_paths)
+            return False
+        self.remove_rows(removed)
+        self.insert_runs([(first, entries[first:last + 1]) for first, last in inserted_runs])
+        if self.entries != entries:
+            self.reorder(entries)
+        self.refresh_paths(changed_paths)
+        return True
+
+    @staticmethod
+    def _runs(rows):
+        """Group ascending rows into [first, last] runs of consecutive rows"""
+        runs = []
+        for row in rows:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+        return runs
+
+    def clear(self):
+        self.set_entries([], thumbnail_cache=self.thumbnail_cache)
+
+    def _reset_painted(self):
+        self.pending = set()
+        self.storyboards = {}
+        self._decorations = OrderedDict()
+        self._hover = None
+        self._hover_frame = None
+
+    def decoration(self, row):
+        """Return the icon pixmap for row, painting it on first use"""
+        name, path, is_dir = self.entries[row]
+        pixmap = self._decorations.get(path)
+        if pixmap is not None:
+            self._decorations.move_to_end(path)
+            return pixmap
+        painter = self._painter
+        painter.thumbnail_size = self.thumbnail_size
+        painter.thumbnail_cache = self.thumbnail_cache
+        pixmap = painter.create_icon_or_thumbnail(path, is_dir, self.listed_stat(path))
+        if painter.thumbnail_pending:
+            self.pending.add(path)
+        else:
+            self.pending.discard(path)
+        self._store_decoration(path, pixmap)
+        return pixmap
+
+    def listed_stat(self, path):
+        """(size, mtime) of path from snapshot, or None if it is not in it (e.g. rows still streaming in)"""
+        snapshot = self.snapshot
+        position = snapshot.lookup(path) if snapshot is not None else None
+        if position is None:
+            return None
+        return (snapshot.sizes[position], snapshot.mtimes[position])
+
+    def is_painted(self, row):
+        return self.entries[row][1] in self._decorations
+
+    def _forget_painted(self, path):
+        """Drop what was painted for path, so its icon is created again when shown"""
+        self._decorations.pop(path, None)
+        self.pending.discard(path)
+        self.storyboards.pop(path, None)
+        if self._hover_frame is not None and self._hover_frame[0] == path:
+            self._hover_frame = None
+
+    def _store_decoration(self, path, pixmap):
+        self._decorations[path] = pixmap
+        self._decorations.move_to_end(path)
+        while len(self._decorations) > self.MAX_DECORATIONS:
+            evicted, _ = self._decorations.popitem(last=False)
+            self.pending.discard(evicted)  # Asked for again if the row scrolls back into view
+
+    def set_thumbnail_image(self, path, size, image):
+        """Show a thumbnail rendered in the background (QImage from ThumbnailScheduler) for path"""
+        row = self.rows.get(path)
+        if row is None or size != self.thumbnail_size:
+            return
+        self._painter.thumbnail_size = self.thumbnail_size
+        pixmap = self._painter.thumbnail_pixmap(path, self.entries[row][2], image)
+        if pixmap is None:
+            return
+        self.pending.discard(path)
+        self._store_decoration(path, pixmap)
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def set_dark_mode(self, dark_mode):
+        """Repaint icons whose look depends on the theme (generic file and folder icons)"""
+        if self._painter.dark_mode == dark_mode:
+            return
+        self._painter.dark_mode = dark_mode
+        self._decorations = OrderedDict()
+        self.pending = set()
+        if self.entries:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.entries) - 1, 0), [Qt.DecorationRole])
+
+    def has_storyboard(self, row):
+        """Whether hovering over row scrubs through a video storyboard"""
+        return self.video_storyboards and os.path.splitext(self.entries[row][1])[1].lower() in VIDEO_THUMBNAIL_EXTENSIONS
+
+    def is_hovering(self, path):
+        return self._hover is not None and self._hover[0] == path
+
+    def set_storyboard(self, path, image):
+        """Use image (frames side by side, as from ThumbnailCache.get_storyboard) for hover scrubbing of path"""
+        if path not in self.rows or image.height() <= 0:
+            return
+        self.storyboards[path] = (image, count_storyboard_frames(image))
+        if self.is_hovering(path):
+            self.show_storyboard_frame(*self._hover)
+
+    def show_storyboard_frame(self, path, x, width):
+        """Show the storyboard frame of path that corresponds to horizontal position x of width"""
+        self._hover = (path, x, width)
+        image, frames = self.storyboards.get(path, (None, 0))
+        if frames == 0:
+            return
+        index = min(frames - 1, max(0, x * frames // max(1, width)))
+        if self._hover_frame is not None and self._hover_frame[:2] == (path, index):
+            return
+        self.hide_storyboard_frame(keep_hover=True)
+        frame_size = image.height()
+        size = self.thumbnail_size
+        frame = image.copy(index * frame_size, 0, frame_size, frame_size)
+        frame = QPixmap.fromImage(frame.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self._hover_frame = (path, index, frame)
+        model_index = self.index(self.rows[path], 0)
+        self.dataChanged.emit(model_index, model_index, [Qt.DecorationRole])
+
+    def hide_storyboard_frame(self, keep_hover=False):
+        """Go back to the normal thumbnail once the mouse leaves a scrubbed video"""
+        if not keep_hover:
+            self._hover = None
+        if self._hover_frame is None:
+            return
+        path = self._hover_frame[0]
+        self._hover_frame = None
+        row = self.rows.get(path)
+        if row is not None:
+            model_index = self.index(row, 0)
+            self.dataChanged.emit(model_index, model_index, [Qt.DecorationRole])
+
+class DetailViewModel(QAbstractTableModel):
+    """Rows of the detail view, read from the tab's DirectorySnapshot in the icon view's order.
+
+    Name, size, type and date come from the snapshot's columns, so showing a folder costs no walk or stat
+    of its own. Dimensions, duration and the size of folders are filled in later by DetailColumnLoader (see
+    FileManagerTab.schedule_detail_columns); their values are kept by path and modification time while
+    the same folder is shown, so a re-listing or re-sort does not compute them again.
+    """
+    NAME, SIZE, TYPE, DATE, DIMENSIONS, DURATION = range(6)
+    HEADERS = ("Name", "Size", "Type", "Date Modified", "Dimensions", "Duration")
+    KIND_COLUMNS = {DetailColumnLoader.FOLDER_SIZE: SIZE, DetailColumnLoader.DIMENSIONS: DIMENSIONS,
+                    DetailColumnLoader.DURATION: DURATION}
+    PathRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.snapshot = None
+        self.order = []  # Snapshot positions in display order
+        self._rows = None  # name -> row, built on first lookup
+        self._values = {}  # (path, kind) -> (mtime, value) from DetailColumnLoader
+        self._icons = None  # (folder icon, file icon), created on first paint
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self.HEADERS):
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.order):
+            return None
+        snapshot = self.snapshot
+        position = self.order[index.row()]
+        name = snapshot.names[position]
+        is_dir = snapshot.is_dir(position)
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == self.NAME:
+                return format_filename_with_underscore_wrap(name)
+            if column == self.SIZE:
+                if is_dir:
+                    value = self._value(position, DetailColumnLoader.FOLDER_SIZE)
+                    return self.format_file_size(value[0]) + ('' if value[1] else '+') if value else ''
+                return self.format_file_size(snapshot.sizes[position])
+            if column == self.TYPE:
+                ext = os.path.splitext(name)[1]
+                return "Folder" if is_dir else f"{ext[1:].upper()} File" if ext else "File"
+            if column == self.DATE:
+                return datetime.fromtimestamp(snapshot.mtimes[position]).strftime('%Y-%m-%d %H:%M')
+            if column == self.DIMENSIONS and not is_dir:
+                value = self._value(position, DetailColumnLoader.DIMENSIONS)
+                return f"{value[0]} x {value[1]}" if value else ''
+            if column == self.DURATION and not is_dir:
+                value = self._value(position, DetailColumnLoader.DURATION)
+                return self.format_duration(value) if value is not None else ''
+            return ''
+        if role == Qt.DecorationRole and column == self.NAME:
+            if self._icons is None:
+                provider = QFileIconProvider()
+                self._icons = (provider.icon(QFileIconProvider.Folder), provider.icon(QFileIconProvider.File))
+            return self._icons[0] if is_dir else self._icons[1]
+        if role == Qt.TextAlignmentRole and column in (self.SIZE, self.DIMENSIONS, self.DURATION):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role == Qt.ToolTipRole and column == self.NAME or role == self.PathRole:
+            return os.path.join(snapshot.path, name)
+        return None
+
+    def _value(self, position, kind):
+        """Return the loaded value of kind for the entry at position, or None if there is no current one"""
+        cached = self._values.get((os.path.join(self.snapshot.path, self.snapshot.names[position]), kind))
+        if cached is None or cached[0] != self.snapshot.mtimes[position]:
+            return None
+        return cached[1]
+
+    def set_snapshot(self, snapshot, order):
+        """Show snapshot with its entries in order (a list of positions); loaded values of the same folder stay"""
+        self.beginResetModel()
+        if snapshot is None or self.snapshot is None or snapshot.path != self.snapshot.path:
+            self._values = {}
+        self.snapshot = snapshot
+        self.order = list(order) if snapshot is not None else []
+        self._rows = None
+        self.endResetModel()
+
+    def clear(self):
+        self.set_snapshot(None, [])
+
+    def filePath(self, index):
+        """Return the full path of the row at index, like QFileSystemModel.filePath"""
+        if not index.isValid() or index.row() >= len(self.order):
+            return ''
+        return os.path.join(self.snapshot.path, self.snapshot.names[self.order[index.row()]])
+
+    def row_of(self, path):
+        """Return the row showing path, or None"""
+        if self.snapshot is None or os.path.dirname(path) != self.snapshot.path:
+            return None
+        if self._rows is None:
+            names = self.snapshot.names
+            self._rows = {names[position]: row for row, position in enumerate(self.order)}
+        return self._rows.get(os.path.basename(path))
+
+    def pending_jobs(self, rows):
+        """Return the (path, kind) DetailColumnLoader jobs of rows whose expensive column is not loaded yet"""
+        jobs = []
+        snapshot = self.snapshot
+        for row in rows:
+            position = self.order[row]
+            name = snapshot.names[position]
+            kind = DetailColumnLoader.kind_for(name, snapshot.is_dir(position))
+            if kind is None:
+                continue
+            path = os.path.join(snapshot.path, name)
+            cached = self._values.get((path, kind))
+            if cached is None or cached[0] != snapshot.mtimes[position]:
+                jobs.append((path, kind))  # Not loaded yet, or the entry changed since
+        return jobs
+
+    def apply_values(self, values):
+        """Store a batch of (path, kind, value) from DetailColumnLoader and repaint the cells it fills, with one
+        dataChanged per column spanning the rows of the batch"""
+        spans = {}
+        for path, kind, value in values:
+            row = self.row_of(path)
+            if row is None:
+                continue  # No longer in the folder
+            self._values[(path, kind)] = (self.snapshot.mtimes[self.order[row]], value)
+            column = self.KIND_COLUMNS[kind]
+            first, last = spans.get(column, (row, row))
+            spans[column] = (min(first, row), max(last, row))
+        for column, (first, last) in spans.items():
+            self.dataChanged.emit(self.index(first, column), self.index(last, column), [Qt.DisplayRole])
+
+    def format_file_size(self, size):
+        """Format file size in human readable format"""
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size < 1024.0:
+                return f"{size:.1f} {unit}"
+            size /= 1024.0
+        return f"{size:.1f} PB"
+
+    def format_duration(self, seconds):
+        """Format a duration as M:SS, or H:MM:SS from an hour"""
+        seconds = int(round(seconds))
+        hours, rest = divmod(seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+class IconItemDelegate(QStyledItemDelegate):
+    """Paints an icon view cell like IconWidget looks: icon on top, short name below, blue frame when selected"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.thumbnail_size = 64
+        self.dark_mode = False
+
+    def sizeHint(self, option, index):
+        return QSize(self.thumbnail_size + 10, self.thumbnail_size + 30)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect
+        selected = bool(option.state & QStyle.State_Selected)
+        if selected:
+            painter.setPen(QPen(QColor('#0078d4'), 2))
+            painter.setBrush(QColor(0, 120, 212, 26))
+            painter.drawRect(rect.adjusted(1, 1, -1, -1))
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            painter.drawPixmap(rect.x() + (rect.width() - pixmap.width()) // 2, rect.y() + 4, pixmap)
+        file_name = index.data(Qt.DisplayRole) or ''
+        # Same truncation and underscore wrapping as IconWidget.update_label_text
+        display_name = truncate_filename_for_display(file_name, max_chars=13, selected=selected)
+        if selected or len(file_name) <= 13:
+            display_name = format_filename_with_underscore_wrap(display_name)
+        font = QFont(option.font)
+        font.setPointSize(8)
+        painter.setFont(font)
+        painter.setPen(QColor('#ffffff') if self.dark_mode else option.palette.text().color())
+        # The name may use the spacing between cells, so names of 13 characters fit on one line
+        text_rect = QRect(rect.x() - 4, rect.y() + self.thumbnail_size + 6, rect.width() + 8, rect.height() - self.thumbnail_size - 4)
+        painter.drawText(text_rect, Qt.AlignHCenter | Qt.AlignTop | Qt.TextWrapAnywhere, display_name)
+        painter.restore()
+
+class IconListView(QAbstractItemView):
+    """Icon view of a folder: a flow of equal cells over an IconViewModel.
+
+    Cell positions are arithmetic (row -> line and column), so resizing, scrolling, hit testing and rubber-band
+    selection cost the same for 100 or 100k entries; only the rows on screen are painted, by IconItemDelegate.
+    Offers the selection helpers the main window used with the old widget-per-icon container.
+    """
     emptySpaceClicked = pyqtSignal()
     emptySpaceRightClicked = pyqtSignal(QPoint)
-    selectionChanged = pyqtSignal(list)  # Emit list of selected paths
+    selectedPathsChanged = pyqtSignal(list)  # Emit list of selected paths
+    itemDoubleClicked = pyqtSignal(str)
+    itemRightClicked = pyqtSignal(str, QPoint)
+    storyboardRequested = pyqtSignal(str)  # Hovered video has no storyboard cached yet
+    folderHovered = pyqtSignal(str)  # Path of the folder the mouse moved onto, '' when it left folders
+
+    CELL_SPACING = 10  # Pixels between tiles, split around each one
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        layout = QGridLayout()
-        # Add 10 pixels spacing between tiles
-        layout.setSpacing(10)  # 10 pixels spacing between icons
-        layout.setContentsMargins(4, 4, 4, 4)  # Minimal margins
-        layout.setSizeConstraint(QGridLayout.SetMinAndMaxSize)
-        self.setLayout(layout)
-        self.drag_start = None
-        self.drag_end = None
-        self.selection_rect = QRect()
-        self.is_dragging = False
-        self.selected_widgets = set()
-        self.last_width = 0  # Track width changes for auto-resize
-        
-        # Enable mouse tracking and set size policy to ensure blank space is clickable
+        self.icons_wide = 0
+        self.cell_width = self.cell_height = 1
+        self.columns = 1
+        self._anchor = None  # (row, scroll value) of the last relayout, so repeated resizes do not drift
+        self.icon_model = IconViewModel(self)
+        self.icon_delegate = IconItemDelegate(self)
+        self.setModel(self.icon_model)
+        self.setItemDelegate(self.icon_delegate)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setDragEnabled(False)
+        self.setFrameShape(QFrame.NoFrame)
         self.setMouseTracking(True)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.setMinimumSize(100, 100)  # Ensure minimum size for clickable area
-        
-        # Set background to capture all mouse events
-        self.setAutoFillBackground(True)
-        palette = self.palette()
-        palette.setColor(self.backgroundRole(), Qt.transparent)
-        self.setPalette(palette)
-    
-    def sizeHint(self):
-        """Provide size hint to ensure proper expansion"""
-        # Get the size needed for all widgets
-        layout = self.layout()
-        if layout.count() == 0:
-            return QSize(400, 300)  # Default minimum size
-        
-        # Calculate minimum size based on content and parent
-        min_width = 400
-        min_height = 300
-        
-        # Get the parent scroll area size if available
-        parent_widget = self.parent()
-        while parent_widget and not isinstance(parent_widget, QScrollArea):
-            parent_widget = parent_widget.parent()
-            
-        if parent_widget and isinstance(parent_widget, QScrollArea):
-            viewport_size = parent_widget.viewport().size()
-            min_width = max(min_width, viewport_size.width())
-            min_height = max(min_height, viewport_size.height())
-        
-        return QSize(min_width, min_height)
-    
+        self._rubber_band = QRubberBand(QRubberBand.Rectangle, self.viewport())
+        self._rubber_origin = None  # Press position in content coordinates while drag-selecting
+        self._hovered_folder = ''
+        self.set_icon_geometry(64, 0)
+        self.selectionModel().selectionChanged.connect(self._emit_selected_paths)
+        self.doubleClicked.connect(self._emit_double_clicked)
+
+    def set_icon_geometry(self, thumbnail_size, icons_wide=0):
+        """Size the grid cells for thumbnail_size; icons_wide > 0 fixes the number of icons per row"""
+        self.icon_delegate.thumbnail_size = thumbnail_size
+        self.icons_wide = icons_wide
+        # Cells match the old IconWidget tiles (thumbnail + 10 by thumbnail + 30) plus the spacing
+        cell_width = thumbnail_size + 10 + self.CELL_SPACING
+        cell_height = thumbnail_size + 30 + self.CELL_SPACING
+        anchor = self._anchor_row()
+        resized = (cell_width, cell_height) != (self.cell_width, self.cell_height)
+        self.cell_width, self.cell_height = cell_width, cell_height
+        self._relayout(anchor, keep_offset=not resized)
+
+    def relayout_icons(self):
+        """Pick up the main window's thumbnail size and icons-per-row setting"""
+        main_window = None
+        parent = self.parent()
+        while parent and not main_window:
+            if hasattr(parent, 'thumbnail_size'):
+                main_window = parent
+                break
+            parent = parent.parent()
+        thumbnail_size = getattr(main_window, 'thumbnail_size', self.icon_delegate.thumbnail_size) if main_window else self.icon_delegate.thumbnail_size
+        icons_wide = getattr(main_window, 'icons_wide', 0) if main_window else 0
+        self.set_icon_geometry(thumbnail_size, icons_wide)
+
+    # Layout arithmetic
+
+    def _fit_columns(self):
+        """Number of cells per line for the current viewport width and icons_wide setting"""
+        fit = max(1, self.viewport().width() // self.cell_width)
+        return min(self.icons_wide, fit) if self.icons_wide > 0 else fit
+
+    def _anchor_row(self):
+        """First row of the top visible line, kept in place when the columns change"""
+        value = self.verticalScrollBar().value()
+        if self._anchor is not None and self._anchor[1] == value:
+            return self._anchor[0]
+        return (value // self.cell_height) * self.columns
+
+    def _relayout(self, anchor_row=0, keep_offset=True):
+        """Recompute columns and scroll range; keeps anchor_row's line at the top of the viewport"""
+        columns = self._fit_columns()
+        offset = self.verticalScrollBar().value() % self.cell_height if keep_offset and self.columns == columns else 0
+        self.columns = columns
+        self.updateGeometries()
+        if anchor_row:
+            self.verticalScrollBar().setValue((anchor_row // columns) * self.cell_height + offset)
+        self._anchor = (anchor_row, self.verticalScrollBar().value())
+        self.viewport().update()
+
+    def item_rect(self, row):
+        """Rectangle of row's tile in content coordinates (scroll offset not applied)"""
+        line, column = divmod(row, self.columns)
+        inset = self.CELL_SPACING // 2
+        return QRect(column * self.cell_width + inset, line * self.cell_height + inset,
+                     self.cell_width - self.CELL_SPACING, self.cell_height - self.CELL_SPACING)
+
+    def _row_at(self, x, y):
+        """Row whose tile contains the content point (x, y), or -1"""
+        if x < 0 or y < 0:
+            return -1
+        column, x_in_cell = divmod(x, self.cell_width)
+        line, y_in_cell = divmod(y, self.cell_height)
+        inset = self.CELL_SPACING // 2
+        if column >= self.columns or not (inset <= x_in_cell < self.cell_width - inset) \
+                or not (inset <= y_in_cell < self.cell_height - inset):
+            return -1
+        row = line * self.columns + column
+        return row if row < self.icon_model.rowCount() else -1
+
+    def visible_rows(self, extra_screens=0):
+        """Return the range of rows on screen, widened by extra_screens viewport heights above and below"""
+        count = self.icon_model.rowCount()
+        if count == 0 or self.cell_height <= 0:
+            return range(0)
+        height = self.viewport().height()
+        top = self.verticalScrollBar().value() - extra_screens * height
+        bottom = self.verticalScrollBar().value() + height + extra_screens * height
+        first_line = max(0, top // self.cell_height)
+        last_line = max(0, bottom // self.cell_height)
+        return range(min(count, first_line * self.columns), min(count, (last_line + 1) * self.columns))
+
+    # QAbstractItemView interface
+
+    def updateGeometries(self):
+        lines = -(-self.icon_model.rowCount() // self.columns)
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setRange(0, max(0, lines * self.cell_height - self.viewport().height()))
+        scrollbar.setPageStep(self.viewport().height())
+        scrollbar.setSingleStep(max(1, self.cell_height // 3))  # A wheel notch (three steps) scrolls one line
+        self.horizontalScrollBar().setRange(0, 0)
+        super().updateGeometries()
+
+    def visualRect(self, index):
+        if not index.isValid() or index.model() is not self.icon_model:
+            return QRect()
+        return self.item_rect(index.row()).translated(0, -self.verticalScrollBar().value())
+
+    def indexAt(self, point):
+        row = self._row_at(point.x(), point.y() + self.verticalScrollBar().value())
+        return self.icon_model.index(row, 0) if row >= 0 else QModelIndex()
+
+    def scrollTo(self, index, hint=QAbstractItemView.EnsureVisible):
+        if not index.isValid():
+            return
+        rect = self.item_rect(index.row())
+        scrollbar = self.verticalScrollBar()
+        height = self.viewport().height()
+        if hint == QAbstractItemView.PositionAtTop:
+            scrollbar.setValue(rect.top())
+        elif hint == QAbstractItemView.PositionAtBottom:
+            scrollbar.setValue(rect.bottom() - height)
+        elif hint == QAbstractItemView.PositionAtCenter:
+            scrollbar.setValue(rect.center().y() - height // 2)
+        elif rect.top() < scrollbar.value():
+            scrollbar.setValue(rect.top())
+        elif rect.bottom() > scrollbar.value() + height:
+            scrollbar.setValue(rect.bottom() - height)
+
+    def moveCursor(self, action, modifiers):
+        count = self.icon_model.rowCount()
+        if count == 0:
+            return QModelIndex()
+        current = self.currentIndex()
+        row = current.row() if current.isValid() else 0
+        page = max(1, self.viewport().height() // self.cell_height) * self.columns
+        if action == QAbstractItemView.MoveLeft or action == QAbstractItemView.MovePrevious:
+            row -= 1
+        elif action == QAbstractItemView.MoveRight or action == QAbstractItemView.MoveNext:
+            row += 1
+        elif action == QAbstractItemView.MoveUp:
+            row = row - self.columns if row >= self.columns else row
+        elif action == QAbstractItemView.MoveDown:
+            row = row + self.columns if row + self.columns < count else row
+        elif action == QAbstractItemView.MovePageUp:
+            row = max(row % self.columns, row - page)
+        elif action == QAbstractItemView.MovePageDown:
+            row = min(count - 1, row + page)
+        elif action == QAbstractItemView.MoveHome:
+            row = 0
+        elif action == QAbstractItemView.MoveEnd:
+            row = count - 1
+        return self.icon_model.index(max(0, min(count - 1, row)), 0)
+
+    def horizontalOffset(self):
+        return 0
+
+    def verticalOffset(self):
+        return self.verticalScrollBar().value()
+
+    def isIndexHidden(self, index):
+        return False
+
+    def setSelection(self, rect, command):
+        """Select the tiles intersecting rect (viewport coordinates): one range per line, or one for whole lines"""
+        rect = rect.normalized().translated(0, self.verticalScrollBar().value())
+        count = self.icon_model.rowCount()
+        inset = self.CELL_SPACING // 2
+        # First and last column/line whose tile (cell minus inset) reaches into rect
+        first_column = max(0, (rect.left() - self.cell_width + inset) // self.cell_width + 1)
+        last_column = min(self.columns - 1, (rect.right() - inset) // self.cell_width)
+        first_line = max(0, (rect.top() - self.cell_height + inset) // self.cell_height + 1)
+        last_line = (rect.bottom() - inset) // self.cell_height
+        selection = QItemSelection()
+        if first_column <= last_column and first_line <= last_line:
+            model = self.icon_model
+            if first_column == 0 and last_column == self.columns - 1:
+                first, last = first_line * self.columns, min(count - 1, (last_line + 1) * self.columns - 1)
+                if first <= last:
+                    selection.select(model.index(first, 0), model.index(last, 0))
+            else:
+                for line in range(first_line, last_line + 1):
+                    first = line * self.columns + first_column
+                    last = min(count - 1, line * self.columns + last_column)
+                    if first > last:
+                        break
+                    selection.select(model.index(first, 0), model.index(last, 0))
+        self.selectionModel().select(selection, command)
+
+    def visualRegionForSelection(self, selection):
+        """Bands of the on-screen lines a selection touches (selecting all 100k rows updates just the screen)"""
+        region = QRegion()
+        visible = self.visible_rows()
+        if not visible:
+            return region
+        offset = self.verticalScrollBar().value()
+        width = self.columns * self.cell_width
+        for selection_range in selection:
+            top, bottom = max(selection_range.top(), visible.start), min(selection_range.bottom(), visible.stop - 1)
+            if top > bottom:
+                continue
+            first_line, last_line = top // self.columns, bottom // self.columns
+            region += QRect(0, first_line * self.cell_height - offset, width, (last_line - first_line + 1) * self.cell_height)
+        return region
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        model = self.icon_model
+        selection_model = self.selectionModel()
+        option = self.viewOptions()
+        offset = self.verticalScrollBar().value()
+        area = event.rect().translated(0, offset)
+        first_line = max(0, area.top() // self.cell_height)
+        last_line = area.bottom() // self.cell_height
+        base_state = option.state
+        for row in range(first_line * self.columns, min(model.rowCount(), (last_line + 1) * self.columns)):
+            index = model.index(row, 0)
+            option.rect = self.item_rect(row).translated(0, -offset)
+            option.state = base_state | QStyle.State_Selected if selection_model.isSelected(index) else base_state
+            self.icon_delegate.paint(painter, option, index)
+        painter.end()
+
     def resizeEvent(self, event):
-        """Handle resize events to ensure proper layout"""
+        anchor = self._anchor_row()
         super().resizeEvent(event)
-        # Force layout update when resized
-        self.layout().activate()
+        self._relayout(anchor)
+
+    def rowsInserted(self, parent, start, end):
+        super().rowsInserted(parent, start, end)
+        self.updateGeometries()
+        self.viewport().update()
+
+    # Mouse handling
 
     def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton:
-            # Always start drag selection, even if starting on an icon
-            self.drag_start = event.pos()
-            self.is_dragging = True
-            # If not holding Ctrl, clear previous selection
-            if not (event.modifiers() & Qt.ControlModifier):
-                self.clear_selection()
-            # Optionally emit emptySpaceClicked only if on empty space
-            clicked_widget = self.childAt(event.pos())
-            is_empty_space = (clicked_widget is None or 
-                              clicked_widget == self or 
-                              clicked_widget == self.layout() or
-                              isinstance(clicked_widget, QLayout) or
-                              not hasattr(clicked_widget, 'full_path'))
-            if is_empty_space:
-                self.emptySpaceClicked.emit()
+        index = self.indexAt(event.pos())
+        if event.button() == Qt.RightButton:
+            if index.isValid():
+                self.itemRightClicked.emit(index.data(IconViewModel.PathRole), event.globalPos())
+            else:
+                self.emptySpaceRightClicked.emit(event.globalPos())
             event.accept()
             return
-        elif event.button() == Qt.RightButton:
-            clicked_widget = self.childAt(event.pos())
-            is_empty_space = (clicked_widget is None or 
-                              clicked_widget == self or 
-                              clicked_widget == self.layout() or
-                              isinstance(clicked_widget, QLayout) or
-                              not hasattr(clicked_widget, 'full_path'))
-            if is_empty_space:
-                self.emptySpaceRightClicked.emit(event.globalPos())
-                event.accept()
-                return
-            else:
-                super().mousePressEvent(event)
-        else:
-            super().mousePressEvent(event)
+        super().mousePressEvent(event)  # Click, ctrl/shift-click and rubber-band selection
+        if event.button() == Qt.LeftButton:
+            self._rubber_origin = QPoint(event.pos().x(), event.pos().y() + self.verticalScrollBar().value())
+            if not index.isValid() and not (event.modifiers() & Qt.ControlModifier):
+                self.emptySpaceClicked.emit()
 
     def mouseMoveEvent(self, event):
-        if self.is_dragging and self.drag_start:
-            self.drag_end = event.pos()
-            self.selection_rect = QRect(self.drag_start, self.drag_end).normalized()
-            self.update_selection()
-            self.update()  # Trigger repaint
+        super().mouseMoveEvent(event)
+        if event.buttons() == Qt.NoButton:
+            self._scrub_storyboard(event.pos())
+            self._note_hovered_folder(event.pos())
+        elif event.buttons() & Qt.LeftButton and self._rubber_origin is not None:
+            # Rubber band, also across empty space where QAbstractItemView would not select
+            origin = self._rubber_origin - QPoint(0, self.verticalScrollBar().value())
+            if (event.pos() - origin).manhattanLength() < QApplication.startDragDistance():
+                return
+            rect = QRect(origin, event.pos()).normalized()
+            self.setState(QAbstractItemView.DragSelectingState)
+            if event.modifiers() & Qt.ControlModifier:
+                self.setSelection(rect, QItemSelectionModel.Select | QItemSelectionModel.Current)
+            else:
+                self.setSelection(rect, QItemSelectionModel.ClearAndSelect)
+            self._rubber_band.setGeometry(rect)
+            self._rubber_band.show()
 
     def mouseReleaseEvent(self, event):
-        if event.button() == Qt.LeftButton and self.is_dragging:
-            self.is_dragging = False
-            self.drag_start = None
-            self.drag_end = None
-            self.update()  # Clear selection rectangle
+        super().mouseReleaseEvent(event)
+        self._rubber_origin = None
+        self._rubber_band.hide()
+        if self.state() == QAbstractItemView.DragSelectingState:
+            self.setState(QAbstractItemView.NoState)
+
+    def leaveEvent(self, event):
+        self.icon_model.hide_storyboard_frame()
+        self._note_hovered_folder(None)
+        super().leaveEvent(event)
+
+    def _note_hovered_folder(self, pos):
+        """Emit folderHovered when the mouse moves onto a folder or off the folders (pos None: left the view)"""
+        index = self.indexAt(pos) if pos is not None else QModelIndex()
+        folder = ''
+        if index.isValid():
+            name, path, is_dir = self.icon_model.entries[index.row()]
+            folder = path if is_dir else ''
+        if folder != self._hovered_folder:
+            self._hovered_folder = folder
+            self.folderHovered.emit(folder)
+
+    def _scrub_storyboard(self, pos):
+        """Show the storyboard frame of the video under pos, fetching the storyboard on first hover"""
+        model = self.icon_model
+        index = self.indexAt(pos)
+        if not index.isValid() or not model.has_storyboard(index.row()):
+            model.hide_storyboard_frame()
+            return
+        path = index.data(IconViewModel.PathRole)
+        if path not in model.storyboards:
+            image = model.thumbnail_cache.get_storyboard(path)
+            if image is not None:
+                model.set_storyboard(path, image)
+            elif not model.is_hovering(path):  # Ask once per hover, not on every mouse move
+                self.storyboardRequested.emit(path)
+        rect = self.visualRect(index)
+        model.show_storyboard_frame(path, pos.x() - rect.x(), rect.width())
+
+    def _emit_selected_paths(self, selected=None, deselected=None):
+        self.selectedPathsChanged.emit(self.selected_paths())
+
+    def _emit_double_clicked(self, index):
+        if index.isValid():
+            self.itemDoubleClicked.emit(index.data(IconViewModel.PathRole))
 
-    def paintEvent(self, event):
-        super().paintEvent(event)
-        if self.is_dragging and self.selection_rect.isValid():
-            painter = QPainter(self)
-            pen = QPen(Qt.blue, 1, Qt.DashLine)
-            painter.setPen(pen)
-            painter.drawRect(self.selection_rect)
+    def selected_paths(self):
+        """Paths of the selected rows in display order, read from the selection ranges"""
+        entries = self.icon_model.entries
+        ranges = self.selectionModel().selection()
+        if len(ranges) == 1:
+            return [entry[1] for entry in entries[ranges[0].top():ranges[0].bottom() + 1]]
+        rows = sorted({row for selection_range in ranges for row in range(selection_range.top(), selection_range.bottom() + 1)})
+        return [entries[row][1] for row in rows]
 
-    def update_selection(self):
-        layout = self.layout()
-        newly_selected = set()
-        
-        for i in range(layout.count()):
-            item = layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                widget_rect = widget.geometry()
-                
-                if self.selection_rect.intersects(widget_rect):
-                    newly_selected.add(widget)
-                    widget.setStyleSheet("QWidget { border: 2px solid #0078d7; background-color: rgba(0, 120, 215, 0.2); }")
-                elif widget not in self.selected_widgets:
-                    widget.setStyleSheet("QWidget { border: 2px solid transparent; }")
-        
-        # Update selected widgets
-        self.selected_widgets = newly_selected
-        
-        # Emit selection changed signal
-        selected_paths = [w.full_path for w in self.selected_widgets]
-        self.selectionChanged.emit(selected_paths)
+    def update_style_for_theme(self, dark_mode):
+        """Update the text color and theme-dependent icons for the current theme"""
+        self.icon_delegate.dark_mode = dark_mode
+        self.icon_model.set_dark_mode(dark_mode)
+        self.viewport().update()
 
     def clear_selection(self):
-        layout = self.layout()
-        for i in range(layout.count()):
-            item = layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                widget.setStyleSheet("QWidget { border: 2px solid transparent; }")
-                # Update IconWidget selection state for truncation
-                if hasattr(widget, 'set_selected'):
-                    widget.set_selected(False)
-        self.selected_widgets.clear()
-        self.selectionChanged.emit([])
-
-    def add_to_selection(self, widget):
-        self.selected_widgets.add(widget)
-        widget.setStyleSheet("QWidget { border: 2px solid #0078d7; background-color: rgba(0, 120, 215, 0.2); }")
-        # Update IconWidget selection state for truncation
-        if hasattr(widget, 'set_selected'):
-            widget.set_selected(True)
-        selected_paths = [w.full_path for w in self.selected_widgets]
-        self.selectionChanged.emit(selected_paths)
-
-    def remove_from_selection(self, widget):
-        if widget in self.selected_widgets:
-            self.selected_widgets.remove(widget)
-            widget.setStyleSheet("QWidget { border: 2px solid transparent; }")
-            # Update IconWidget selection state for truncation
-            if hasattr(widget, 'set_selected'):
-                widget.set_selected(False)
-            selected_paths = [w.full_path for w in self.selected_widgets]
-            self.selectionChanged.emit(selected_paths)
+        self.clearSelection()
 
     def add_to_selection_by_path(self, path):
-        """Add widget to selection by file path"""
-        layout = self.layout()
-        for i in range(layout.count()):
-            item = layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'full_path') and widget.full_path == path:
-                    self.add_to_selection(widget)
-                    break
+        """Add the icon of path to the selection"""
+        self.select_paths([path])
 
     def remove_from_selection_by_path(self, path):
-        """Remove widget from selection by file path"""
-        layout = self.layout()
-        for i in range(layout.count()):
-            item = layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if hasattr(widget, 'full_path') and widget.full_path == path:
-                    self.remove_from_selection(widget)
-                    break
-
-    def add_widget_optimized(self, widget, thumbnail_size, icons_wide=0):
-        """Add widget to grid layout with optimized positioning for icons per row"""
-        # Prevent recursive calls during relayout
-        if hasattr(self, '_in_add_widget') and self._in_add_widget:
-            return
-        self._in_add_widget = True
-        
-        try:
-            layout = self.layout()
-            
-            # Calculate approximate widget width (thumbnail + padding + margins)
-            # Include space for text label underneath
-            widget_width = thumbnail_size + 10  # thumbnail + margins/padding
-            widget_height = thumbnail_size + 30  # thumbnail + text height + margins
-            
-            # Add spacing between widgets to the width calculation
-            spacing = layout.spacing()  # Get the layout spacing (10 pixels)
-            effective_widget_width = widget_width + spacing
-            
-            # Determine icons per row
-            if icons_wide > 0:
-                # Fixed number of icons per row
-                icons_per_row = icons_wide
-            else:
-                # Auto-calculate based on available space
-                container_width = self.width()
-                
-                # Get the actual available width from the scroll area or main window
-                # We need to traverse up the widget hierarchy to find the actual available space
-                parent = self.parent()
-                scroll_area = None
-                
-                # Walk up the parent hierarchy to find key containers
-                while parent:
-                    if hasattr(parent, 'viewport'):
-                        scroll_area = parent
-                        break
-                    parent = parent.parent()
-                
-                # Use the best available width
-                if scroll_area:
-                    container_width = scroll_area.viewport().width() - 40  # Account for scrollbars and margins
-                elif container_width <= 200:  # Too small, use fallback
-                    container_width = 600
-                
-                # Account for margins and spacing in calculation
-                available_width = container_width - 20  # Account for container margins
-                icons_per_row = max(1, available_width // effective_widget_width)
-                
-                # Only print debug occasionally to avoid spam
-                if not hasattr(self, '_debug_counter'):
-                    self._debug_counter = 0
-                self._debug_counter += 1
-                # Remove debug output - functionality works correctly
-            
-            # Calculate current position
-            current_count = layout.count()
-            row = current_count // icons_per_row
-            col = current_count % icons_per_row
-            
-            # Force widget size BEFORE adding to layout to ensure proper grid display
-            widget.setMinimumSize(widget_width, widget_height)
-            widget.setMaximumWidth(widget_width + 20)  # Allow some flexibility
-            widget.setFixedSize(widget_width, widget_height)  # Force exact size for grid layout
-            
-            # Add widget at calculated position
-            layout.addWidget(widget, row, col)
-            
-        finally:
-            self._in_add_widget = False
-
-    def resizeEvent(self, event):
-        """Handle resize events to re-layout icons in auto-width mode"""
-        super().resizeEvent(event)
-        
-        # Prevent recursive resize events
-        if hasattr(self, '_in_resize') and self._in_resize:
-            return
-        self._in_resize = True
-        
-        try:
-            # Check scroll area viewport width instead of container width for better auto-width calculation
-            scroll_area = None
-            parent = self.parent()
-            while parent:
-                if hasattr(parent, 'viewport'):
-                    scroll_area = parent
-                    break
-                parent = parent.parent()
-            
-            # Get current available width
-            if scroll_area:
-                current_width = scroll_area.viewport().width()
-            else:
-                current_width = self.width()
-            
-            if not hasattr(self, 'last_available_width'):
-                self.last_available_width = current_width
-            
-            # Only re-layout if width changed significantly and we're in auto-width mode
-            if abs(current_width - self.last_available_width) > 50:  # Significant width change
-                self.last_available_width = current_width
-                
-                # Check if we're in auto-width mode by trying to get the setting from parent
-                main_window = None
-                parent = self.parent()
-                while parent:
-                    if hasattr(parent, 'main_window'):
-                        main_window = parent.main_window
-                        break
-                    elif hasattr(parent, 'icons_wide'):
-                        main_window = parent
-                        break
-                    parent = parent.parent()
-                
-                # Re-layout icons if in auto-width mode (icons_wide == 0)
-                if main_window and getattr(main_window, 'icons_wide', 0) == 0:
-                    # Use a timer to prevent excessive calls
-                    if not hasattr(self, '_resize_timer'):
-                        from PyQt5.QtCore import QTimer
-                        self._resize_timer = QTimer()
-                        self._resize_timer.setSingleShot(True)
-                        self._resize_timer.timeout.connect(self.relayout_icons)
-                    
-                    self._resize_timer.stop()
-                    self._resize_timer.start(100)  # Delay 100ms before relayout
-        finally:
-            self._in_resize = False
-    
-    def relayout_icons(self):
-        """Re-layout existing icons to adjust to new container width"""
-        layout = self.layout()
-        widgets = []
-        
-        # Collect all existing widgets
-        for i in range(layout.count()):
-            item = layout.itemAt(i)
-            if item and item.widget():
-                widgets.append(item.widget())
-        
-        # Clear the layout
-        for i in reversed(range(layout.count())):
-            item = layout.itemAt(i)
-            if item:
-                layout.removeItem(item)
-        
-        # Re-add widgets with new layout calculation
-        if widgets:
-            # Get current settings
-            main_window = None
-            parent = self.parent()
-            while parent and not main_window:
-                if hasattr(parent, 'thumbnail_size'):
-                    main_window = parent
-                    break
-                parent = parent.parent()
-            
-            thumbnail_size = getattr(main_window, 'thumbnail_size', 64) if main_window else 64
-            icons_wide = getattr(main_window, 'icons_wide', 0) if main_window else 0
-            
-            for widget in widgets:
-                self.add_widget_optimized(widget, thumbnail_size, icons_wide)
+        """Remove the icon of path from the selection"""
+        row = self.icon_model.rows.get(path)
+        if row is not None:
+            self.selectionModel().select(self.icon_model.index(row, 0), QItemSelectionModel.Deselect)
+
+    def select_paths(self, paths):
+        """Add the icons of paths to the selection in one go (one selection change for the whole set)"""
+        rows = self.icon_model.rows
+        selection = QItemSelection()
+        first = last = None
+        for row in sorted({rows[path] for path in paths if path in rows}):
+            if last is not None and row == last + 1:
+                last = row
+                continue
+            if first is not None:
+                selection.select(self.icon_model.index(first, 0), self.icon_model.index(last, 0))
+            first = last = row  # Consecutive rows become one range
+        if first is not None:
+            selection.select(self.icon_model.index(first, 0), self.icon_model.index(last, 0))
+        if not selection.isEmpty():
+            self.selectionModel().select(selection, QItemSelectionModel.Select)
 
 class BreadcrumbWidget(QWidget):
     """Breadcrumb navigation widget"""
@@ -6448,6 +9674,8 @@ class BreadcrumbWidget(QWidget):
 
 class FileManagerTab(QWidget):
     """Individual file manager tab"""
+    PREFETCH_HOVER_MS = 150  # How long the mouse rests on a folder before it is prefetched
+    PREFETCH_CHILDREN = 3  # Subfolders prefetched after a listing
     
     def __init__(self, initial_path, tab_manager):
         super().__init__()
@@ -6458,6 +9686,18 @@ class FileManagerTab(QWidget):
         self.navigation_history = [initial_path]
         self.history_index = 0
         
+        self._thumbnail_scheduler_connected = False
+        self._directory_loader_connected = False
+        self._listing_generation = 0  # Generation of the DirectoryLoader listing the icon view waits for, 0 if none
+        self.snapshot = None  # DirectorySnapshot of the last completed listing
+        self._listing_streamed = False  # Part of that listing is already shown, unsorted
+        self._icon_order = None  # Snapshot positions of the icon view rows once they show the whole snapshot sorted
+        self._directory_models_connected = False
+        self._watched_folder = None  # Folder this tab holds in the DirectoryModelRegistry (and so watches)
+        self._listing_patches_view = False  # The listing re-reads the folder on screen; patch rows, don't reset
+        self._changed_while_listing = False  # The monitor reported changes the running listing may have missed
+        self._refresh_when_shown = False  # A refresh was put off while the tab was in the background
+        
         # Sorting options (per tab) - set defaults first
         self.sort_by = "name"  # name, size, date, type, extension
         self.sort_order = "ascending"  # ascending, descending
@@ -6505,19 +9745,29 @@ class FileManagerTab(QWidget):
         icon_layout = QVBoxLayout()
         icon_layout.setContentsMargins(0, 0, 0, 0)
         
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.scroll_area.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        
-        self.icon_container = IconContainer()
-        self.scroll_area.setWidget(self.icon_container)
-        
-        # The main window will install the event filter
-        # self.scroll_area.viewport().installEventFilter(self)
-        
-        icon_layout.addWidget(self.scroll_area)
+        self.icon_container = IconListView()
+        self.icon_container.itemDoubleClicked.connect(self.handle_double_click)
+        self.icon_container.storyboardRequested.connect(self.request_storyboard)
+        self.icon_container.folderHovered.connect(self.on_folder_hovered)
+        
+        # Re-prioritize background thumbnails when the visible rows change
+        self._thumbnail_scroll_timer = QTimer(self)
+        self._thumbnail_scroll_timer.setSingleShot(True)
+        self._thumbnail_scroll_timer.timeout.connect(self.schedule_thumbnails)
+        
+        # Prefetch a folder once the mouse has rested on it for a moment
+        self._hovered_folder = ''
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.timeout.connect(self.prefetch_likely_folders)
+        self.icon_container.verticalScrollBar().valueChanged.connect(self.on_icon_view_scrolled)
+        self.icon_container.verticalScrollBar().rangeChanged.connect(self.on_icon_view_scrolled)
+        self.icon_container.icon_model.rowsInserted.connect(self.on_icon_view_scrolled)
+        self.icon_container.icon_model.rowsRemoved.connect(self.on_icon_view_scrolled)
+        self.icon_container.icon_model.modelReset.connect(self.on_icon_view_scrolled)
+        self.icon_container.icon_model.layoutChanged.connect(self.on_icon_view_scrolled)
+        
+        icon_layout.addWidget(self.icon_container)
         self.icon_view_widget.setLayout(icon_layout)
         self.view_stack.addWidget(self.icon_view_widget)
         
@@ -6543,7 +9793,7 @@ class FileManagerTab(QWidget):
     def setup_detail_view(self):
         """Setup detail view for this tab"""
         self.detail_view = QTableView()
-        self.detail_model = FormattedFileSystemModel()
+        self.detail_model = DetailViewModel(self)
         self.detail_view.setModel(self.detail_model)
         # Enable word wrapping for long names with underscores
         self.detail_view.setWordWrap(True)
@@ -6552,8 +9802,18 @@ class FileManagerTab(QWidget):
         # Connect detail view events
         self.detail_view.clicked.connect(self.on_detail_item_clicked)
         self.detail_view.doubleClicked.connect(self.on_detail_item_double_clicked)
-        
+
+        # Load dimensions, durations and folder sizes for the rows on screen once scrolling settles
+        self._detail_columns_timer = QTimer(self)
+        self._detail_columns_timer.setSingleShot(True)
+        self._detail_columns_timer.timeout.connect(self.schedule_detail_columns)
+        self._detail_column_loader_connected = False
+        self.detail_view.verticalScrollBar().valueChanged.connect(self.on_detail_view_scrolled)
+        self.detail_view.verticalScrollBar().rangeChanged.connect(self.on_detail_view_scrolled)
+        self.detail_model.modelReset.connect(self.on_detail_view_scrolled)
+
         self.view_stack.addWidget(self.detail_view)
+        self.view_stack.currentChanged.connect(self.on_view_changed)
     
     def on_list_item_clicked(self, index):
         """Handle list view item clicks"""
@@ -6607,12 +9867,15 @@ class FileManagerTab(QWidget):
         if os.path.exists(path) and os.path.isdir(path):
             self.current_folder = path
             self.breadcrumb.set_path(path)
+            prefetcher = self.get_prefetcher()
+            if prefetcher:
+                prefetcher.note_visit(path)
             
             # Load sort settings for the new folder
             if hasattr(self, 'tab_manager') and self.tab_manager and hasattr(self.tab_manager, 'main_window'):
                 self.tab_manager.main_window.load_tab_sort_settings(self)
             
-            self.refresh_current_view()
+            self.refresh_current_view(use_shared=True)
             
             # Add to navigation history if this is a new navigation (not back/forward)
             if add_to_history:
@@ -6650,8 +9913,9 @@ class FileManagerTab(QWidget):
             path = self.navigation_history[self.history_index]
             self.navigate_to(path, add_to_history=False)
     
-    def sort_items(self, items, folder_path):
-        """Sort items according to current tab's sort settings"""
+    def sort_items(self, items, folder_path, snapshot=None):
+        """Sort items according to current tab's sort settings.
+        With a DirectorySnapshot of folder_path, types, sizes and dates come from it instead of the disk."""
         import re
         
         def natural_sort_key(text):
@@ -6672,7 +9936,8 @@ class FileManagerTab(QWidget):
         def get_sort_key(item_name):
             """Get the sort key for an item based on current sort settings"""
             full_path = os.path.join(folder_path, item_name)
-            is_dir = os.path.isdir(full_path)
+            position = snapshot.index_of(item_name) if snapshot is not None else None
+            is_dir = snapshot.is_dir(position) if position is not None else os.path.isdir(full_path)
             
             # Primary sort: directories first if enabled
             primary_key = not is_dir if self.directories_first else 0
@@ -6681,21 +9946,7 @@ class FileManagerTab(QWidget):
             secondary_key = ""
             if self.group_by_type and not is_dir:
                 extension = os.path.splitext(item_name)[1].lower()
-                # Group by file type categories
-                if extension in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']:
-                    secondary_key = "1_images"
-                elif extension in ['.txt', '.pdf', '.doc', '.docx', '.rtf', '.odt']:
-                    secondary_key = "2_documents"
-                elif extension in ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm']:
-                    secondary_key = "3_videos"
-                elif extension in ['.mp3', '.wav', '.flac', '.aac', '.ogg', '.wma']:
-                    secondary_key = "4_audio"
-                elif extension in ['.py', '.js', '.html', '.css', '.cpp', '.java', '.c']:
-                    secondary_key = "5_code"
-                elif extension in ['.zip', '.rar', '.7z', '.tar', '.gz']:
-                    secondary_key = "6_archives"
-                else:
-                    secondary_key = "7_other"
+                secondary_key = SORT_TYPE_GROUPS.get(extension, "7_other")  # Group by file type categories
             
             # Tertiary sort: by the selected criteria
             tertiary_key = None
@@ -6703,16 +9954,18 @@ class FileManagerTab(QWidget):
                 if self.sort_by == "name":
                     tertiary_key = natural_sort_key(item_name)
                 elif self.sort_by == "size":
-                    if is_dir:
+                    if is_dir and position is not None:
+                        tertiary_key = 0  # Counting children would list every subfolder; keep the one-stat snapshot
+                    elif is_dir:
                         # For directories, use 0 size or count of items
                         try:
                             tertiary_key = len(os.listdir(full_path))
                         except:
                             tertiary_key = 0
                     else:
-                        tertiary_key = os.path.getsize(full_path)
+                        tertiary_key = snapshot.sizes[position] if position is not None else os.path.getsize(full_path)
                 elif self.sort_by == "date":
-                    tertiary_key = os.path.getmtime(full_path)
+                    tertiary_key = snapshot.mtimes[position] if position is not None else os.path.getmtime(full_path)
                 elif self.sort_by == "type":
                     if is_dir:
                         tertiary_key = "0_directory"  # Directories first in type sort
@@ -6744,185 +9997,556 @@ class FileManagerTab(QWidget):
             
         return sorted_items
 
-    def refresh_current_view(self):
-        """Refresh the current view with files from current folder"""
+    def refresh_current_view(self, use_shared=False):
+        """Refresh the current view with files from current folder.
+
+        Args:
+            use_shared (bool): show the folder's shared snapshot, if the DirectoryModelRegistry has a current
+                one, instead of listing it again
+        """
+        if self.tab_manager and self.tab_manager.get_current_tab() is not self:
+            # Background tabs (e.g. restored from the last session) are listed once they are shown
+            self._refresh_when_shown = True
+            return
+        self._refresh_when_shown = False
+        self.watch_folder(self.current_folder)
         # This will be implemented based on the current view mode
         if self.view_stack.currentWidget() == self.icon_view_widget:
-            self.refresh_icon_view()
+            self.refresh_icon_view(use_shared)
         elif self.view_stack.currentWidget() == self.list_view:
             self.refresh_list_view()
         elif self.view_stack.currentWidget() == self.detail_view:
-            self.refresh_detail_view()
+            self.refresh_detail_view(use_shared)
     
-    def refresh_icon_view(self):
-        """Refresh icon view with current folder contents"""
+    def refresh_if_deferred(self):
+        """Run the refresh that was put off while this tab was in the background. The shared snapshot
+        is current by then: the file monitor kept it up to date while the tab was not shown."""
+        if self._refresh_when_shown:
+            self.refresh_current_view(use_shared=True)
+
+    def refresh_icon_view(self, use_shared=False):
+        """Refresh icon view with current folder contents (from its shared snapshot if use_shared)"""
         # Get settings from main window using direct reference
         main_window = self.tab_manager.main_window if self.tab_manager else None
         thumbnail_size = getattr(main_window, 'thumbnail_size', 64) if main_window else 64
         icons_wide = getattr(main_window, 'icons_wide', 0) if main_window else 0
 
-        # Pre-cache thumbnails for text and PDF files in the current folder for the current icon size only
-        print(f"[THUMBNAIL-DEBUG] Checking if main_window and thumbnail_cache exist for pre-caching in {self.current_folder}")
-        if main_window and hasattr(main_window, 'thumbnail_cache') and main_window.thumbnail_cache:
-            print(f"[THUMBNAIL-DEBUG] About to call precache_text_pdf_thumbnails_in_directory for {self.current_folder} size={thumbnail_size}")
-            try:
-                precache_text_pdf_thumbnails_in_directory(self.current_folder, main_window.thumbnail_cache, size=thumbnail_size)
-                print(f"[THUMBNAIL-DEBUG] Finished call to precache_text_pdf_thumbnails_in_directory for {self.current_folder}")
-            except Exception as e:
-                print(f"[THUMBNAIL-DEBUG] Exception in precache_text_pdf_thumbnails_in_directory: {e}")
+        # Drop thumbnail work queued for the previous listing; new work is queued once the icons exist
+        self.cancel_background_work()
+        prefetcher = self.get_prefetcher()
+        if prefetcher:
+            prefetcher.cancel()  # This listing and its thumbnails go first
 
-        # Clear existing icons
         icon_container = self.get_icon_container_safely()
         if not icon_container:
             return  # Cannot refresh icons without icon_container
-            
-        layout = icon_container.layout()
-        for i in reversed(range(layout.count())):
-            child = layout.itemAt(i).widget()
-            if child:
-                child.setParent(None)
-        
-        # Force layout update after clearing
-        layout.update()
-        icon_container.update()
+        icon_container.set_icon_geometry(thumbnail_size, icons_wide)
+        
+        # A new listing of the folder already shown (after paste, delete, rename or a monitor batch) is
+        # patched into the view; another folder, thumbnail size or thumbnail mode replaces the rows
+        model = icon_container.icon_model
+        self._listing_patches_view = (self.snapshot is not None and self.snapshot.path == self.current_folder
+                                      and model.rowCount() > 0 and model.thumbnail_size == thumbnail_size
+                                      and model.thumbnail_cache is getattr(main_window, 'thumbnail_cache', None)
+                                      and model.video_storyboards == bool(getattr(main_window, 'video_storyboards', False)
+                                                                          and model.thumbnail_cache is not None))
+        self._changed_while_listing = False
+
+        # Back/forward and a folder open in another tab are shown from the shared snapshot, without listing
+        registry = self.get_directory_models() if use_shared else None
+        snapshot = registry.get(self.current_folder) if registry else None
+        if snapshot is not None:
+            loader = self.get_directory_loader()
+            if loader and self._listing_generation:
+                loader.cancel(id(self))
+            self._listing_generation = 0
+            self._listing_streamed = False
+            order = self.sort_snapshot(snapshot)
+            self._show_listing(snapshot, order, snapshot.entries(order))
+            return
+
+        # A folder not on screen yet is rendered from its snapshot saved in an earlier session, if there is
+        # one; the listing below then revalidates it and only the differences are applied
+        if registry and (self.snapshot is None or self.snapshot.path != self.current_folder):
+            saved = registry.load_saved(self.current_folder)
+            if saved is not None:
+                self._listing_streamed = False
+                order = self.sort_snapshot(saved)
+                self._show_listing(saved, order, saved.entries(order), shared=False)
+                self._listing_patches_view = True
+
+        # List in the background; the current icons stay until the first entries arrive
+        loader = self.get_directory_loader()
+        if loader:
+            folder = self.current_folder
+            self._listing_streamed = False
+            self._icon_order = None
+            self._listing_generation = loader.load(id(self), folder, sort_func=self.sort_snapshot)
+            return
         
-        # Check if directory is large and use virtual loading if needed
         try:
-            if main_window and hasattr(main_window, 'virtual_file_loader') and main_window.virtual_file_loader:
-                # Count items first to decide on loading strategy
-                item_count = len([name for name in os.listdir(self.current_folder) 
-                                if not name.startswith('.')])
-                
-                if item_count > 1000:  # Use virtual loading for large directories
-                    # Use virtual file loader for large directories
-                    main_window.virtual_file_loader.load_directory_async(
-                        self.current_folder,
-                        lambda chunk, is_final: self._add_icons_chunk(chunk, is_final, thumbnail_size, icons_wide, main_window),
-                        sort_func=lambda items: self.sort_items(items, self.current_folder)
-                    )
-                    return
-            
-            # Standard loading for smaller directories
             self._load_icons_standard(thumbnail_size, icons_wide, main_window)
-            
         except PermissionError:
             # Handle permission errors gracefully
-            # ...removed thumbnail debug message...
-            pass
+            icon_container.icon_model.clear()
     
     def _load_icons_standard(self, thumbnail_size, icons_wide, main_window):
-        """Standard icon loading for smaller directories"""
-        icon_container = self.get_icon_container_safely()
-        if not icon_container:
-            return  # Cannot load icons without icon_container
-            
-        items = os.listdir(self.current_folder)
-        
-        # Use advanced sorting
-        sorted_items = self.sort_items(items, self.current_folder)
-        
-        for item in sorted_items:
-            self._create_and_add_icon(item, thumbnail_size, icons_wide, main_window)
-        
-        # Force layout update after adding widgets
-        layout = icon_container.layout()
-        layout.update()
-        icon_container.update()
-        icon_container.updateGeometry()
+        """List and show the folder synchronously (used when there is no DirectoryLoader)"""
+        snapshot = DirectorySnapshot.scan(self.current_folder)
+        order = self.sort_snapshot(snapshot)
+        self._show_listing(snapshot, order, snapshot.entries(order))
     
-    def _add_icons_chunk(self, items_chunk, is_final, thumbnail_size, icons_wide, main_window):
-        """Add a chunk of icons to the view (for virtual loading)"""
+    def sort_snapshot(self, snapshot):
+        """Return the positions of snapshot's entries in display order (safe to call off the UI thread)"""
+        return snapshot.sort_order(self.sort_by, self.sort_order == "descending", self.directories_first,
+                                   self.group_by_type, self.natural_sort, self.case_sensitive)
+
+    def resort(self):
+        """Apply changed sort settings by permuting the icon view in place from the snapshot's sort keys.
+
+        The detail view is re-sorted along with it. Falls back to refresh_current_view for the list view or
+        while the folder is still being listed.
+        """
+        snapshot = self.get_snapshot()
+        icon_container = self.get_icon_container_safely() if snapshot is not None else None
+        if icon_container is None or self.view_stack.currentWidget() not in (self.icon_view_widget, self.detail_view):
+            self.refresh_current_view()
+            return
+        try:
+            model = icon_container.icon_model
+            old_order, order = self._icon_order, self.sort_snapshot(snapshot)
+            def rows_after_sort(rows):
+                # Rows map through snapshot positions, so selection follows without comparing paths
+                positions = [old_order[row] for row in rows]
+                found = compress(range(len(order)), map(set(positions).__contains__, order))
+                rows_by_position = {order[row]: row for row in found}
+                return [rows_by_position[position] for position in positions]
+            same_rows = old_order is not None and len(old_order) == len(order) == model.rowCount()
+            model.reorder(snapshot.entries(order), rows_after_sort if same_rows else None)
+            self._icon_order = order
+            if self.view_stack.currentWidget() == self.detail_view:
+                self._show_detail_rows(snapshot, order)
+        except Exception as e:
+            print(f"[SORT] Re-sort failed, reloading folder: {e}")
+            self.refresh_current_view()
+
+    def get_directory_loader(self):
+        """Return the main window's DirectoryLoader, connecting this tab to it on first use"""
+        main_window = self.tab_manager.main_window if self.tab_manager else None
+        loader = getattr(main_window, 'directory_loader', None) if main_window else None
+        if loader and not self._directory_loader_connected:
+            loader.entriesLoaded.connect(self.on_entries_loaded)
+            loader.listingFinished.connect(self.on_listing_finished)
+            loader.listingFailed.connect(self.on_listing_failed)
+            self._directory_loader_connected = True
+        return loader
+
+    def _set_icon_entries(self, entries):
+        """Replace the icon view rows with entries, using the main window's thumbnail settings"""
         icon_container = self.get_icon_container_safely()
         if not icon_container:
-            return  # Cannot add icons without icon_container
-            
-        for item in items_chunk:
-            self._create_and_add_icon(item, thumbnail_size, icons_wide, main_window)
-        
-        if is_final:
-            # Force layout update after adding final chunk
-            layout = icon_container.layout()
-            layout.update()
-            icon_container.update()
-            icon_container.updateGeometry()
-    
-    def _create_and_add_icon(self, item, thumbnail_size, icons_wide, main_window):
-        """Create and add a single icon widget"""
+            return
+        main_window = self.tab_manager.main_window if self.tab_manager else None
+        icon_container.icon_model.set_entries(
+            entries, getattr(main_window, 'thumbnail_size', 64) if main_window else 64,
+            getattr(main_window, 'thumbnail_cache', None) if main_window else None,
+            getattr(main_window, 'video_storyboards', False) if main_window else False)
+
+    def on_entries_loaded(self, owner, generation, entries):
+        """Show the first entries of a long listing right away, unsorted, and append later batches"""
+        if owner != id(self) or generation != self._listing_generation or self._listing_patches_view:
+            return  # The rows on screen stay until the complete listing can be compared with them
         icon_container = self.get_icon_container_safely()
         if not icon_container:
-            return  # Cannot add icons without icon_container
-            
-        item_path = os.path.join(self.current_folder, item)
-        is_dir = os.path.isdir(item_path)
-        
-        # Use thumbnail cache if available
-        if main_window and hasattr(main_window, 'thumbnail_cache') and main_window.thumbnail_cache:
-            icon_widget = IconWidget(item, item_path, is_dir, thumbnail_size, main_window.thumbnail_cache)
+            return
+        if self._listing_streamed:
+            icon_container.icon_model.append_entries(entries)
         else:
-            icon_widget = IconWidget(item, item_path, is_dir, thumbnail_size)
-            
-        icon_widget.doubleClicked.connect(self.handle_double_click)
-        
-        # Connect to main window handlers through tab manager
-        if self.tab_manager and self.tab_manager.main_window:
-            main_window = self.tab_manager.main_window
-            icon_widget.clicked.connect(main_window.icon_clicked)
-            icon_widget.rightClicked.connect(main_window.icon_right_clicked)
-        
-        # Use the optimized layout from main window
-        icon_container.add_widget_optimized(icon_widget, thumbnail_size, icons_wide)
+            self._listing_streamed = True
+            self._set_icon_entries(entries)
+
+    def on_listing_finished(self, owner, generation, snapshot, order, entries):
+        """Show the complete listing in sort order and make its snapshot the tab's view of the folder"""
+        if owner != id(self) or generation != self._listing_generation:
+            return
+        self._listing_generation = 0
+        self._show_listing(snapshot, order, entries)
+        if self._changed_while_listing:
+            self._changed_while_listing = False
+            self.refresh_current_view()  # Pick up what the monitor saw after the listing started
+
+    def _show_listing(self, snapshot, order, entries, shared=True):
+        """Show a complete, sorted listing: patched into the rows on screen if it is the same folder again.
+        A shared listing is current and becomes the folder's snapshot in the DirectoryModelRegistry."""
+        previous = self.snapshot
+        self.snapshot = snapshot
+        self._icon_order = order
+        registry = self.get_directory_models() if shared else None
+        if registry:
+            registry.store(snapshot)  # Other tabs on this folder follow it
+        icon_container = self.get_icon_container_safely()
+        if icon_container:
+            model = icon_container.icon_model
+            model.snapshot = snapshot
+            if self._listing_patches_view and previous is not None:
+                changed_paths = [os.path.join(snapshot.path, name) for name in previous.changed_names(snapshot)]
+                scroll_value = icon_container.verticalScrollBar().value()
+                selected_paths = icon_container.selected_paths()
+                if not model.apply_entries(entries, changed_paths):
+                    icon_container.select_paths(selected_paths)
+                    icon_container.verticalScrollBar().setValue(scroll_value)
+                self.on_icon_view_scrolled()  # Thumbnails of new and changed rows
+            elif self._listing_streamed:
+                model.reorder(entries)  # Keeps what was selected while streaming
+            else:
+                self._set_icon_entries(entries)
+        if self.view_stack.currentWidget() == self.detail_view:
+            self._show_detail_rows(snapshot, order)
+        self._listing_streamed = False
+        self._listing_patches_view = False
+        self._update_status_bar_if_current()
+        if shared:
+            self.prefetch_likely_folders()
+
+    def get_prefetcher(self):
+        """Return the main window's DirectoryPrefetcher, or None"""
+        main_window = self.tab_manager.main_window if self.tab_manager else None
+        return getattr(main_window, 'directory_prefetcher', None) if main_window else None
+
+    def on_folder_hovered(self, folder):
+        """Prefetch the folder under the mouse if it stays there (see prefetch_likely_folders)"""
+        self._hovered_folder = folder
+        if folder:
+            self._prefetch_timer.start(self.PREFETCH_HOVER_MS)
+        else:
+            self._prefetch_timer.stop()
+
+    def prefetch_likely_folders(self):
+        """Have the DirectoryPrefetcher warm the folders likely to be opened next from this one: the folder
+        under the mouse, the parent, and the children opened most often (the first ones if none were)"""
+        prefetcher = self.get_prefetcher()
+        registry = self.get_directory_models()
+        snapshot = self.get_snapshot()
+        icon_container = self.get_icon_container_safely()
+        if not prefetcher or not registry or snapshot is None or icon_container is None:
+            return
+        if self.tab_manager and self.tab_manager.get_current_tab() is not self:
+            return
+        candidates = [self._hovered_folder] if self._hovered_folder else []
+        parent = os.path.dirname(self.current_folder.rstrip(os.sep)) or self.current_folder
+        candidates.append(parent)
+        order = self._icon_order if self._icon_order is not None else range(len(snapshot))
+        children = [os.path.join(snapshot.path, snapshot.names[position])
+                    for position in order if snapshot.is_dir(position)]
+        visited = sorted((folder for folder in children if prefetcher.visits.get(folder)),
+                         key=lambda folder: -prefetcher.visits[folder])
+        candidates.extend(list(dict.fromkeys(visited + children))[:self.PREFETCH_CHILDREN])
+        folders = []
+        for folder in candidates:
+            if folder != self.current_folder and folder not in folders and registry.get(folder) is None:
+                folders.append(folder)
+        if not folders:
+            return
+        lines = icon_container.viewport().height() // max(icon_container.cell_height, 1) + 1
+        prefetcher.prefetch(folders, self.sort_snapshot, icon_container.icon_model.thumbnail_size,
+                            icon_container.columns * lines)
+
+    def _update_status_bar_if_current(self):
+        main_window = self.tab_manager.main_window if self.tab_manager else None
+        if main_window and self.tab_manager.get_current_tab() is self and hasattr(main_window, 'safe_update_status_bar'):
+            main_window.safe_update_status_bar()
+
+    def get_snapshot(self):
+        """Return the DirectorySnapshot of the current folder, or None while it is still being listed"""
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.path == self.current_folder and not self._listing_generation:
+            return snapshot
+        return None
+
+    def on_listing_failed(self, owner, generation, message):
+        """Empty the icon view when the folder cannot be listed (e.g. permission denied)"""
+        if owner != id(self) or generation != self._listing_generation:
+            return
+        self._listing_generation = 0
+        self._listing_streamed = False
+        self.snapshot = None
+        self._icon_order = None
+        self._set_icon_entries([])
+        self.detail_model.clear()
+
+    def get_thumbnail_scheduler(self):
+        """Return the main window's ThumbnailScheduler, connecting this tab to it on first use"""
+        main_window = self.tab_manager.main_window if self.tab_manager else None
+        scheduler = getattr(main_window, 'thumbnail_scheduler', None) if main_window else None
+        if scheduler and not self._thumbnail_scheduler_connected:
+            scheduler.thumbnailReady.connect(self.on_thumbnail_ready)
+            scheduler.storyboardReady.connect(self.on_storyboard_ready)
+            self._thumbnail_scheduler_connected = True
+        return scheduler
+
+    def get_directory_models(self):
+        """Return the main window's DirectoryModelRegistry, connecting this tab to it on first use"""
+        main_window = self.tab_manager.main_window if self.tab_manager else None
+        registry = getattr(main_window, 'directory_models', None) if main_window else None
+        if registry and not self._directory_models_connected:
+            registry.snapshotChanged.connect(self.on_snapshot_changed)
+            self._directory_models_connected = True
+        return registry
+
+    def watch_folder(self, folder):
+        """Move this tab's hold on a shared directory model, and so its change watch, to folder (None: none)"""
+        if folder == self._watched_folder:
+            return
+        registry = self.get_directory_models()
+        if not registry:
+            return
+        if self._watched_folder:
+            registry.release(self._watched_folder)
+        self._watched_folder = folder
+        if folder:
+            registry.acquire(folder)
+
+    def on_snapshot_changed(self, folder, previous, snapshot, changes):
+        """Follow the shared snapshot of the folder this tab shows (see DirectoryModelRegistry.snapshotChanged)"""
+        if folder != self._watched_folder or folder != self.current_folder or snapshot is self.snapshot:
+            return
+        if self._listing_generation:
+            if snapshot is None or changes is not None:
+                self._changed_while_listing = True  # Listed again once the running listing is shown
+            return
+        if snapshot is None:
+            self.refresh_current_view()
+        elif changes is None or previous is not self.snapshot or not self.apply_directory_changes(snapshot, changes):
+            self.refresh_current_view(use_shared=True)
+
+    def apply_directory_changes(self, new_snapshot, changes):
+        """Show new_snapshot, the tab's snapshot patched with a monitor batch, touching only the changed rows.
+
+        Returns:
+            bool: False if the batch cannot be applied this way (another view, or no snapshot)
+        """
+        snapshot = self.get_snapshot()
+        icon_container = self.get_icon_container_safely()
+        if (not changes or snapshot is None or icon_container is None
+                or self.view_stack.currentWidget() != self.icon_view_widget):
+            return False
+        model = icon_container.icon_model
+        sort_settings = (self.sort_by, self.directories_first, self.group_by_type, self.natural_sort, self.case_sensitive)
+        # Rows keep their place if their key cannot have changed; a file's size or date can
+        in_place = self.sort_by not in ("size", "date")
+        changed_paths, moved_rows, inserted = [], [], []
+        rows = model.rows
+        for name in set(changes):
+            path = os.path.join(snapshot.path, name)
+            row = rows.get(path)
+            position = new_snapshot.index_of(name)
+            old_position = snapshot.index_of(name)
+            if (row is not None and position is not None and in_place and old_position is not None
+                    and snapshot.flags[old_position] == new_snapshot.flags[position]):
+                changed_paths.append(path)
+                continue
+            if row is not None:
+                moved_rows.append(row)
+            if position is not None:
+                inserted.append(position)
+        model.remove_rows(moved_rows)
+        # New rows in display order. New entries come last in the snapshot, so they go after equal keys, or
+        # before them once the order is reversed
+        descending = self.sort_order == "descending"
+        keyed = sorted((new_snapshot.sort_key(position, *sort_settings), position) for position in inserted)
+        if descending:
+            keyed.reverse()
+        # Binary search each for the row on screen to insert before (rows are in sort order); new rows going
+        # before the same row form one run
+        runs = []
+        for key, position in keyed:
+            low, high = 0, model.rowCount()
+            while low < high:
+                middle = (low + high) // 2
+                row_position = new_snapshot.index_of(model.entries[middle][0])
+                row_key = new_snapshot.sort_key(row_position, *sort_settings)
+                if (row_key > key) if descending else (row_key <= key):
+                    low = middle + 1
+                else:
+                    high = middle
+            if runs and runs[-1][0] == low:
+                runs[-1][1].append(position)
+            else:
+                runs.append((low, [position]))
+        inserted_before = 0
+        insert_runs = []
+        for row, positions in runs:
+            insert_runs.append((row + inserted_before, new_snapshot.entries(positions)))
+            inserted_before += len(positions)
+        model.snapshot = new_snapshot
+        model.insert_runs(insert_runs)
+        model.refresh_paths(changed_paths)
+        self.snapshot = new_snapshot
+        self._icon_order = None  # Rows are matched by path on the next re-sort
+        self.on_icon_view_scrolled()
+        self._update_status_bar_if_current()
+        return True
+
+    def cancel_background_work(self):
+        """Cancel outstanding listing and thumbnail work for this tab (navigation, refresh or tab close)"""
+        loader = self.get_directory_loader()
+        if loader:
+            loader.cancel(id(self))
+        scheduler = self.get_thumbnail_scheduler()
+        if scheduler:
+            scheduler.cancel(id(self))
+        detail_loader = self.get_detail_column_loader()
+        if detail_loader:
+            detail_loader.cancel(id(self))
+
+    def schedule_thumbnails(self):
+        """Queue thumbnails for the icons on screen first, then for the next screen up and down.
+
+        Only those rows are painted (see IconViewModel.decoration); rows further away are not asked for
+        until they are scrolled to.
+        """
+        scheduler = self.get_thumbnail_scheduler()
+        icon_container = self.get_icon_container_safely()
+        if not scheduler or not icon_container or self.view_stack.currentWidget() != self.icon_view_widget:
+            return  # Queued when the icon view is shown again (see on_view_changed)
+        model = icon_container.icon_model
+        visible_rows = icon_container.visible_rows()
+        if not visible_rows:
+            if model.rowCount() and icon_container.isVisible():
+                self._thumbnail_scroll_timer.start(50)  # Rows are not laid out yet
+            return
+        nearby_rows = icon_container.visible_rows(extra_screens=1)
+        visible, nearby = [], []
+        for row in nearby_rows:
+            model.decoration(row)
+            path = model.entries[row][1]
+            if path in model.pending:
+                (visible if row in visible_rows else nearby).append(path)
+        scheduler.schedule(id(self), [
+            (ThumbnailScheduler.PRIORITY_VISIBLE, visible),
+            (ThumbnailScheduler.PRIORITY_NEARBY, nearby),
+        ], model.thumbnail_size)
+
+    def on_icon_view_scrolled(self, *args):
+        """Re-prioritize thumbnails once scrolling (or a new listing) settles"""
+        self._thumbnail_scroll_timer.start(50)
+
+    def request_storyboard(self, path):
+        """Have the scheduler extract the storyboard of a hovered video"""
+        scheduler = self.get_thumbnail_scheduler()
+        if scheduler:
+            scheduler.request_storyboard(path)
+
+    def on_storyboard_ready(self, path, image):
+        """Hand a freshly extracted storyboard to the icon view"""
+        icon_container = self.get_icon_container_safely()
+        if icon_container:
+            icon_container.icon_model.set_storyboard(path, image)
+
+    def on_thumbnail_ready(self, path, size, image):
+        """Push a background-rendered thumbnail into the icon view"""
+        icon_container = self.get_icon_container_safely()
+        if icon_container:
+            icon_container.icon_model.set_thumbnail_image(path, size, image)
 
     def refresh_list_view(self):
         """Refresh list view"""
         self.list_model.setRootPath(self.current_folder)
         self.list_view.setRootIndex(self.list_model.index(self.current_folder))
     
-    def refresh_detail_view(self):
-        """Refresh detail view"""
-        self.detail_model.setRootPath(self.current_folder)
-        self.detail_view.setRootIndex(self.detail_model.index(self.current_folder))
-    
-    def resizeEvent(self, event):
-        """Handle tab resize events to trigger auto-width recalculation"""
-        super().resizeEvent(event)
-        
-        # If we're in auto-width mode, trigger a relayout of the icon container
+    def refresh_detail_view(self, use_shared=False):
+        """Refresh detail view from the folder's snapshot.
+
+        The folder is listed (or taken from the DirectoryModelRegistry) by refresh_icon_view, whose rows are
+        kept in step so that switching views needs no listing; _show_listing then fills the detail rows.
+        The snapshot already held for the folder is shown meanwhile.
+        """
+        snapshot = self.get_snapshot()
+        if snapshot is not None and self.detail_model.snapshot is not snapshot:
+            self._show_detail_rows(snapshot, self._icon_order if self._icon_order is not None
+                                   else self.sort_snapshot(snapshot))
+        self.refresh_icon_view(use_shared)
+
+    def _show_detail_rows(self, snapshot, order):
+        """Show snapshot in the detail view with its entries in order; selection and scroll position stay if
+        it is the folder already shown"""
+        model = self.detail_model
+        same_folder = model.snapshot is not None and model.snapshot.path == snapshot.path
+        selected, current_path, scroll_value = [], '', 0
+        if same_folder:
+            selected = [(model.filePath(index), index.column())
+                        for index in self.detail_view.selectionModel().selectedIndexes()]
+            current_path = model.filePath(self.detail_view.currentIndex())
+            scroll_value = self.detail_view.verticalScrollBar().value()
+        model.set_snapshot(snapshot, order)
+        if not same_folder:
+            return
+        selection = QItemSelection()
+        for path, column in selected:
+            row = model.row_of(path)
+            if row is not None:
+                selection.select(model.index(row, column), model.index(row, column))
+        selection_model = self.detail_view.selectionModel()
+        selection_model.select(selection, QItemSelectionModel.Select)
+        row = model.row_of(current_path) if current_path else None
+        if row is not None:
+            selection_model.setCurrentIndex(model.index(row, 0), QItemSelectionModel.NoUpdate)
+        self.detail_view.verticalScrollBar().setValue(scroll_value)
+
+    def on_view_changed(self, index):
+        """Move background work to the view now shown: thumbnails for icons, loaded columns for details"""
+        if self.view_stack.widget(index) is not self.detail_view:
+            self._detail_columns_timer.stop()
+            detail_loader = self.get_detail_column_loader()
+            if detail_loader:
+                detail_loader.cancel(id(self))
+        if self.view_stack.widget(index) is not self.icon_view_widget:
+            scheduler = self.get_thumbnail_scheduler()
+            if scheduler:
+                scheduler.cancel(id(self))
+        if self.view_stack.widget(index) is self.icon_view_widget:
+            self.on_icon_view_scrolled()
+        elif self.view_stack.widget(index) is self.detail_view:
+            self.on_detail_view_scrolled()
+
+    def get_detail_column_loader(self):
+        """Return the main window's DetailColumnLoader, connecting this tab to it on first use"""
         main_window = self.tab_manager.main_window if self.tab_manager else None
-        if main_window and getattr(main_window, 'icons_wide', 0) == 0:
-            # Get the current view's icon container safely
-            icon_container = self.get_icon_container_safely()
-            if icon_container:
-                # Use a timer to prevent excessive relayout calls during resize
-                if not hasattr(self, '_tab_resize_timer'):
-                    from PyQt5.QtCore import QTimer
-                    self._tab_resize_timer = QTimer()
-                    self._tab_resize_timer.setSingleShot(True)
-                    self._tab_resize_timer.timeout.connect(lambda: self.get_icon_container_safely() and self.get_icon_container_safely().relayout_icons())
-                
-                self._tab_resize_timer.stop()
-                self._tab_resize_timer.start(150)  # Delay 150ms before relayout
-    
-    def eventFilter(self, obj, event):
-        """Handle events from child widgets, specifically scroll area viewport resizes"""
-        if (obj == getattr(self, 'scroll_area', None) or 
-            obj == getattr(getattr(self, 'scroll_area', None), 'viewport', lambda: None)()):
-            if event.type() == QEvent.Resize:
-                # Viewport was resized, trigger auto-width recalculation if needed
-                main_window = self.tab_manager.main_window if self.tab_manager else None
-                if main_window and getattr(main_window, 'icons_wide', 0) == 0:
-                    icon_container = self.get_icon_container_safely()
-                    if icon_container:
-                        # Use a shorter delay for viewport resize events
-                        if not hasattr(self, '_viewport_resize_timer'):
-                            from PyQt5.QtCore import QTimer
-                            self._viewport_resize_timer = QTimer()
-                            self._viewport_resize_timer.setSingleShot(True)
-                            self._viewport_resize_timer.timeout.connect(lambda: self.get_icon_container_safely() and self.get_icon_container_safely().relayout_icons())
-                        
-                        self._viewport_resize_timer.stop()
-                        self._viewport_resize_timer.start(50)  # Quick response for viewport changes
-        
-        return super().eventFilter(obj, event)
+        loader = getattr(main_window, 'detail_column_loader', None) if main_window else None
+        if loader and not self._detail_column_loader_connected:
+            loader.valuesReady.connect(self.on_detail_values_ready)
+            self._detail_column_loader_connected = True
+        return loader
+
+    def schedule_detail_columns(self):
+        """Queue dimensions, durations and folder sizes for the detail rows on screen first, then for the
+        next screen up and down; rows further away are loaded when they are scrolled to"""
+        detail_loader = self.get_detail_column_loader()
+        model = self.detail_model
+        if not detail_loader or not model.rowCount() or self.view_stack.currentWidget() != self.detail_view:
+            return
+        viewport_height = self.detail_view.viewport().height()
+        first = max(0, self.detail_view.rowAt(0))
+        last = self.detail_view.rowAt(viewport_height - 1)
+        if last < 0:
+            last = model.rowCount() - 1
+        screen = last - first + 1
+        visible = model.pending_jobs(range(first, last + 1))
+        nearby = model.pending_jobs(list(range(last + 1, min(model.rowCount(), last + 1 + screen)))
+                                    + list(range(max(0, first - screen), first)))
+        detail_loader.schedule(id(self), [
+            (DetailColumnLoader.PRIORITY_VISIBLE, visible),
+            (DetailColumnLoader.PRIORITY_NEARBY, nearby),
+        ])
+
+    def on_detail_view_scrolled(self, *args):
+        """Re-prioritize loaded columns once scrolling (or a new listing) settles"""
+        self._detail_columns_timer.start(50)
+
+    def on_detail_values_ready(self, owner, values):
+        """Fill a batch of loaded columns into the detail view"""
+        if owner == id(self):
+            self.detail_model.apply_values(values)
     
     def get_icon_container_safely(self):
         """Safely get icon_container reference, returns None if not available"""
@@ -7007,8 +10631,13 @@ class TabManager(QWidget):
         
         # Initial tab creation is handled by parent class now
     
-    def new_tab(self, initial_path=None):
-        """Create a new tab"""
+    def new_tab(self, initial_path=None, activate=True):
+        """Create a new tab
+
+        Args:
+            initial_path (str): folder to open, home if missing or invalid
+            activate (bool): switch to the new tab; tabs added without switching are listed once shown
+        """
         if initial_path is None:
             initial_path = os.path.expanduser("~")
         
@@ -7023,17 +10652,21 @@ class TabManager(QWidget):
         tab = FileManagerTab(initial_path, self)
         self.tabs.append(tab)
         
-        # Install event filter for right-click handling on this tab's scroll area
-        if hasattr(self, 'main_window') and self.main_window:
-            tab.scroll_area.viewport().installEventFilter(self.main_window)
+        # Selection and context menus of this tab's icon view go to the main window
+        if self.main_window and hasattr(self.main_window, 'connect_tab_signals'):
+            self.main_window.connect_tab_signals(tab)
         
         tab_title = os.path.basename(initial_path) or "Home"
+        self.tab_bar.blockSignals(not activate)  # The first tab added becomes current, and would be shown
         tab_index = self.tab_bar.addTab(tab_title)
+        self.tab_bar.blockSignals(False)
         self.tab_stack.addWidget(tab)
         
         # Switch to new tab
-        self.tab_bar.setCurrentIndex(tab_index)
-        self.tab_stack.setCurrentWidget(tab)
+        if activate:
+            self.tab_bar.setCurrentIndex(tab_index)
+            self.tab_stack.setCurrentWidget(tab)
+            tab.refresh_if_deferred()
         
         # Notify about tab change
         if self.tab_changed_callback:
@@ -7055,6 +10688,10 @@ class TabManager(QWidget):
         if hasattr(self.main_window, 'save_tab_sort_settings'):
             self.main_window.save_tab_sort_settings(tab)
         
+        # Stop background work queued for this tab
+        tab.cancel_background_work()
+        tab.watch_folder(None)
+        
         # Remove from our list first
         self.tabs.remove(tab)
         
@@ -7089,6 +10726,7 @@ class TabManager(QWidget):
                 # Fallback: use stack index instead
                 if index < self.tab_stack.count():
                     self.tab_stack.setCurrentIndex(index)
+            target_tab.refresh_if_deferred()  # First time shown, or refreshed while in the background
             
             # Notify about tab change
             if self.tab_changed_callback:
@@ -7139,6 +10777,9 @@ class SimpleFileManager(QMainWindow):
         super().__init__()
         self.clipboard_data = None
         self.thumbnail_size = 64  # Default thumbnail size
+        self.video_storyboards = False  # Scrub through video frames when hovering video icons
+        self.share_desktop_thumbnails = False  # Save thumbnails into the freedesktop.org cache (Linux)
+        self.deduplicate_thumbnails = False  # Key thumbnails by file content, so identical files share one
         
         # Initialize dark mode as default on all platforms
         # Only use system detection on macOS if user prefers, otherwise default to dark
@@ -7152,41 +10793,36 @@ class SimpleFileManager(QMainWindow):
         self.search_visible = False
         
         # Define cleanup methods before they're used
-        def _cleanup_thumbnails():
+        def _cleanup_thumbnails(aggressive=False):
             """Clean up thumbnail cache memory"""
             try:
                 if hasattr(self, 'thumbnail_cache') and self.thumbnail_cache:
+                    print(f"[THUMBNAIL-CACHE] Stats before cleanup: {self.thumbnail_cache.get_stats()}")
                     self.thumbnail_cache.clear_memory_cache()
-                    # Break circular references
-                    if hasattr(self.thumbnail_cache, 'memory_cache'):
-                        del self.thumbnail_cache.memory_cache
-                        self.thumbnail_cache.memory_cache = OrderedDict()
             except Exception as e:
                 # ...removed cache debug message...
                 pass
 
-        def _cleanup_virtual_loader():
-            """Clean up virtual file loader resources"""
-            try:
-                if hasattr(self, 'virtual_file_loader') and self.virtual_file_loader:
-                    self.virtual_file_loader.cleanup()
-                    # Clear references to prevent memory leaks
-                    if hasattr(self.virtual_file_loader, 'loaded_chunks'):
-                        self.virtual_file_loader.loaded_chunks.clear()
-                    if hasattr(self.virtual_file_loader, 'directory_cache'):
-                        self.virtual_file_loader.directory_cache.clear()
-            except Exception as e:
-                print(f"Error in virtual loader cleanup: {e}")
-        
         # Bind cleanup methods to self
         self._cleanup_thumbnails = _cleanup_thumbnails
-        self._cleanup_virtual_loader = _cleanup_virtual_loader
         
         # Initialize performance optimization components (FIXED CLEANUP)
-        self.thumbnail_cache = ThumbnailCache()
-        self.virtual_file_loader = VirtualFileLoader()
+        # Worker processes only pay off when there is a core to spare for them
+        render_backend = ProcessPoolRenderBackend() if (os.cpu_count() or 1) > 1 else InProcessRenderBackend()
+        self.thumbnail_cache = ThumbnailCache(render_backend=render_backend)
+        # Trim the on-disk cache once startup work has settled
+        QTimer.singleShot(30000, self.thumbnail_cache.start_maintenance)
+        # One scheduler thread per render process, each waits on its render without holding the GIL
+        self.thumbnail_scheduler = ThumbnailScheduler(self.thumbnail_cache,
+                                                      max_workers=self.thumbnail_cache.render_backend.max_workers)
+        self.directory_loader = DirectoryLoader()
         self.memory_manager = MemoryManager()
         self.background_monitor = BackgroundFileMonitor()
+        self.snapshot_store = DirectorySnapshotStore()
+        self.directory_models = DirectoryModelRegistry(self.background_monitor, self.snapshot_store, self.thumbnail_cache)
+        self.directory_prefetcher = DirectoryPrefetcher(self.thumbnail_cache, self.thumbnail_scheduler)
+        self.directory_prefetcher.snapshotPrefetched.connect(self.directory_models.add_prefetched)
+        self.detail_column_loader = DetailColumnLoader()
         
         # Initialize advanced search engine
         self.search_engine = SearchEngine()
@@ -7194,7 +10830,6 @@ class SimpleFileManager(QMainWindow):
         # Register cleanup callbacks for memory management
         if self.memory_manager:
             self.memory_manager.add_cleanup_callback(self._cleanup_thumbnails)
-            self.memory_manager.add_cleanup_callback(self._cleanup_virtual_loader)
             self.memory_manager.add_cleanup_callback(lambda: self.search_engine.cleanup())
         
         # Initialize managers first (needed for settings loading)
@@ -7202,6 +10837,9 @@ class SimpleFileManager(QMainWindow):
         self.view_mode_manager = ViewModeManager()
         
         self.last_dir = self.load_last_dir() or QDir.rootPath()
+        if self.thumbnail_cache.freedesktop is not None:
+            self.thumbnail_cache.freedesktop.write_back = self.share_desktop_thumbnails
+        self.thumbnail_cache.content_keys = self.deduplicate_thumbnails
         self.selected_icon = None  # Track selected icon
         self.selected_items = []  # Track multiple selected items
         self.error_count = 0  # Track errors for improved error handling
@@ -7434,7 +11072,8 @@ class SimpleFileManager(QMainWindow):
     
     def connect_tab_signals(self, tab):
         """Connect signals from a tab to main window handlers"""
-        if tab:
+        if tab and not getattr(tab, '_main_window_signals_connected', False):
+            tab._main_window_signals_connected = True
             icon_container = getattr(tab, 'icon_container', None) if hasattr(tab, 'get_icon_container_safely') else None
             if not icon_container and hasattr(tab, 'get_icon_container_safely'):
                 icon_container = tab.get_icon_container_safely()
@@ -7443,7 +11082,8 @@ class SimpleFileManager(QMainWindow):
                 try:
                     icon_container.emptySpaceClicked.connect(self.deselect_icons)
                     icon_container.emptySpaceRightClicked.connect(self.empty_space_right_clicked)
-                    icon_container.selectionChanged.connect(self.on_selection_changed)
+                    icon_container.selectedPathsChanged.connect(self.on_selection_changed)
+                    icon_container.itemRightClicked.connect(self.icon_right_clicked)
                 except AttributeError:
                     # Handle case where icon_container exists but doesn't have expected signals
                     pass
@@ -7620,6 +11260,21 @@ class SimpleFileManager(QMainWindow):
         thumbnail_menu.addAction(self.large_thumb_action)
         thumbnail_menu.addAction(self.xlarge_thumb_action)
         
+        thumbnail_menu.addSeparator()
+        self.video_storyboard_action = QAction("Video Storyboards on Hover", self, checkable=True)
+        self.video_storyboard_action.setChecked(self.video_storyboards)
+        self.video_storyboard_action.triggered.connect(self.set_video_storyboards)
+        thumbnail_menu.addAction(self.video_storyboard_action)
+        if self.thumbnail_cache.freedesktop is not None:
+            self.share_thumbnails_action = QAction("Share Thumbnails with Other Applications", self, checkable=True)
+            self.share_thumbnails_action.setChecked(self.share_desktop_thumbnails)
+            self.share_thumbnails_action.triggered.connect(self.set_share_desktop_thumbnails)
+            thumbnail_menu.addAction(self.share_thumbnails_action)
+        self.deduplicate_thumbnails_action = QAction("Share Thumbnails Between Identical Files", self, checkable=True)
+        self.deduplicate_thumbnails_action.setChecked(self.deduplicate_thumbnails)
+        self.deduplicate_thumbnails_action.triggered.connect(self.set_deduplicate_thumbnails)
+        thumbnail_menu.addAction(self.deduplicate_thumbnails_action)
+        
         # Icon layout submenu (for icon view)
         layout_menu = view_menu.addMenu("Icon Layout")
         self.auto_width_action = QAction("Auto Width", self, checkable=True, checked=True)
@@ -7880,7 +11535,7 @@ class SimpleFileManager(QMainWindow):
                 current_tab.refresh_list_view()
             elif mode == ViewModeManager.DETAIL_VIEW:
                 current_tab.view_stack.setCurrentWidget(current_tab.detail_view)
-                current_tab.refresh_detail_view()
+                current_tab.refresh_detail_view(use_shared=True)  # The shared snapshot is current
 
     # Cross-platform navigation methods
     def focus_location_bar(self):
@@ -8534,35 +12189,6 @@ class SimpleFileManager(QMainWindow):
                 # Update current folder reference
                 self.current_folder = path
 
-                # Automatically pre-cache video thumbnails in the background using QThread
-                if hasattr(self, 'thumbnail_cache') and self.thumbnail_cache:
-                    try:
-                        from PyQt5.QtCore import QThread, pyqtSignal, QObject
-
-                        class ThumbnailPrecacheWorker(QObject):
-                            finished = pyqtSignal()
-                            def __init__(self, directory, thumbnail_cache, size):
-                                super().__init__()
-                                self.directory = directory
-                                self.thumbnail_cache = thumbnail_cache
-                                self.size = size
-                            def run(self):
-                                try:
-                                    precache_video_thumbnails_in_directory(self.directory, self.thumbnail_cache, size=self.size)
-                                except Exception as e:
-                                    print(f"[DEBUG] Error in thumbnail worker: {e}")
-                                self.finished.emit()
-
-                        self._thumb_thread = QThread()
-                        self._thumb_worker = ThumbnailPrecacheWorker(path, self.thumbnail_cache, getattr(self, 'thumbnail_size', 128))
-                        self._thumb_worker.moveToThread(self._thumb_thread)
-                        self._thumb_thread.started.connect(self._thumb_worker.run)
-                        self._thumb_worker.finished.connect(self._thumb_thread.quit)
-                        self._thumb_worker.finished.connect(self._thumb_worker.deleteLater)
-                        self._thumb_thread.finished.connect(self._thumb_thread.deleteLater)
-                        self._thumb_thread.start()
-                    except Exception as e:
-                        print(f"[DEBUG] Error starting video thumbnail pre-cache thread: {e}")
             else:
                 self.show_error_message("Navigation Error", f"Path no longer exists: {path}")
         except Exception as e:
@@ -8583,7 +12209,16 @@ class SimpleFileManager(QMainWindow):
                 return
                 
             selected_count = len(self.selected_items)
-            if selected_count == 0:
+            current_tab = self.tab_manager.get_current_tab() if hasattr(self, 'tab_manager') else None
+            snapshot = current_tab.get_snapshot() if current_tab and hasattr(current_tab, 'get_snapshot') else None
+            if snapshot is not None and snapshot.path != self.current_folder:
+                snapshot = None
+            if selected_count == 0 and snapshot is not None:
+                folder_count, file_count = snapshot.counts()
+                self.status_bar.showMessage(f"{folder_count} folders, {file_count} files")
+            elif selected_count == 0 and current_tab and getattr(current_tab, '_listing_generation', 0):
+                self.status_bar.showMessage("Listing folder...")  # Counted once the listing completes
+            elif selected_count == 0:
                 # Show folder info
                 try:
                     items = os.listdir(self.current_folder)
@@ -8595,8 +12230,13 @@ class SimpleFileManager(QMainWindow):
             elif selected_count == 1:
                 # Show single item info
                 item_path = self.selected_items[0]
+                position = snapshot.lookup(item_path) if snapshot is not None else None
                 try:
-                    if os.path.isfile(item_path):
+                    if position is not None and snapshot.is_file(position):
+                        self.status_bar.showMessage(f"1 file selected ({self.format_file_size(snapshot.sizes[position])})")
+                    elif position is not None:
+                        self.status_bar.showMessage("1 folder selected")
+                    elif os.path.isfile(item_path):
                         size = os.path.getsize(item_path)
                         size_str = self.format_file_size(size)
                         self.status_bar.showMessage(f"1 file selected ({size_str})")
@@ -8635,67 +12275,6 @@ class SimpleFileManager(QMainWindow):
             if details:
                 print(f"Details: {details}")
 
-    def eventFilter(self, obj, event):
-        """Handle events on the scroll area viewport to catch clicks in blank areas"""
-        # Get current tab
-        current_tab = self.tab_manager.get_current_tab()
-        if not current_tab:
-            return super().eventFilter(obj, event)
-            
-        if (obj == current_tab.scroll_area.viewport() and 
-            hasattr(current_tab, 'get_icon_container_safely') and
-            current_tab.get_icon_container_safely() and
-            self.view_mode_manager.get_mode() == 'icon'):
-            
-            if event.type() == QEvent.MouseButtonPress:
-                if event.button() == Qt.LeftButton:
-                    # Map viewport coordinates to icon container coordinates
-                    icon_container = current_tab.get_icon_container_safely()
-                    if not icon_container:
-                        return super().eventFilter(obj, event)
-                        
-                    viewport_pos = event.pos()
-                    container_global_pos = current_tab.scroll_area.viewport().mapToGlobal(viewport_pos)
-                    container_pos = icon_container.mapFromGlobal(container_global_pos)
-                    
-                    # Check if there's a widget at this position in the container
-                    child_widget = icon_container.childAt(container_pos)
-                    
-                    # If no child widget, click is outside container bounds, or not an icon widget
-                    is_empty_space = (child_widget is None or 
-                                    child_widget == icon_container or
-                                    isinstance(child_widget, QLayout) or
-                                    not hasattr(child_widget, 'full_path') or
-                                    not icon_container.rect().contains(container_pos))
-                    
-                    if is_empty_space:
-                        self.deselect_icons()
-                        return True  # Event handled
-                        
-                elif event.button() == Qt.RightButton:
-                    # Handle right clicks in blank viewport area
-                    icon_container = current_tab.get_icon_container_safely()
-                    if not icon_container:
-                        return super().eventFilter(obj, event)
-                        
-                    viewport_pos = event.pos()
-                    container_global_pos = current_tab.scroll_area.viewport().mapToGlobal(viewport_pos)
-                    container_pos = icon_container.mapFromGlobal(container_global_pos)
-                    child_widget = icon_container.childAt(container_pos)
-                    
-                    # If no child widget, click is outside container bounds, or not an icon widget
-                    is_empty_space = (child_widget is None or 
-                                    child_widget == icon_container or
-                                    isinstance(child_widget, QLayout) or
-                                    not hasattr(child_widget, 'full_path') or
-                                    not icon_container.rect().contains(container_pos))
-                    
-                    if is_empty_space:
-                        self.empty_space_right_clicked(event.globalPos())
-                        return True  # Event handled
-        
-        return super().eventFilter(obj, event)
-
     def closeEvent(self, event):
         """Handle application close event with proper cleanup to prevent hanging"""
         try:
@@ -8760,6 +12339,37 @@ class SimpleFileManager(QMainWindow):
                 except Exception as e:
                     print(f"Error cleaning up background monitor: {e}")
             
+            # Stop prefetching before the renderers it uses go away
+            if hasattr(self, 'directory_prefetcher') and self.directory_prefetcher:
+                try:
+                    self.directory_prefetcher.cleanup()
+                except Exception as e:
+                    print(f"Error stopping directory prefetcher: {e}")
+            
+            # Stop loading detail view columns
+            if hasattr(self, 'detail_column_loader') and self.detail_column_loader:
+                try:
+                    self.detail_column_loader.shutdown()
+                except Exception as e:
+                    print(f"Error stopping detail column loader: {e}")
+            
+            # Stop rendering PDF preview pages
+            if hasattr(self, 'preview_pane') and self.preview_pane:
+                try:
+                    self.preview_pane.pdf_renderer.shutdown()
+                except Exception as e:
+                    print(f"Error stopping PDF preview renderer: {e}")
+            
+            # Stop background thumbnail rendering
+            if hasattr(self, 'thumbnail_scheduler') and self.thumbnail_scheduler:
+                print("Stopping thumbnail scheduler...")
+                try:
+                    self.thumbnail_scheduler.shutdown()
+                    self.thumbnail_cache.render_backend.shutdown()
+                    pdf_document_pool.close_all()
+                except Exception as e:
+                    print(f"Error stopping thumbnail scheduler: {e}")
+            
             # Clean up thumbnail cache
             if hasattr(self, 'thumbnail_cache') and self.thumbnail_cache:
                 print("Cleaning up thumbnail cache...")
@@ -8768,13 +12378,25 @@ class SimpleFileManager(QMainWindow):
                 except Exception as e:
                     print(f"Error cleaning up thumbnail cache: {e}")
             
-            # Clean up virtual file loader
-            if hasattr(self, 'virtual_file_loader') and self.virtual_file_loader:
-                print("Cleaning up virtual file loader...")
+            # Release shared directory models and their watches
+            if hasattr(self, 'directory_models') and self.directory_models:
+                try:
+                    self.directory_models.cleanup()
+                except Exception as e:
+                    print(f"Error cleaning up directory models: {e}")
+            if hasattr(self, 'snapshot_store') and self.snapshot_store:
+                try:
+                    self.snapshot_store.cleanup()
+                except Exception as e:
+                    print(f"Error saving directory snapshots: {e}")
+            
+            # Stop directory listings
+            if hasattr(self, 'directory_loader') and self.directory_loader:
+                print("Cleaning up directory loader...")
                 try:
-                    self.virtual_file_loader.cleanup()
+                    self.directory_loader.cleanup()
                 except Exception as e:
-                    print(f"Error cleaning up virtual file loader: {e}")
+                    print(f"Error cleaning up directory loader: {e}")
             
             # Clean up search engine
             if hasattr(self, 'search_engine') and self.search_engine:
@@ -8848,24 +12470,17 @@ class SimpleFileManager(QMainWindow):
             if hasattr(self, 'thumbnail_cache') and self.thumbnail_cache:
                 try:
                     # Clear all cache data
-                    if hasattr(self.thumbnail_cache, 'memory_cache'):
-                        self.thumbnail_cache.memory_cache.clear()
-                    if hasattr(self.thumbnail_cache, 'metadata'):
-                        self.thumbnail_cache.metadata.clear()
+                    self.thumbnail_cache.clear_memory_cache()
                     self.thumbnail_cache = None
                 except Exception as e:
                     print(f"Error cleaning thumbnail cache: {e}")
             
-            if hasattr(self, 'virtual_file_loader') and self.virtual_file_loader:
+            if hasattr(self, 'directory_loader') and self.directory_loader:
                 try:
-                    # Clear all loaded data
-                    if hasattr(self.virtual_file_loader, 'loaded_chunks'):
-                        self.virtual_file_loader.loaded_chunks.clear()
-                    if hasattr(self.virtual_file_loader, 'directory_cache'):
-                        self.virtual_file_loader.directory_cache.clear()
-                    self.virtual_file_loader = None
+                    self.directory_loader.cleanup()
+                    self.directory_loader = None
                 except Exception as e:
-                    print(f"Error cleaning virtual file loader: {e}")
+                    print(f"Error cleaning directory loader: {e}")
             
             # Find and terminate all QThread children
             threads = self.findChildren(QThread)
@@ -8965,6 +12580,9 @@ class SimpleFileManager(QMainWindow):
             data = {
                 "last_dir": path,
                 "thumbnail_size": self.thumbnail_size,
+                "video_storyboards": self.video_storyboards,
+                "share_desktop_thumbnails": self.share_desktop_thumbnails,
+                "deduplicate_thumbnails": self.deduplicate_thumbnails,
                 "dark_mode": self.dark_mode,
                 "icons_wide": self.icons_wide,
                 "view_mode": self.view_mode_manager.get_mode(),
@@ -8991,6 +12609,12 @@ class SimpleFileManager(QMainWindow):
                     # Load thumbnail size if available
                     if "thumbnail_size" in data:
                         self.thumbnail_size = data["thumbnail_size"]
+                    if "video_storyboards" in data:
+                        self.video_storyboards = data["video_storyboards"]
+                    if "share_desktop_thumbnails" in data:
+                        self.share_desktop_thumbnails = data["share_desktop_thumbnails"]
+                    if "deduplicate_thumbnails" in data:
+                        self.deduplicate_thumbnails = data["deduplicate_thumbnails"]
                     # Load dark mode setting if available
                     if "dark_mode" in data:
                         self.dark_mode = data["dark_mode"]
@@ -9069,7 +12693,8 @@ class SimpleFileManager(QMainWindow):
                     path = tab_info.get("path", "")
                     if path and os.path.exists(path) and os.path.isdir(path):
                         try:
-                            new_tab = self.tab_manager.new_tab(path)
+                            # Only the active tab is listed now, the others once they are first shown
+                            new_tab = self.tab_manager.new_tab(path, activate=False)
                             restored_tabs += 1
                         except Exception as e:
                             print(f"Error restoring tab {path}: {e}")
@@ -9093,6 +12718,9 @@ class SimpleFileManager(QMainWindow):
                             if len(self.tab_manager.tabs) > 0:
                                 self.tab_manager.tab_bar.setCurrentIndex(0)
                                 self.tab_manager.tab_stack.setCurrentIndex(0)
+                    current_tab = self.tab_manager.get_current_tab()
+                    if current_tab:
+                        current_tab.refresh_if_deferred()  # Shown without a tab change if it was current already
                 
                 print(f"Restored {restored_tabs} tabs from previous session")
                 
@@ -9595,19 +13223,11 @@ class SimpleFileManager(QMainWindow):
                 icon_container = current_tab.get_icon_container_safely()
             
             if icon_container:
-                # Clear grid layout by removing all widgets
-                layout = icon_container.layout()
-                if layout:
-                    while layout.count():
-                        child = layout.takeAt(0)
-                        if child.widget():
-                            child.widget().deleteLater()
+                icon_container.icon_model.clear()
         
         # Clear detail view rows (QTableView) - this would be in current tab if it exists
         if current_tab and hasattr(current_tab, 'detail_view') and hasattr(current_tab, 'detail_model'):
-            # For QTableView with QFileSystemModel, we need to reset the model or set an empty root
-            # Setting root to an empty/non-existent path effectively clears the view
-            current_tab.detail_model.setRootPath("")
+            current_tab.detail_model.clear()
 
     def deselect_icons(self):
         """Deselect all icons in the current view"""
@@ -10436,7 +14056,9 @@ class SimpleFileManager(QMainWindow):
                 return
                 
             all_items = []
-            for item_name in os.listdir(current_tab.current_folder):
+            snapshot = current_tab.get_snapshot() if hasattr(current_tab, 'get_snapshot') else None
+            names = snapshot.names if snapshot is not None else os.listdir(current_tab.current_folder)
+            for item_name in names:
                 if not item_name.startswith('.') or getattr(self, 'show_hidden', False):
                     all_items.append(os.path.join(current_tab.current_folder, item_name))
             
@@ -10449,9 +14071,8 @@ class SimpleFileManager(QMainWindow):
             if icon_container:
                 if hasattr(icon_container, 'clear_selection'):
                     icon_container.clear_selection()
-                if hasattr(icon_container, 'add_to_selection_by_path'):
-                    for path in all_items:
-                        icon_container.add_to_selection_by_path(path)
+                if hasattr(icon_container, 'select_paths'):
+                    icon_container.select_paths(all_items)
             
             self.on_selection_changed(all_items)
             self.statusBar().showMessage(f"Selected {len(all_items)} items", 2000)
@@ -10516,6 +14137,36 @@ class SimpleFileManager(QMainWindow):
                     tab._thumbnail_size_timer.stop()
                     tab._thumbnail_size_timer.start(200)  # Delay to let refresh complete first
 
+    def set_video_storyboards(self, enabled):
+        """Turn hover-scrub storyboards for video icons on or off and refresh the view"""
+        self.video_storyboards = bool(enabled)
+        if hasattr(self, 'video_storyboard_action'):
+            self.video_storyboard_action.setChecked(self.video_storyboards)
+        current_path = getattr(self, 'current_folder', os.path.expanduser("~"))
+        self.save_last_dir(current_path)
+        for tab in self.tab_manager.tabs:
+            tab.refresh_current_view()
+
+    def set_share_desktop_thumbnails(self, enabled):
+        """Turn saving new thumbnails into the freedesktop.org cache shared with other applications on or off"""
+        self.share_desktop_thumbnails = bool(enabled)
+        if self.thumbnail_cache.freedesktop is not None:
+            self.thumbnail_cache.freedesktop.write_back = self.share_desktop_thumbnails
+        if hasattr(self, 'share_thumbnails_action'):
+            self.share_thumbnails_action.setChecked(self.share_desktop_thumbnails)
+        current_path = getattr(self, 'current_folder', os.path.expanduser("~"))
+        self.save_last_dir(current_path)
+
+    def set_deduplicate_thumbnails(self, enabled):
+        """Turn keying thumbnails by file content on or off. Byte-identical files then share one thumbnail,
+        at the cost of reading each file in full once before its thumbnail is rendered."""
+        self.deduplicate_thumbnails = bool(enabled)
+        self.thumbnail_cache.content_keys = self.deduplicate_thumbnails
+        if hasattr(self, 'deduplicate_thumbnails_action'):
+            self.deduplicate_thumbnails_action.setChecked(self.deduplicate_thumbnails)
+        current_path = getattr(self, 'current_folder', os.path.expanduser("~"))
+        self.save_last_dir(current_path)
+
     def update_thumbnail_menu_checkmarks(self):
         """Update menu checkmarks based on current thumbnail size"""
         self.small_thumb_action.setChecked(self.thumbnail_size == 48)
@@ -10723,13 +14374,8 @@ class SimpleFileManager(QMainWindow):
             if not icon_container and hasattr(current_tab, 'get_icon_container_safely'):
                 icon_container = current_tab.get_icon_container_safely()
             
-            if icon_container:
-                for i in range(icon_container.layout().count()):
-                    item = icon_container.layout().itemAt(i)
-                    if item and item.widget():
-                        widget = item.widget()
-                        if hasattr(widget, 'update_style_for_theme'):
-                            widget.update_style_for_theme(self.dark_mode)
+            if icon_container and hasattr(icon_container, 'update_style_for_theme'):
+                icon_container.update_style_for_theme(self.dark_mode)
                         
         # Force repaint
         self.repaint()
@@ -10802,7 +14448,7 @@ class SimpleFileManager(QMainWindow):
             current_tab.sort_by = sort_by
             self.update_sort_menu_checkmarks()
             self.save_tab_sort_settings(current_tab)
-            current_tab.refresh_current_view()
+            current_tab.resort()
 
     def set_sort_order(self, sort_order):
         """Set sort order for current tab"""
@@ -10811,7 +14457,7 @@ class SimpleFileManager(QMainWindow):
             current_tab.sort_order = sort_order
             self.update_sort_menu_checkmarks()
             self.save_tab_sort_settings(current_tab)
-            current_tab.refresh_current_view()
+            current_tab.resort()
 
     def toggle_directories_first(self):
         """Toggle directories first sorting for current tab"""
@@ -10820,7 +14466,7 @@ class SimpleFileManager(QMainWindow):
             current_tab.directories_first = not current_tab.directories_first
             self.update_sort_menu_checkmarks()
             self.save_tab_sort_settings(current_tab)
-            current_tab.refresh_current_view()
+            current_tab.resort()
 
     def toggle_case_sensitive(self):
         """Toggle case sensitive sorting for current tab"""
@@ -10829,7 +14475,7 @@ class SimpleFileManager(QMainWindow):
             current_tab.case_sensitive = not current_tab.case_sensitive
             self.update_sort_menu_checkmarks()
             self.save_tab_sort_settings(current_tab)
-            current_tab.refresh_current_view()
+            current_tab.resort()
 
     def toggle_group_by_type(self):
         """Toggle group by type sorting for current tab"""
@@ -10838,7 +14484,7 @@ class SimpleFileManager(QMainWindow):
             current_tab.group_by_type = not current_tab.group_by_type
             self.update_sort_menu_checkmarks()
             self.save_tab_sort_settings(current_tab)
-            current_tab.refresh_current_view()
+            current_tab.resort()
 
     def toggle_natural_sort(self):
         """Toggle natural sort for current tab"""
@@ -10847,7 +14493,7 @@ class SimpleFileManager(QMainWindow):
             current_tab.natural_sort = not current_tab.natural_sort
             self.update_sort_menu_checkmarks()
             self.save_tab_sort_settings(current_tab)
-            current_tab.refresh_current_view()
+            current_tab.resort()
 
     def update_sort_menu_checkmarks(self):
         """Update sort menu checkmarks based on current tab settings"""
@@ -10997,7 +14643,7 @@ class SimpleFileManager(QMainWindow):
         if settings_loaded:
             # Only refresh if the view_stack exists (UI is set up)
             if hasattr(tab, 'view_stack'):
-                tab.refresh_current_view()
+                tab.resort()
         
     def update_preview_pane_theme(self):
         """Update preview pane colors for current theme"""
@@ -11120,10 +14766,6 @@ class SimpleFileManager(QMainWindow):
             style = ""
         
         icon_container.setStyleSheet(style)
-        # Also update the scroll area if we can access it through the current tab
-        current_tab = self.tab_manager.get_current_tab()
-        if current_tab and hasattr(current_tab, 'scroll_area'):
-            current_tab.scroll_area.setStyleSheet(style)
 
     def toggle_fullscreen(self):
         """Toggle fullscreen mode"""
@@ -11237,6 +14879,8 @@ class SimpleFileManager(QMainWindow):
             # Apply dark theme to custom widgets
             for widget in self.findChildren(IconWidget):
                 widget.update_style_for_theme(True)
+            for view in self.findChildren(IconListView):
+                view.update_style_for_theme(True)
         else:
             # Light mode (default)
             self.setStyleSheet("")
@@ -11244,6 +14888,8 @@ class SimpleFileManager(QMainWindow):
             # Apply light theme to custom widgets
             for widget in self.findChildren(IconWidget):
                 widget.update_style_for_theme(False)
+            for view in self.findChildren(IconListView):
+                view.update_style_for_theme(False)
         
         # Update breadcrumb styling
         breadcrumb_style = """
@@ -11774,6 +15420,10 @@ class AdvancedOperationsDialog(QDialog):
 def main():
     """Start the file manager application"""
     try:
+        # Thumbnail render processes re-enter this script; freeze_support() keeps that working in frozen builds
+        import multiprocessing
+        multiprocessing.freeze_support()
+        
         # Enable high DPI scaling BEFORE creating QApplication
         QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
         QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)